@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+"""
+Benchmarks for argument processing and the SQL generated by fields with arguments.
+
+Runs against an in-memory SQLite database seeded with bulk inserts and saves the results as JSON, so two commits
+can be compared:
+
+    $ python -m benchmarks.run --output before.json
+    $ git checkout other-branch
+    $ python -m benchmarks.run --output after.json --compare before.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+
+from tests.conftest import pytest_configure
+
+ARGUMENT_COUNTS = [1, 5, 10, 25, 50]
+
+OPERATIONS = OrderedDict([
+    ('all_blogs', '''
+        {
+            allBlogs(first: 50) {
+                edges {
+                    node {
+                        id
+                        title
+                    }
+                }
+            }
+        }
+    '''),
+    ('all_blogs_filtered', '''
+        {
+            allBlogs(first: 50, enabled: true, filterByDescription_Iexact: "description 7") {
+                edges {
+                    node {
+                        id
+                        title
+                    }
+                }
+            }
+        }
+    '''),
+    ('all_blogs_aggregate_filters', '''
+        {
+            allBlogs(first: 50, count_Gte: 1, filterByCount_Gte: 1) {
+                edges {
+                    node {
+                        id
+                        title
+                    }
+                }
+            }
+        }
+    '''),
+    ('all_blog_posts_with_blog', '''
+        {
+            allBlogPosts(first: 50, blog_Title: "Blog 7") {
+                totalCount
+                edges {
+                    node {
+                        id
+                        title
+                        blog {
+                            title
+                        }
+                    }
+                }
+            }
+        }
+    '''),
+    ('nested_filtered_posts', '''
+        {
+            allBlogs(first: 50) {
+                edges {
+                    node {
+                        title
+                        filteredPosts(first: 5, title_Icontains: "post") {
+                            totalCount
+                            edges {
+                                node {
+                                    title
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    '''),
+])
+
+
+class Info(object):
+    """
+    Minimal stand-in for the resolve info of graphql-core, enough for the argument pipeline.
+    """
+
+    context = None
+    path = None
+    field_name = 'benchmark'
+
+
+def setup_django():
+    pytest_configure({})
+
+    from django.core.management import call_command
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def seed(blogs, posts_per_blog):
+    from tests.models import Blog, BlogPost
+
+    Blog.objects.bulk_create([
+        Blog(title='Blog {}'.format(i), description='Description {}'.format(i), enabled=i % 2 == 0)
+        for i in range(blogs)
+    ], batch_size=500)
+    blog_ids = list(Blog.objects.values_list('pk', flat=True))
+    BlogPost.objects.bulk_create([
+        BlogPost(title='Post {}'.format(j), body='Body {}'.format(j), blog_id=blog_id)
+        for blog_id in blog_ids
+        for j in range(posts_per_blog)
+    ], batch_size=500)
+
+
+def measure(fn, rounds, warmup=1):
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return OrderedDict([
+        ('rounds', rounds),
+        ('min', min(timings)),
+        ('median', statistics.median(timings)),
+        ('mean', statistics.mean(timings)),
+        ('max', max(timings)),
+    ])
+
+
+def get_field_class(argument_count):
+    from graphene_django_helpers import arguments, fields
+
+    return type('BenchmarkField{}'.format(argument_count), (fields.ConnectionFieldWithArguments,), {
+        'arguments': [
+            arguments.Filter('title_{}'.format(i), field_name='title', lookups=['exact', 'icontains'])
+            for i in range(argument_count)
+        ],
+    })
+
+
+def bench_build_argument_map(rounds):
+    from tests.graphql.connections import BlogConnection
+
+    results = OrderedDict()
+    for count in ARGUMENT_COUNTS:
+        field = get_field_class(count)(BlogConnection)
+        results[str(count)] = measure(field.build_argument_map, rounds)
+    return results
+
+
+def bench_startup(rounds, field_count=1000, class_count=10, argument_count=20):
+    """
+    Time to declare, instantiate and build the schema of a query with field_count fields of class_count classes.
+    """
+    import graphene
+
+    from tests.graphql.connections import BlogConnection
+
+    def build():
+        field_classes = [get_field_class(argument_count) for _ in range(class_count)]
+        attrs = dict(
+            ('field_{}'.format(i), field_classes[i % class_count](BlogConnection)) for i in range(field_count)
+        )
+        query = type('BenchmarkQuery', (graphene.ObjectType,), attrs)
+        return graphene.Schema(query=query)
+
+    return OrderedDict([
+        ('fields_{}'.format(field_count), measure(build, rounds)),
+    ])
+
+
+def bench_resolver_overhead(rounds):
+    """
+    Time spent by the argument pipeline and the compilation of the resulting SQL, without running it.
+    """
+    from tests.graphql.connections import BlogConnection
+    from tests.models import Blog
+
+    results = OrderedDict()
+    for count in ARGUMENT_COUNTS:
+        field = get_field_class(count)(BlogConnection)
+        args = dict(('title_{}__icontains'.format(i), 'Blog') for i in range(count))
+        info = Info()
+
+        def resolve():
+            queryset = field.process_queryset(Blog.objects.all(), info, **args)
+            queryset.query.sql_with_params()
+
+        results[str(count)] = measure(resolve, rounds)
+    return results
+
+
+def bench_operations(rounds):
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.test.utils import CaptureQueriesContext
+
+    from tests.graphql.schema import schema
+
+    factory = RequestFactory()
+    results = OrderedDict()
+    for name, query in OPERATIONS.items():
+        def execute():
+            result = schema.execute(query, context_value=factory.post('/graphql/'))
+            if result.errors:
+                raise RuntimeError('{}: {}'.format(name, result.errors))
+
+        with CaptureQueriesContext(connection) as context:
+            execute()
+        results[name] = measure(execute, rounds)
+        results[name]['queries'] = len(context.captured_queries)
+    return results
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous, threshold):
+    """
+    Prints the median of every benchmark against the previous results and returns the number of regressions, that
+    is benchmarks whose median grew over threshold or that run more queries.
+    """
+    regressions = 0
+    for group, benchmarks in results['benchmarks'].items():
+        for name, current in benchmarks.items():
+            old = previous.get('benchmarks', {}).get(group, {}).get(name)
+            if not old:
+                continue
+            ratio = current['median'] / old['median'] if old['median'] else 1
+            regression = ratio > 1 + threshold or current.get('queries', 0) > old.get('queries', 0)
+            regressions += regression
+            print('{:<28} {:<30} {:>10.3f}ms {:>10.3f}ms {:>7.2f}x{}'.format(
+                group, name, old['median'], current['median'], ratio, ' REGRESSION' if regression else '',
+            ))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--blogs', type=int, default=1000)
+    parser.add_argument('--posts-per-blog', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', help='Results of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Median growth considered a regression')
+    options = parser.parse_args(argv)
+
+    setup_django()
+
+    import django
+    seed(options.blogs, options.posts_per_blog)
+
+    results = OrderedDict([
+        ('commit', get_commit()),
+        ('python', platform.python_version()),
+        ('django', django.get_version()),
+        ('blogs', options.blogs),
+        ('posts_per_blog', options.posts_per_blog),
+        ('benchmarks', OrderedDict([
+            ('build_argument_map', bench_build_argument_map(options.rounds)),
+            ('startup', bench_startup(max(options.rounds // 4, 1))),
+            ('resolver_overhead', bench_resolver_overhead(options.rounds)),
+            ('operations', bench_operations(options.rounds)),
+        ])),
+    ])
+
+    with open(options.output, 'w') as f:
+        json.dump(results, f, indent=4)
+
+    for group, benchmarks in results['benchmarks'].items():
+        for name, stats in benchmarks.items():
+            queries = ' ({} queries)'.format(stats['queries']) if 'queries' in stats else ''
+            print('{:<28} {:<30} {:>10.3f}ms{}'.format(group, name, stats['median'], queries))
+
+    if options.compare:
+        with open(options.compare) as f:
+            previous = json.load(f)
+        print()
+        return 1 if compare(results, previous, options.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+from collections import OrderedDict
+
+from graphene_django_helpers.lookups import get_expression_lookups, get_lookup_models
+
+
+class AnnotationRegistry(object):
+    """
+    Annotations declared by the arguments of a filter plan. Identical expressions declared under different aliases are
+    registered once, under the first alias declared, and every declared alias maps to the one actually applied, so
+    each aggregate and its joins only appear once in the SQL.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.expressions = OrderedDict()
+        self.aliases = {}
+
+    def register(self, alias, expression):
+        if alias in self.aliases:
+            if self.expressions[self.aliases[alias]] != expression:
+                raise ValueError('Annotation "{}" is declared with different expressions'.format(alias))
+            return self.aliases[alias]
+
+        for applied_alias, applied_expression in self.expressions.items():
+            if applied_expression == expression:
+                self.aliases[alias] = applied_alias
+                return applied_alias
+
+        self.expressions[alias] = expression
+        self.aliases[alias] = alias
+        return alias
+
+    def get_alias(self, alias):
+        return self.aliases.get(alias, alias)
+
+    def get_related_models(self, model):
+        models = []
+        for expression in self.expressions.values():
+            for lookup in get_expression_lookups(expression):
+                models.extend(get_lookup_models(model, lookup))
+        return models
+
+    def annotate(self, queryset):
+        if not self.expressions:
+            return queryset
+        return queryset.annotate(**self.expressions)
@@ -1,16 +1,34 @@
-from django.db.models import Q
+from collections import OrderedDict
+
+from django.db.models import Count, Exists, IntegerField, Max, Min, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Coalesce
 
 import graphene
 
+from graphene_django_helpers.costs import AGGREGATE_COST, CHEAP_COST, EXPENSIVE_COST, EXPENSIVE_LOOKUPS, UNINDEXED_COST
+from graphene_django_helpers.lookups import (
+    ValueList, get_expression_lookups, get_lookup_fields, get_lookup_models, get_multi_valued_paths, get_reverse_lookup,
+    get_value_field, is_indexed, is_multi_valued,
+)
+
 
 class Argument(object):
     name = None
     of_type = graphene.String()
+    annotations = None
+    # RoutingRule picking the database of the field when this argument is given
+    routing = None
+    # Cost added to the cost of the field when this argument is given, estimated by get_cost when None
+    cost = None
 
-    def __init__(self, name, of_type=None) -> None:
+    def __init__(self, name, of_type=None, annotations=None, routing=None, cost=None) -> None:
         super().__init__()
         self.name = name or self.name
         self.of_type = of_type or self.of_type
+        self.annotations = annotations or self.annotations
+        self.routing = routing or self.routing
+        self.cost = self.cost if cost is None else cost
 
     def alter_queryset_before(self, field, queryset, params, value, info):
         return queryset
@@ -21,8 +39,51 @@ class Argument(object):
     def alter_filter_conditions(self, field, conditions, params, value, info):
         return conditions
 
+    def compile_params(self, field, params):
+        """
+        Returns a copy of params enriched with everything that does not depend on the argument value. It is called
+        once per filter plan, so the work done here is not repeated on every request.
+        """
+        params = dict(params)
+        params['cost'] = self.get_cost(field, params)
+        return params
+
+    def get_cost(self, field, params):
+        """
+        Returns the cost of this argument, compared with the `cost_budget` of the field before any SQL runs.
+        """
+        if self.cost is not None:
+            return self.cost
+        if self.get_annotations(field, params):
+            return AGGREGATE_COST
+        return 0
+
+    def get_related_models(self, field, model, params):
+        """
+        Returns the models, other than model itself, whose rows this argument reads. Used to invalidate cached results.
+        """
+        return []
+
+    def get_annotations(self, field, params):
+        """
+        Returns the annotations, by alias, this argument needs. The field applies each distinct expression once, after
+        `alter_queryset_before`, and `params['annotation_aliases']` maps every declared alias to the applied one.
+        """
+        return dict(self.annotations or {})
+
+    def get_joins(self, field, model, params):
+        """
+        Returns the multi-valued relations of model this argument joins, which may duplicate its rows. Arguments of the
+        same filter plan can use them to pick a form that does not multiply the rows, like a subquery.
+        """
+        joins = []
+        for expression in (self.annotations or {}).values():
+            for lookup in get_expression_lookups(expression):
+                joins.extend(get_multi_valued_paths(model, lookup))
+        return joins
+
     def get_mapping(self):
-        d = {}
+        d = OrderedDict()
         d[self.name] = {
             'instance': self,
             'params': {
@@ -33,35 +94,145 @@ class Argument(object):
 
 
 class Filter(Argument):
+    """
+    Filters on the `field_name` of the field model, reached through `path` when given, with one argument per lookup.
+
+    Lookups crossing a multi-valued relation are compiled, unless `exists_subquery` is disabled, to a correlated
+    `EXISTS` subquery on the related rows, which unlike a join does not duplicate rows nor needs `.distinct()`. The
+    filters of a request on the same relation share one subquery, so they match the same related row.
+
+    Custom filtering is done by a method of the field, named by `method` and called as
+    `method(queryset, params, value, info)` to return the filtered queryset, or named by `conditions_method` and called
+    as `method(params, value, info)` to return `Q` conditions. Conditions are applied in the same `filter()` call as
+    those of the other filters, so they share their joins, while each queryset method adds its own. The lookups
+    joined by either method are declared as `joins`, so aggregates of the same request are not multiplied by them.
+    Until they are, the method is assumed to join every multi-valued relation of the field model.
+
+    A filter on a count may declare the `CounterCache` keeping that count in a column of the field model as
+    `counter_cache`. While the cache is enabled, the filter looks the column up instead of annotating anything.
+    """
+
     field_name = None
     path = None
     lookups = None
+    exists_subquery = True
+    counter_cache = None
+    joins = None
 
-    def __init__(self, name, field_name=None, lookups=None, path=None, of_type=None, method=None) -> None:
-        super().__init__(name, of_type=of_type)
+    def __init__(self, name, field_name=None, lookups=None, path=None, of_type=None, method=None,
+                 annotations=None, conditions_method=None, counter_cache=None, routing=None, cost=None,
+                 joins=None) -> None:
+        super().__init__(name, of_type=of_type, annotations=annotations, routing=routing, cost=cost)
         self.field_name = field_name or self.field_name
         self.path = path or self.path
         self.lookups = lookups or self.lookups
         self.method = method
+        self.conditions_method = conditions_method
+        self.counter_cache = counter_cache or self.counter_cache
+        self.joins = self.joins if joins is None else joins
+
+    def get_counter_cache(self, params):
+        """
+        Returns the counter cache of this filter when it is enabled and holds counts of the field model, or None.
+        """
+        counter_cache = self.counter_cache
+        model = params.get('model')
+        if counter_cache is None or not counter_cache.enabled or model is None:
+            return None
+        return counter_cache if issubclass(model, counter_cache.model) else None
+
+    def get_annotations(self, field, params):
+        if self.get_counter_cache(params):
+            return {}
+        return super().get_annotations(field, params)
+
+    def get_field_path(self, params):
+        if self.get_counter_cache(params):
+            return self.counter_cache.field_name
 
-    def get_field_lookup(self, field, params, value, info):
         ret = self.field_name or params['name']
         if self.path:
             ret = '{}__{}'.format(self.path, ret)
+
+        # Annotations may be applied under the alias of an identical one declared by another argument
+        aliases = params.get('annotation_aliases')
+        if aliases:
+            head, sep, tail = ret.partition('__')
+            ret = aliases.get(head, head) + sep + tail
+        return ret
+
+    def get_field_lookup(self, field, params, value, info):
+        if 'field_lookup' in params:
+            return params['field_lookup']
+
+        ret = self.get_field_path(params)
         lookup = params.get('lookup', None)
         if lookup:
             ret = '{}__{}'.format(ret, lookup)
         return ret
 
+    def get_related_models(self, field, model, params):
+        return get_lookup_models(model, self.get_field_path(params))
+
+    def get_cost(self, field, params):
+        if self.cost is not None or self.get_annotations(field, params):
+            return super().get_cost(field, params)
+        if self.method or self.conditions_method:
+            return EXPENSIVE_COST
+        if (params.get('lookup') or 'exact') in EXPENSIVE_LOOKUPS:
+            return EXPENSIVE_COST
+        model = params.get('model')
+        fields = get_lookup_fields(model, self.get_field_path(params)) if model is not None else []
+        if fields and not is_indexed(fields[-1]):
+            return UNINDEXED_COST
+        return CHEAP_COST
+
+    def get_joins(self, field, model, params):
+        if self.get_counter_cache(params):
+            return []
+        joins = super().get_joins(field, model, params)
+        if self.method or self.conditions_method:
+            if self.joins is None:
+                fields = model._meta.get_fields()
+                joins.extend(model_field.name for model_field in fields if is_multi_valued(model_field))
+            for lookup in self.joins or []:
+                joins.extend(get_multi_valued_paths(model, lookup))
+        elif not self.get_exists_relation(model, params):
+            joins.extend(get_multi_valued_paths(model, self.get_field_path(params)))
+        return joins
+
+    def get_exists_relation(self, model, params):
+        """
+        Returns the first multi-valued relation crossed by the lookup of this filter when it is compiled to an
+        `EXISTS` subquery on that relation, or None.
+        """
+        if not self.exists_subquery or self.method or self.conditions_method or model is None:
+            return None
+        if type(self).get_field_lookup is not Filter.get_field_lookup:
+            return None
+
+        field_lookup = self.get_field_lookup(None, params, None, None)
+        paths = get_multi_valued_paths(model, field_lookup)
+        if not paths:
+            return None
+        if field_lookup[len(paths[0]):].split(LOOKUP_SEP)[1:2] == ['isnull']:
+            # Rows without related rows can not be matched by conditions on the related rows
+            return None
+        return paths[0]
+
     def alter_filter_conditions(self, field, conditions, params, value, info):
         # This step does not run if method is provided
         if self.method:
             return conditions
 
-        field_lookup = self.get_field_lookup(field, params, value, info)
-        condition = {}
-        condition[field_lookup] = value
-        q = Q(**condition)
+        if self.conditions_method:
+            method = params.get('conditions_method') or getattr(field, self.conditions_method)
+            q = method(params, value, info)
+            if q is None:
+                return conditions
+        else:
+            field_lookup = self.get_field_lookup(field, params, value, info)
+            q = Q(**{field_lookup: value})
         if conditions is None:
             return q
         return conditions & q
@@ -78,11 +249,29 @@ class Filter(Argument):
 
     def alter_queryset_after(self, field, queryset, params, value, info):
         if self.method:
-            queryset = getattr(field, self.method)(queryset, params, value, info)
+            method = params.get('method') or getattr(field, self.method)
+            queryset = method(queryset, params, value, info)
         return queryset
 
+    def compile_params(self, field, params):
+        params = super().compile_params(field, params)
+        if self.method:
+            params['method'] = getattr(field, self.method)
+        elif self.conditions_method:
+            params['conditions_method'] = getattr(field, self.conditions_method)
+        elif type(self).get_field_lookup is Filter.get_field_lookup:
+            # Only the default implementation is known not to depend on value and info
+            relation = self.get_exists_relation(params.get('model'), params)
+            field_lookup = self.get_field_lookup(field, params, None, None)
+            if relation:
+                # The lookup is then relative to the related model
+                params['exists_relation'] = relation
+                field_lookup = field_lookup[len(relation) + len(LOOKUP_SEP):] or 'pk'
+            params['field_lookup'] = field_lookup
+        return params
+
     def get_mapping(self):
-        d = {}
+        d = OrderedDict()
 
         exact_lookup_found, lookups = self.get_processed_lookups()
 
@@ -118,3 +307,223 @@ class FloatFilter(Filter):
 
 class BooleanFilter(Filter):
     of_type = graphene.Boolean()
+
+
+class ListFilter(Filter):
+    """
+    Filters on the `field_name` of the field model being one of a list of values, which are deduplicated and sorted
+    so the same values always give the same statement.
+
+    Lists longer than `threshold` are sent as a single parameter, see `ValueList`, instead of one placeholder per
+    value, which would exceed the variable limit of SQLite and make a statement, and a query plan, per list length.
+    """
+
+    of_type = graphene.List(graphene.NonNull(graphene.ID))
+    lookups = ['in']
+    threshold = 100
+
+    def __init__(self, name, field_name=None, path=None, of_type=None, threshold=None, routing=None,
+                 cost=None) -> None:
+        super().__init__(name, field_name=field_name, path=path, of_type=of_type, routing=routing, cost=cost)
+        self.threshold = self.threshold if threshold is None else threshold
+
+    def get_value_field(self, params):
+        model = params.get('model')
+        fields = get_lookup_fields(model, self.get_field_path(params)) if model is not None else []
+        return get_value_field(fields[-1]) if fields else None
+
+    def get_values(self, value, value_field):
+        """
+        Returns the distinct values of value, converted by value_field when given, in order.
+        """
+        values = set(item for item in value if item is not None)
+        if value_field is not None:
+            values = set(value_field.to_python(item) for item in values)
+        return sorted(values)
+
+    def alter_filter_conditions(self, field, conditions, params, value, info):
+        if value is None:
+            return conditions
+        value_field = params['value_field'] if 'value_field' in params else self.get_value_field(params)
+        values = self.get_values(value, value_field)
+        if len(values) > self.threshold and value_field is not None:
+            values = ValueList(values, value_field)
+        return super().alter_filter_conditions(field, conditions, params, values, info)
+
+    def compile_params(self, field, params):
+        params = super().compile_params(field, params)
+        params['value_field'] = self.get_value_field(params)
+        return params
+
+    def get_mapping(self):
+        return {
+            self.name: {
+                'instance': self,
+                'params': {
+                    'name': self.name,
+                    'lookup': 'in',
+                },
+            },
+        }
+
+
+class AggregateFilter(IntFilter):
+    """
+    Filters on an aggregate of the rows of `relation`, a relation of the field model, optionally over their
+    `aggregate_field`. For example `CountFilter('post_count', 'posts', lookups=['gte'])`.
+
+    The aggregate is annotated with a JOIN and a GROUP BY, or with a correlated subquery when `subquery` is set. When
+    `subquery` is None, the subquery is used whenever other arguments of the same request join multi-valued relations,
+    which would multiply the aggregated rows.
+    """
+
+    function = None
+    relation = None
+    aggregate_field = None
+    subquery = None
+
+    def __init__(self, name, relation=None, aggregate_field=None, lookups=None, subquery=None, of_type=None,
+                 counter_cache=None, routing=None, cost=None) -> None:
+        super().__init__(
+            name, field_name='{}_aggregate'.format(name), lookups=lookups, of_type=of_type, counter_cache=counter_cache,
+            routing=routing, cost=cost,
+        )
+        self.relation = relation or self.relation
+        self.aggregate_field = aggregate_field or self.aggregate_field
+        self.subquery = self.subquery if subquery is None else subquery
+        # Expressions are built once per model and form, so every lookup of the argument annotates the same one
+        self.expressions = {}
+
+    def get_aggregate_lookup(self):
+        if self.aggregate_field:
+            return '{}__{}'.format(self.relation, self.aggregate_field)
+        return self.relation
+
+    def get_related_models(self, field, model, params):
+        return get_lookup_models(model, self.get_aggregate_lookup())
+
+    def get_joins(self, field, model, params):
+        if self.get_counter_cache(params):
+            return []
+        return get_multi_valued_paths(model, self.relation)
+
+    def use_subquery(self, params):
+        if params.get('model') is None:
+            return False
+        if self.subquery is not None:
+            return self.subquery
+        return bool(params.get('multi_valued_joins'))
+
+    def get_output_field(self, related_model):
+        # Without aggregate_field the primary keys of the related rows are aggregated
+        if not self.aggregate_field:
+            return related_model._meta.pk
+        return get_lookup_fields(related_model, self.aggregate_field)[-1]
+
+    def get_join_expression(self, model):
+        return self.function(self.get_aggregate_lookup())
+
+    def get_subquery_expression(self, model):
+        related_model, outer_lookup = get_reverse_lookup(model, self.relation)
+        queryset = related_model._base_manager.filter(**{outer_lookup: OuterRef('pk')}).order_by().values(outer_lookup)
+        queryset = queryset.annotate(value=self.function(self.aggregate_field or 'pk')).values('value')
+        return Subquery(queryset, output_field=self.get_output_field(related_model))
+
+    def get_annotations(self, field, params):
+        if self.get_counter_cache(params):
+            return {}
+        model = params.get('model')
+        subquery = self.use_subquery(params)
+        key = (model, subquery)
+        if key not in self.expressions:
+            if subquery:
+                self.expressions[key] = self.get_subquery_expression(model)
+            else:
+                self.expressions[key] = self.get_join_expression(model)
+        return {self.field_name: self.expressions[key]}
+
+
+class CountFilter(AggregateFilter):
+    function = Count
+
+    def get_output_field(self, related_model):
+        return IntegerField()
+
+    def get_subquery_expression(self, model):
+        # Rows without related rows have no group in the subquery, their count is 0 and not NULL
+        return Coalesce(super().get_subquery_expression(model), Value(0))
+
+
+class SumFilter(AggregateFilter):
+    function = Sum
+
+
+class MaxFilter(AggregateFilter):
+    function = Max
+
+
+class MinFilter(AggregateFilter):
+    function = Min
+
+
+class ExistsFilter(AggregateFilter):
+    """
+    Filters on whether rows of `relation` exist, always with a correlated `EXISTS` subquery, so it never joins.
+    """
+
+    of_type = graphene.Boolean()
+
+    def get_joins(self, field, model, params):
+        return []
+
+    def use_subquery(self, params):
+        if params.get('model') is None:
+            raise ValueError('{} needs a field whose model is known'.format(type(self).__name__))
+        return True
+
+    def get_subquery_expression(self, model):
+        related_model, outer_lookup = get_reverse_lookup(model, self.relation)
+        return Exists(related_model._base_manager.filter(**{outer_lookup: OuterRef('pk')}).order_by())
+
+
+class SearchFilter(Argument):
+    """
+    Filters the rows of the field model matching every word of the value in the full-text `SearchIndex` given as
+    `index`, and annotates their relevance, higher for the most relevant rows, as `rank_alias`, `<name>_rank` by
+    default. Rows are ordered by relevance when `order_by_rank` is set.
+    """
+
+    index = None
+    rank_alias = None
+    order_by_rank = True
+
+    def __init__(self, name, index=None, rank_alias=None, order_by_rank=None, routing=None, cost=None) -> None:
+        super().__init__(name, routing=routing, cost=cost)
+        self.index = index or self.index
+        self.rank_alias = rank_alias or self.rank_alias or '{}_rank'.format(name)
+        self.order_by_rank = self.order_by_rank if order_by_rank is None else order_by_rank
+
+    def get_cost(self, field, params):
+        if self.cost is not None:
+            return self.cost
+        # Matches are looked up in the search index
+        return CHEAP_COST
+
+    def alter_queryset_before(self, field, queryset, params, value, info):
+        if not value or not value.split():
+            return queryset
+        # The rank is only computed for the rows matching the conditions
+        return queryset.annotate(**{self.rank_alias: self.index.get_rank(value, using=queryset.db)})
+
+    def alter_filter_conditions(self, field, conditions, params, value, info):
+        if not value or not value.split():
+            return conditions
+        q = self.index.get_conditions(value)
+        if conditions is None:
+            return q
+        return conditions & q
+
+    def alter_queryset_after(self, field, queryset, params, value, info):
+        if self.order_by_rank and value and value.split():
+            queryset = queryset.order_by('-{}'.format(self.rank_alias), 'pk')
+        return queryset
@@ -0,0 +1,88 @@
+import asyncio
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.db import close_old_connections
+from django.db.models import QuerySet
+
+from graphene_django_helpers.fields import ConnectionFieldWithArguments, FieldWithArguments
+from graphene_django_helpers.selections import get_selection_tree
+
+DEFAULT_MAX_WORKERS = 10
+
+default_executor = None
+default_executor_lock = threading.Lock()
+
+
+class DatabaseThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    Bounded thread pool that closes the database connections of a worker once they are unusable or obsolete, since
+    worker threads never receive the `request_finished` signal that does it for request threads.
+    """
+
+    def submit(self, fn, *args, **kwargs):
+        return super().submit(self.run, fn, *args, **kwargs)
+
+    @staticmethod
+    def run(fn, *args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+
+def get_default_executor():
+    global default_executor
+    with default_executor_lock:
+        if default_executor is None:
+            default_executor = DatabaseThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS)
+    return default_executor
+
+
+class AsyncFieldWithArgumentsMixin(object):
+    """
+    Resolves the field as a coroutine for asyncio executors. The parent resolver may return an awaitable, and the
+    argument pipeline, its `alter_*` hooks and the evaluation of the queryset run in `async_executor`, a bounded thread
+    pool by default, so the event loop is never blocked by the database.
+    """
+
+    async_executor = None
+
+    def get_async_executor(self):
+        return self.async_executor or get_default_executor()
+
+    def get_resolver(self, parent_resolver):
+        return partial(self.resolve_async, parent_resolver)
+
+    async def resolve_async(self, parent_resolver, root, info, **args):
+        resolved = parent_resolver(root, info, **args)
+        if inspect.isawaitable(resolved):
+            resolved = await resolved
+
+        resolver = super().get_resolver(lambda root, info, **args: resolved)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self.get_async_executor(), partial(self.resolve_in_executor, resolver, root, info, **args)
+        )
+
+    def resolve_in_executor(self, resolver, root, info, **args):
+        return self.evaluate_result(resolver(root, info, **args), info)
+
+    def evaluate_result(self, result, info):
+        if isinstance(result, QuerySet):
+            return list(result)
+        return result
+
+
+class AsyncFieldWithArguments(AsyncFieldWithArgumentsMixin, FieldWithArguments):
+    pass
+
+
+class AsyncConnectionFieldWithArguments(AsyncFieldWithArgumentsMixin, ConnectionFieldWithArguments):
+    def evaluate_result(self, result, info):
+        # totalCount is resolved in the event loop, so its count runs here when it is selected
+        if 'totalCount' in get_selection_tree(info) and hasattr(result, 'resolve_total_count'):
+            result.resolve_total_count(info)
+        return result
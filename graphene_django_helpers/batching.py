@@ -0,0 +1,159 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+from graphene.relay import PageInfo
+from graphql_relay.connection.arrayconnection import connection_from_list_slice, get_offset_with_default
+from promise import Promise
+from promise.dataloader import DataLoader
+
+from graphene_django_helpers.costs import statement_timeout
+
+ROW_NUMBER_ALIAS = '_batch_row_number'
+COUNT_ALIAS = '_batch_count'
+LOADERS_ATTRIBUTE = '_graphene_django_helpers_loaders'
+
+
+class FilteredConnectionLoader(DataLoader):
+    """
+    Loads the connections of every parent requested in an execution with the same arguments together.
+
+    Rows are numbered per parent with `ROW_NUMBER() OVER (PARTITION BY <batch key>)` and counted with
+    `COUNT(*) OVER (PARTITION BY <batch key>)`, so the pagination window of every parent is applied by the database.
+    A first query returns the ids, row numbers and counts of the rows in the windows and a second one the nodes,
+    whatever the number of parents.
+    """
+
+    def __init__(self, field, info, args) -> None:
+        super().__init__()
+        self.field = field
+        self.info = info
+        self.args = args
+
+    def get_window_conditions(self, quote_name):
+        """
+        Returns the SQL conditions on the row number and the count of each row that keep a superset of the rows of
+        every page, along with their params. The exact page is then computed from that slice.
+        """
+        row_number = quote_name(ROW_NUMBER_ALIAS)
+        count = quote_name(COUNT_ALIAS)
+        first = self.args.get('first')
+        last = self.args.get('last')
+        before = self.args.get('before')
+        start = get_offset_with_default(self.args.get('after'), -1) + 1
+
+        conditions = ['{} > %s'.format(row_number)]
+        params = [start]
+        if before:
+            before_offset = get_offset_with_default(before, 0)
+            conditions.append('{} <= %s'.format(row_number))
+            params.append(before_offset)
+        if isinstance(first, int):
+            conditions.append('{} <= %s'.format(row_number))
+            params.append(start + first)
+        elif isinstance(last, int):
+            if before:
+                conditions.append('({0} > %s OR {0} > {1} - %s)'.format(row_number, count))
+                params.extend([before_offset - last, last])
+            else:
+                conditions.append('{} > {} - %s'.format(row_number, count))
+                params.append(last)
+        return conditions, params
+
+    def get_window_rows(self, queryset, ordering):
+        """
+        Returns `(pk, key, row_number, count)` for the rows of queryset inside the window of their parent.
+        """
+        batch_key = self.field.batch_key
+        order_by = [F(item[1:]).desc() if item.startswith('-') else F(item).asc() for item in ordering]
+        partition_by = [F(batch_key)]
+        windowed = queryset.annotate(**{
+            ROW_NUMBER_ALIAS: Window(expression=RowNumber(), partition_by=partition_by, order_by=order_by),
+            COUNT_ALIAS: Window(expression=Count('pk'), partition_by=partition_by),
+        }).values('pk', batch_key, ROW_NUMBER_ALIAS, COUNT_ALIAS)
+        sql, params = windowed.query.sql_with_params()
+
+        connection = connections[queryset.db]
+        conditions, condition_params = self.get_window_conditions(connection.ops.quote_name)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT * FROM ({}) {} WHERE {}'.format(
+                    sql, connection.ops.quote_name('batched'), ' AND '.join(conditions)
+                ),
+                tuple(params) + tuple(condition_params),
+            )
+            return [tuple(row[:4]) for row in cursor.fetchall()]
+
+    def batch_load_fn(self, keys):
+        field = self.field
+        filter_plan = field.get_filter_plan(**self.args)
+        queryset = field.get_batch_queryset(self.info, **self.args)
+        queryset = field.route_queryset(queryset, self.info, filter_plan=filter_plan, **self.args)
+        queryset = field.process_queryset(queryset, self.info, filter_plan=filter_plan, **self.args)
+        if queryset.query.is_empty():
+            return Promise.resolve([self.get_connection([], 0) for key in keys])
+        if not field.statement_timeout:
+            return Promise.resolve(self.load_connections(queryset, keys))
+        with statement_timeout(connections[queryset.db], field.statement_timeout):
+            return Promise.resolve(self.load_connections(queryset, keys))
+
+    def load_connections(self, queryset, keys):
+        field = self.field
+        queryset = queryset.filter(**{'{}__in'.format(field.batch_key): keys})
+        ordering = field.get_keyset_paginator().get_ordering(queryset)
+        rows = self.get_window_rows(queryset, ordering)
+
+        nodes = dict((node.pk, node) for node in queryset.filter(pk__in=[row[0] for row in rows])) if rows else {}
+        pages = {}
+        lengths = {}
+        for pk, key, row_number, count in sorted(rows, key=lambda row: row[2]):
+            if pk in nodes:
+                pages.setdefault(key, []).append(nodes[pk])
+                lengths[key] = count
+        return [self.get_connection(pages.get(key, []), lengths.get(key, 0)) for key in keys]
+
+    def get_slice_start(self, nodes, length):
+        start = get_offset_with_default(self.args.get('after'), -1) + 1
+        if isinstance(self.args.get('first'), int) or not isinstance(self.args.get('last'), int):
+            return start
+        end = min(get_offset_with_default(self.args.get('before'), length), length)
+        return max(end - len(nodes), start)
+
+    def get_connection(self, nodes, length):
+        connection_type = self.field.get_connection_type()
+        connection = connection_from_list_slice(
+            nodes,
+            self.args,
+            connection_type=connection_type,
+            edge_type=connection_type.Edge,
+            pageinfo_type=PageInfo,
+            slice_start=self.get_slice_start(nodes, length),
+            list_length=length,
+            list_slice_length=len(nodes),
+        )
+        connection.iterable = nodes
+        connection.length = length
+        return connection
+
+
+def get_loader(field, info, args):
+    """
+    Returns the loader of field for args, shared by every parent resolved in the same execution through the context.
+    """
+    context = info.context
+    loaders = getattr(context, LOADERS_ATTRIBUTE, None)
+    if loaders is None:
+        loaders = {}
+        try:
+            setattr(context, LOADERS_ATTRIBUTE, loaders)
+        except AttributeError:
+            # Without a context loaders can not be shared, each parent is loaded on its own
+            return FilteredConnectionLoader(field, info, args)
+
+    key = (id(field), info.field_name, json.dumps(sorted(args.items()), cls=DjangoJSONEncoder))
+    if key not in loaders:
+        loaders[key] = FilteredConnectionLoader(field, info, args)
+    return loaders[key]
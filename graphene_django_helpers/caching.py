@@ -0,0 +1,180 @@
+import hashlib
+import json
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import EmptyResultSet
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+
+VERSION_KEY_PREFIX = 'graphene_django_helpers:results:version'
+RESULT_KEY_PREFIX = 'graphene_django_helpers:results'
+
+# Cache aliases holding cached results. The version of a model watched by a result cache is dropped from every one of
+# them whenever one of its instances is saved or deleted, by any process creating the field, even one that never
+# resolved it. Result caches add their alias when their field is created, aliases of fields that other processes do
+# not create must be added here
+result_cache_aliases = set()
+# Result caches of the fields caching their results, in creation order
+result_caches = []
+
+
+def get_model_label(model):
+    return model._meta.concrete_model._meta.label_lower
+
+
+def get_version_key(label):
+    return '{}:{}'.format(VERSION_KEY_PREFIX, label)
+
+
+def invalidate_model_results(sender, **kwargs):
+    label = get_model_label(sender)
+    if not any(label in result_cache.get_watched_labels() for result_cache in result_caches):
+        return
+    # Entries are read with the version of the model, so dropping it invalidates them, and the next read adds a new one
+    key = get_version_key(label)
+    for alias in sorted(result_cache_aliases):
+        caches[alias].delete(key)
+
+
+def watch_model_results():
+    post_save.connect(invalidate_model_results, dispatch_uid='graphene_django_helpers.caching.post_save')
+    post_delete.connect(invalidate_model_results, dispatch_uid='graphene_django_helpers.caching.post_delete')
+
+
+class ResultCache(object):
+    """
+    Caches the results of a field, keyed by the field, its root, the SQL of the queryset of the parent resolver, the
+    normalized argument values (pagination included) and the version of every model the results depend on.
+
+    Saving or deleting an instance of one of those models gives it a new version, which invalidates every entry built
+    on top of the previous one. Bulk operations that do not send `post_save`/`post_delete` are not tracked. Saves and
+    deletes are only watched once a field caches its results, and only for the models its entries depend on.
+    On the local memory backend, the number of entries of the field is bounded by `max_entries`, evicting the least
+    recently used ones.
+    """
+
+    def __init__(self, field, timeout=60, alias='default', max_entries=1000) -> None:
+        super().__init__()
+        self.field = field
+        self.timeout = timeout
+        self.alias = alias
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.keys = OrderedDict()
+        self.lock = threading.Lock()
+        self.watched_labels = None
+        if field.cache_results:
+            result_cache_aliases.add(alias)
+            result_caches.append(self)
+            watch_model_results()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_watched_labels(self):
+        """
+        Returns the labels of the models the entries of the field depend on whatever the arguments given, found the
+        first time an instance is saved or deleted, once the types of the field are resolved. Models of the querysets
+        resolved are added as they are read.
+        """
+        if self.watched_labels is None:
+            field = self.field
+            models = list(field.cache_results_models)
+            model = field.get_model()
+            if model is not None:
+                models += [model] + field.get_related_models(model, **dict.fromkeys(field.argument_map))
+            self.watched_labels = set(get_model_label(model) for model in models)
+        return self.watched_labels
+
+    def get_root_key(self, root):
+        if root is None:
+            return None
+        if isinstance(root, Model) and root.pk is not None:
+            return [get_model_label(type(root)), root.pk]
+        # Results depend on a root that can not be identified
+        raise ValueError
+
+    def get_queryset_key(self, queryset):
+        """
+        Returns the database and the SQL of queryset, so parent resolvers scoping it, per user for example, get their
+        own entries.
+        """
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            sql, params = None, ()
+        return [queryset.db, sql, list(params)]
+
+    def get_model_versions(self, models):
+        labels = sorted(set(get_model_label(model) for model in models))
+        keys = [get_version_key(label) for label in labels]
+        versions = self.cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                # A random initial version can not collide with one that was evicted
+                self.cache.add(key, uuid.uuid4().hex, None)
+                versions[key] = self.cache.get(key)
+        return [versions[key] for key in keys]
+
+    def get_key(self, root, info, queryset, models, args):
+        try:
+            root_key = self.get_root_key(root)
+        except ValueError:
+            return None
+
+        data = json.dumps([
+            info.parent_type.name,
+            info.field_name,
+            root_key,
+            self.get_queryset_key(queryset),
+            self.get_model_versions(models),
+            sorted(args.items()),
+        ], cls=DjangoJSONEncoder)
+        return '{}:{}'.format(RESULT_KEY_PREFIX, hashlib.md5(data.encode('utf-8')).hexdigest())
+
+    def track(self, key):
+        if not isinstance(self.cache, LocMemCache):
+            return
+        with self.lock:
+            self.keys[key] = None
+            self.keys.move_to_end(key)
+            while len(self.keys) > self.max_entries:
+                evicted, _ = self.keys.popitem(last=False)
+                self.cache.delete(evicted)
+
+    def get(self, key):
+        value = self.cache.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.track(key)
+        return value
+
+    def set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+        self.track(key)
+
+    def resolve(self, root, info, queryset, args, filter_plan=None):
+        field = self.field
+        models = [queryset.model] + field.get_related_models(queryset.model, filter_plan=filter_plan, **args)
+        self.get_watched_labels().update(get_model_label(model) for model in models)
+        key = self.get_key(root, info, queryset, models, args)
+        if key is None:
+            return field.resolve_queryset(queryset, info, filter_plan=filter_plan, **args)
+
+        value = self.get(key)
+        if value is not None:
+            return field.load_cached_result(queryset, info, value, filter_plan=filter_plan, **args)
+
+        result = field.resolve_queryset(queryset, info, filter_plan=filter_plan, **args)
+        result, value = field.dump_cached_result(result)
+        self.set(key, value)
+        return result
@@ -0,0 +1,209 @@
+import datetime
+import decimal
+
+from django.core.exceptions import FieldError, ValidationError
+from django.db.models import (
+    AutoField, BooleanField, DateField, DecimalField, DurationField, Field, FloatField, IntegerField, Q, TimeField,
+)
+from django.db.models.constants import LOOKUP_SEP
+
+from graphene_django_helpers.lookups import get_lookup_fields, get_value_field
+
+RANGE_OPERATORS = ('exact', 'in', 'gt', 'gte', 'lt', 'lte', 'range')
+# Fields whose values the database compares like their Python values. Strings depend on the collation of the column
+ORDERED_FIELDS = (AutoField, BooleanField, DateField, DecimalField, DurationField, FloatField, IntegerField, TimeField)
+
+
+def normalize_conditions(conditions):
+    """
+    Returns a copy of conditions where the nodes that can be merged into their parent are, and duplicate children are
+    removed.
+    """
+    if not isinstance(conditions, Q):
+        return conditions
+
+    children = []
+    for child in conditions.children:
+        candidates = [child]
+        if isinstance(child, Q):
+            child = normalize_conditions(child)
+            mergeable = child.connector == conditions.connector or len(child.children) == 1
+            candidates = child.children if mergeable and not child.negated else [child]
+        for candidate in candidates:
+            if candidate not in children:
+                children.append(candidate)
+
+    normalized = Q()
+    normalized.children = children
+    normalized.connector = conditions.connector
+    normalized.negated = conditions.negated
+    return normalized
+
+
+def split_lookup(lookup):
+    """
+    Returns the path and the operator of lookup, or None as operator when it is not a comparison.
+    """
+    parts = lookup.split(LOOKUP_SEP)
+    if parts[-1] in RANGE_OPERATORS:
+        return LOOKUP_SEP.join(parts[:-1]), parts[-1]
+    if len(parts) > 1 and parts[-1] in Field.get_lookups():
+        return lookup, None
+    return lookup, 'exact'
+
+
+def get_compared_field(queryset, path):
+    """
+    Returns the field the values compared with path are converted by, from the annotations or the fields of the model
+    of queryset, or None when it is unknown.
+    """
+    if queryset is None:
+        return None
+    annotation = queryset.query.annotations.get(path)
+    if annotation is not None:
+        try:
+            return annotation.output_field
+        except FieldError:
+            return None
+    fields = get_lookup_fields(queryset.model, path)
+    if not fields or len(fields) != len(path.split(LOOKUP_SEP)):
+        return None
+    return get_value_field(fields[-1])
+
+
+def get_kind(value):
+    if isinstance(value, bool):
+        return bool
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return decimal.Decimal
+    if isinstance(value, datetime.datetime):
+        return datetime.datetime
+    return type(value)
+
+
+class ValueRange(object):
+    """
+    Values a path can take under a conjunction of comparisons, converted by `field` like the database converts them.
+    The range is unknown when field is not one of the `ORDERED_FIELDS`, or holds values of different kinds.
+    """
+
+    def __init__(self, field=None) -> None:
+        super().__init__()
+        self.field = field
+        self.kind = None
+        self.unknown = False
+        self.values = None
+        self.lower = None
+        self.lower_inclusive = True
+        self.upper = None
+        self.upper_inclusive = True
+
+    def check_kind(self, values):
+        for value in values:
+            kind = get_kind(value)
+            if self.kind is not None and kind is not self.kind:
+                self.unknown = True
+            self.kind = kind
+        return not self.unknown
+
+    def set_lower(self, value, inclusive):
+        if self.lower is None or value > self.lower or value == self.lower and not inclusive:
+            self.lower, self.lower_inclusive = value, inclusive
+
+    def set_upper(self, value, inclusive):
+        if self.upper is None or value < self.upper or value == self.upper and not inclusive:
+            self.upper, self.upper_inclusive = value, inclusive
+
+    def contains(self, value):
+        if self.lower is not None and (value < self.lower or value == self.lower and not self.lower_inclusive):
+            return False
+        if self.upper is not None and (value > self.upper or value == self.upper and not self.upper_inclusive):
+            return False
+        return True
+
+    def add(self, operator, value):
+        """
+        Restricts the range with a comparison, returning False once no value can satisfy every comparison added.
+        """
+        if operator == 'in':
+            if not isinstance(value, (list, tuple, set, frozenset)):
+                return True
+            # Django drops None from the values of `in` lookups
+            values = [item for item in value if item is not None]
+            if not values:
+                return False
+        elif operator == 'range':
+            if not isinstance(value, (list, tuple)) or len(value) != 2 or None in value:
+                return True
+            values = list(value)
+        elif value is None:
+            # An exact None is an `isnull` lookup, and comparisons with None are errors
+            return True
+        else:
+            values = [value]
+
+        if self.unknown or not isinstance(self.field, ORDERED_FIELDS):
+            return True
+        try:
+            values = [self.field.to_python(item) for item in values]
+        except (ValidationError, TypeError, ValueError):
+            self.unknown = True
+            return True
+        if not self.check_kind(values):
+            return True
+        value = values[0]
+
+        try:
+            if operator in ('exact', 'in'):
+                if self.values is not None:
+                    values = [item for item in values if item in self.values]
+                self.values = values
+            elif operator == 'range':
+                self.set_lower(values[0], True)
+                self.set_upper(values[1], True)
+            elif operator in ('gt', 'gte'):
+                self.set_lower(value, operator == 'gte')
+            else:
+                self.set_upper(value, operator == 'lte')
+            return self.is_satisfiable()
+        except TypeError:
+            self.unknown = True
+            return True
+
+    def is_satisfiable(self):
+        if self.lower is not None and self.upper is not None:
+            if self.lower > self.upper:
+                return False
+            if self.lower == self.upper and not (self.lower_inclusive and self.upper_inclusive):
+                return False
+        if self.values is not None:
+            return any(self.contains(value) for value in self.values)
+        return True
+
+
+def is_empty(conditions, queryset=None):
+    """
+    Returns whether conditions provably match no row of queryset, like an empty `in` lookup or mutually exclusive
+    comparisons of the same numeric or date path. Negated nodes are never analyzed, so False means unknown.
+    """
+    if not isinstance(conditions, Q) or conditions.negated or not conditions.children:
+        return False
+
+    if conditions.connector == Q.OR:
+        return all(is_empty(child if isinstance(child, Q) else Q(child), queryset) for child in conditions.children)
+
+    ranges = {}
+    for child in conditions.children:
+        if isinstance(child, Q):
+            if is_empty(child, queryset):
+                return True
+            continue
+        lookup, value = child
+        path, operator = split_lookup(lookup)
+        if operator is None:
+            continue
+        if path not in ranges:
+            ranges[path] = ValueRange(get_compared_field(queryset, path))
+        if not ranges[path].add(operator, value):
+            return True
+    return False
@@ -0,0 +1,34 @@
+from django.db.models import QuerySet
+
+import graphene
+
+from graphene_django_helpers.counting import ExactCount
+
+
+class CountableConnection(graphene.Connection):
+    """
+    Connection with a `totalCount` field. The count only runs when the field is selected, using the count strategy
+    set by the connection field or an exact count.
+    """
+
+    class Meta:
+        abstract = True
+
+    total_count = graphene.Int()
+
+    def resolve_total_count(self, info, **kwargs):
+        length = getattr(self, 'length', None)
+        if length is not None:
+            return length
+
+        iterable = self.iterable
+        if not isinstance(iterable, QuerySet):
+            return len(iterable)
+        if iterable._result_cache is not None:
+            return len(iterable._result_cache)
+        if iterable.query.is_empty():
+            return 0
+
+        count_strategy = getattr(self, 'count_strategy', None) or ExactCount()
+        self.length = count_strategy.count(iterable)
+        return self.length
@@ -0,0 +1,80 @@
+import time
+from contextlib import contextmanager
+
+from django.db import DatabaseError
+
+from graphql.error import GraphQLError
+
+# Costs of the arguments that do not declare one
+CHEAP_COST = 1
+UNINDEXED_COST = 5
+EXPENSIVE_COST = 10
+AGGREGATE_COST = 20
+
+# Lookups that can not use a B-tree index on the column
+EXPENSIVE_LOOKUPS = (
+    'contains', 'icontains', 'iexact', 'startswith', 'istartswith', 'endswith', 'iendswith', 'regex', 'iregex',
+    'search',
+)
+
+# SQLite virtual machine instructions run between two checks of the deadline
+SQLITE_PROGRESS_STEPS = 1000
+
+
+class QueryCostError(GraphQLError):
+    pass
+
+
+class QueryTimeoutError(GraphQLError):
+    pass
+
+
+def set_statement_timeout(connection, timeout):
+    """
+    Limits the duration of the statements run on connection to timeout seconds, or removes the limit when timeout is
+    None. SQLite has no statement timeout, a progress handler interrupts the statements past the deadline instead.
+    """
+    connection.ensure_connection()
+    if connection.vendor == 'sqlite':
+        if timeout is None:
+            connection.connection.set_progress_handler(None, 0)
+        else:
+            deadline = time.perf_counter() + timeout
+            connection.connection.set_progress_handler(lambda: time.perf_counter() > deadline, SQLITE_PROGRESS_STEPS)
+    elif connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            if timeout is None:
+                cursor.execute('SET statement_timeout TO DEFAULT')
+            else:
+                cursor.execute('SET statement_timeout = %s', [int(timeout * 1000)])
+    elif connection.vendor == 'mysql':
+        with connection.cursor() as cursor:
+            if timeout is None:
+                cursor.execute('SET SESSION max_execution_time = DEFAULT')
+            else:
+                cursor.execute('SET SESSION max_execution_time = %s', [int(timeout * 1000)])
+
+
+@contextmanager
+def statement_timeout(connection, timeout):
+    """
+    Runs the block with the statements of connection limited to timeout seconds, raising `QueryTimeoutError` when
+    one of them is cancelled. Statements are not limited when timeout is None.
+    """
+    if not timeout:
+        yield
+        return
+    start = time.perf_counter()
+    set_statement_timeout(connection, timeout)
+    try:
+        yield
+    except DatabaseError as e:
+        if time.perf_counter() - start < timeout:
+            raise
+        raise QueryTimeoutError('Query cancelled after {} seconds'.format(timeout)) from e
+    finally:
+        try:
+            set_statement_timeout(connection, None)
+        except DatabaseError:
+            # The transaction is aborted, and rolling it back restores the timeout
+            pass
@@ -0,0 +1,134 @@
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import class_prepared, post_delete, post_init, post_save, pre_save
+
+from graphene_django_helpers.lookups import get_lookup_fields, get_reverse_lookup
+
+# Every counter cache declared, in declaration order
+counter_caches = []
+
+
+class CounterCache(object):
+    """
+    Denormalized count of the rows of `relation`, a one-to-many relation of `model`, kept in the integer column
+    `field_name` of model, which should be indexed.
+
+    The column is updated with `F()` expressions, so concurrent writes do not lose counts, when the related rows are
+    created, deleted or moved to another row of model. Bulk operations that do not send `post_save`/`post_delete`, like
+    `bulk_create` or `update`, are not tracked: `rebuild` recomputes every count, and the `rebuild_counter_caches`
+    command rebuilds them all. Saving a row of model keeps the count in the database, unless `update_fields` names
+    the column.
+
+    Filters declaring the counter cache lookup the column instead of annotating the count while it is `enabled`.
+    Filter plans are compiled once, so `enabled` is meant to be set when the cache is declared.
+    """
+
+    def __init__(self, model, field_name, relation, enabled=True) -> None:
+        super().__init__()
+        self.model = model
+        self.field_name = field_name
+        self.relation = relation
+        self.enabled = enabled
+        self._related = None
+        counter_caches.append(self)
+        self.uid = 'graphene_django_helpers.counters.{}.{}'.format(model._meta.label_lower, field_name)
+        apps.lazy_model_operation(self.connect_related, (model._meta.app_label, model._meta.model_name))
+
+    def __str__(self):
+        return '{}.{}'.format(self.model._meta.label_lower, self.field_name)
+
+    def connect_related(self, *args, **kwargs):
+        """
+        Connects the signals of the related model once it is loaded, so the instances of other models do not go
+        through them.
+        """
+        try:
+            self.model._meta.get_field(self.relation)
+        except FieldDoesNotExist:
+            # The reverse relation appears when the related model is loaded
+            class_prepared.connect(self.connect_related, dispatch_uid='{}.class_prepared'.format(self.uid))
+            return
+        class_prepared.disconnect(dispatch_uid='{}.class_prepared'.format(self.uid))
+        related_model = self.related[0]
+        post_init.connect(self.remember_key, sender=related_model, dispatch_uid='{}.post_init'.format(self.uid))
+        post_save.connect(self.update_saved, sender=related_model, dispatch_uid='{}.post_save'.format(self.uid))
+        post_delete.connect(self.update_deleted, sender=related_model, dispatch_uid='{}.post_delete'.format(self.uid))
+        pre_save.connect(self.keep_count, sender=self.model, dispatch_uid='{}.pre_save'.format(self.uid))
+        post_save.connect(self.reload_count, sender=self.model, dispatch_uid='{}.post_save.model'.format(self.uid))
+
+    @property
+    def related(self):
+        """
+        Returns the related model and the attribute name of its foreign key to model, resolved once the apps are
+        ready.
+        """
+        if self._related is None:
+            related_model, outer_lookup = get_reverse_lookup(self.model, self.relation)
+            self._related = related_model, get_lookup_fields(related_model, outer_lookup)[0].attname
+        return self._related
+
+    @property
+    def previous_key_attribute(self):
+        return '_counter_cache_{}_{}'.format(self.model._meta.model_name, self.field_name)
+
+    def is_counted(self, sender):
+        return issubclass(sender, self.related[0])
+
+    def update(self, pk, delta, using=None):
+        if pk is not None:
+            manager = self.model._base_manager.db_manager(using)
+            manager.filter(pk=pk).update(**{self.field_name: F(self.field_name) + delta})
+
+    def remember_key(self, sender, instance, **kwargs):
+        # Deferred foreign keys are unknown, and never counted as moved
+        if self.is_counted(sender) and self.related[1] in instance.__dict__:
+            instance.__dict__[self.previous_key_attribute] = instance.__dict__[self.related[1]]
+
+    def update_saved(self, sender, instance, created, raw=False, using=None, **kwargs):
+        if raw or not self.is_counted(sender):
+            return
+        key = getattr(instance, self.related[1])
+        if created:
+            self.update(key, 1, using)
+        elif self.previous_key_attribute in instance.__dict__:
+            previous_key = instance.__dict__[self.previous_key_attribute]
+            if previous_key != key:
+                self.update(previous_key, -1, using)
+                self.update(key, 1, using)
+        instance.__dict__[self.previous_key_attribute] = key
+
+    def keep_count(self, sender, instance, raw=False, update_fields=None, **kwargs):
+        # The count loaded with instance may be stale, so the update writes the column back as it is
+        if raw or instance._state.adding or (update_fields is not None and self.field_name in update_fields):
+            return
+        field = self.model._meta.get_field(self.field_name)
+        if field.attname in instance.__dict__:
+            instance.__dict__[field.attname] = F(field.attname)
+
+    def reload_count(self, sender, instance, **kwargs):
+        # Deferred, it is read from the database the next time it is accessed
+        attname = self.model._meta.get_field(self.field_name).attname
+        if isinstance(instance.__dict__.get(attname), F):
+            del instance.__dict__[attname]
+
+    def update_deleted(self, sender, instance, using=None, **kwargs):
+        if self.is_counted(sender):
+            key = instance.__dict__.get(self.previous_key_attribute, getattr(instance, self.related[1]))
+            self.update(key, -1, using)
+
+    def get_count_expression(self):
+        related_model, outer_key = self.related
+        queryset = related_model._base_manager.filter(**{outer_key: OuterRef('pk')}).order_by().values(outer_key)
+        queryset = queryset.annotate(value=Count('pk')).values('value')
+        return Coalesce(Subquery(queryset), Value(0))
+
+    def rebuild(self, queryset=None):
+        """
+        Recomputes the counts of the rows of queryset, every row of model by default, in one statement, and returns
+        the number of rows updated.
+        """
+        if queryset is None:
+            queryset = self.model._base_manager.all()
+        return queryset.update(**{self.field_name: self.get_count_expression()})
@@ -0,0 +1,103 @@
+import hashlib
+import json
+
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+
+class CountStrategy(object):
+    def count(self, queryset):
+        raise NotImplementedError
+
+
+class ExactCount(CountStrategy):
+    def count(self, queryset):
+        return queryset.count()
+
+
+class CappedCount(CountStrategy):
+    """
+    Counts at most `cap` rows with a `COUNT` over a `LIMIT` subquery, so the cost is bounded whatever the size of
+    the table. Results equal to the cap mean "cap or more".
+    """
+
+    def __init__(self, cap=1000) -> None:
+        super().__init__()
+        self.cap = cap
+
+    def count(self, queryset):
+        return queryset[:self.cap].count()
+
+
+class ExplainCount(CountStrategy):
+    """
+    Uses the row estimate of the query planner when it is above `cap` and an exact count otherwise, where the
+    estimate is least reliable. Estimates are only available on PostgreSQL, other backends use `fallback`.
+    """
+
+    def __init__(self, cap=1000, fallback=None) -> None:
+        super().__init__()
+        self.cap = cap
+        self.fallback = fallback or CappedCount(cap=cap)
+
+    def parse_estimate(self, plan):
+        """
+        Returns the row estimate of the JSON plan of a statement, decoded by psycopg2 or as text.
+        """
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def get_estimate(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        # QuerySet.explain() joins the decoded plan with str() on Django 2.x, which is not JSON
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) {}'.format(sql), params)
+            return self.parse_estimate(cursor.fetchone()[0])
+
+    def count(self, queryset):
+        estimate = self.get_estimate(queryset)
+        if estimate is None:
+            return self.fallback.count(queryset)
+        if estimate > self.cap:
+            return estimate
+        return queryset.count()
+
+
+class CachedCount(CountStrategy):
+    """
+    Caches the result of `strategy` for `timeout` seconds in the Django cache, keyed by the SQL of the queryset.
+    """
+
+    key_prefix = 'graphene_django_helpers:count'
+
+    def __init__(self, timeout=60, strategy=None, cache_alias='default') -> None:
+        super().__init__()
+        self.timeout = timeout
+        self.strategy = strategy or ExactCount()
+        self.cache_alias = cache_alias
+
+    def get_cache_key(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        digest = hashlib.md5('{}:{}:{}'.format(queryset.db, sql, params).encode('utf-8')).hexdigest()
+        return '{}:{}'.format(self.key_prefix, digest)
+
+    def count(self, queryset):
+        cache = caches[self.cache_alias]
+        try:
+            key = self.get_cache_key(queryset)
+        except EmptyResultSet:
+            # The conditions match no row
+            return 0
+        count = cache.get(key)
+        if count is None:
+            count = self.strategy.count(queryset)
+            cache.set(key, count, self.timeout)
+        return count
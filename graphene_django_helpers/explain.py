@@ -0,0 +1,79 @@
+import re
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from graphene_django_helpers.tracing import get_duration
+
+# SQLite
+SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+SQLITE_TEMP_BTREE = re.compile(r'^USE TEMP B-TREE FOR (.+)$')
+SQLITE_INDEX = re.compile(r'USING (?:COVERING )?INDEX (\w+)|USING (INTEGER PRIMARY KEY)')
+# PostgreSQL
+POSTGRESQL_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+POSTGRESQL_SORT = re.compile(r'(?:^|-> +)(?:Incremental )?Sort +\(')
+POSTGRESQL_INDEX = re.compile(r'(?:Index Scan|Index Only Scan|Bitmap Index Scan)(?: Backward)? (?:using|on) (\w+)')
+
+
+@contextmanager
+def capture_statements(connection):
+    """
+    Collects the `(sql, params, duration)` of the statements run on connection in the block, durations in
+    milliseconds.
+    """
+    statements = []
+
+    def execute_wrapper(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            statements.append((sql, params, get_duration(start)))
+
+    with connection.execute_wrapper(execute_wrapper):
+        yield statements
+
+
+def summarize_plan(lines):
+    """
+    Returns the full table scans, the temporary B-trees or sorts and the indexes found in the lines of a SQLite or
+    PostgreSQL plan.
+    """
+    full_scans = []
+    temp_btrees = []
+    indexes = []
+    for line in lines:
+        detail = line.strip()
+        match = SQLITE_SCAN.match(detail) or POSTGRESQL_SEQ_SCAN.search(detail)
+        if match:
+            full_scans.append(match.group(1))
+        match = SQLITE_TEMP_BTREE.match(detail)
+        if match:
+            temp_btrees.append(match.group(1))
+        elif POSTGRESQL_SORT.search(detail):
+            temp_btrees.append('SORT')
+        for match in SQLITE_INDEX.finditer(detail):
+            indexes.append(match.group(1) or match.group(2))
+        for match in POSTGRESQL_INDEX.finditer(detail):
+            indexes.append(match.group(1))
+    return OrderedDict([
+        ('full_scans', full_scans),
+        ('temp_btrees', temp_btrees),
+        ('indexes', indexes),
+    ])
+
+
+def explain_statement(connection, sql, params):
+    """
+    Returns the lines of the plan of sql, one per node.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('{} {}'.format(connection.ops.explain_query_prefix(), sql), params)
+        # SQLite returns the ids of the nodes before their detail, PostgreSQL one line of text per row
+        return [str(row[-1]) for row in cursor.fetchall()]
+
+
+def is_explainable(connection, sql):
+    # Django < 2.1 can not explain queries
+    supported = getattr(connection.features, 'supports_explaining_query_execution', False)
+    return supported and sql.lstrip()[:6].upper() == 'SELECT'
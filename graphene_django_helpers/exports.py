@@ -0,0 +1,110 @@
+import csv
+import json
+from collections import OrderedDict
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+import graphene
+from graphene.types.structures import List, NonNull
+
+
+class ExportInfo(object):
+    """
+    Stand-in for the resolve info given to the arguments when a field is exported outside of a GraphQL execution.
+    """
+
+    def __init__(self, context, field_name) -> None:
+        super().__init__()
+        self.context = context
+        self.field_name = field_name
+        self.path = None
+
+
+def get_argument_type(argument):
+    of_type = argument.of_type
+    if isinstance(of_type, graphene.Argument):
+        return of_type.type
+    return of_type.get_type()
+
+
+def parse_argument_value(argument, values):
+    """
+    Returns the value of argument from the query string values given for it, raising ValueError when it is invalid.
+    """
+    graphene_type = get_argument_type(argument)
+    if isinstance(graphene_type, NonNull):
+        graphene_type = graphene_type.of_type
+    if isinstance(graphene_type, List):
+        return [parse_scalar_value(graphene_type.of_type, value) for value in values]
+    return parse_scalar_value(graphene_type, values[-1])
+
+
+def parse_scalar_value(graphene_type, value):
+    if isinstance(graphene_type, NonNull):
+        graphene_type = graphene_type.of_type
+    if graphene_type is graphene.Boolean:
+        if value.lower() not in ('true', 'false', '1', '0'):
+            raise ValueError('"{}" is not a boolean'.format(value))
+        return value.lower() in ('true', '1')
+    parsed = graphene_type.parse_value(value)
+    if parsed is None:
+        raise ValueError('"{}" is not a valid {}'.format(value, graphene_type.__name__))
+    return parsed
+
+
+class NDJSONWriter(object):
+    content_type = 'application/x-ndjson'
+    extension = 'ndjson'
+
+    def __init__(self, columns) -> None:
+        super().__init__()
+        self.columns = columns
+
+    def get_header(self):
+        return ''
+
+    def get_row(self, values):
+        return json.dumps(OrderedDict(zip(self.columns, values)), cls=DjangoJSONEncoder) + '\n'
+
+
+class Echo(object):
+    """
+    File-like object that returns what is written to it, so `csv.writer` formats rows without buffering them.
+    """
+
+    def write(self, value):
+        return value
+
+
+class CSVWriter(object):
+    content_type = 'text/csv'
+    extension = 'csv'
+
+    def __init__(self, columns) -> None:
+        super().__init__()
+        self.columns = columns
+        self.writer = csv.writer(Echo())
+
+    def get_header(self):
+        return self.writer.writerow(self.columns)
+
+    def get_row(self, values):
+        return self.writer.writerow(values)
+
+
+def stream_rows(writer, rows, chunk_size):
+    """
+    Yields the header of writer and then rows formatted by writer, joined in chunks of chunk_size rows. Rows are only
+    pulled from the database as the chunks are consumed, so at most one chunk is held in memory.
+    """
+    header = writer.get_header()
+    if header:
+        yield header
+    chunk = []
+    for values in rows:
+        chunk.append(writer.get_row(values))
+        if len(chunk) >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
@@ -1,30 +1,214 @@
-from functools import partial
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from types import MappingProxyType
 
-from django.db.models import QuerySet
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models import Exists, OuterRef, QuerySet
+from django.db.models.constants import LOOKUP_SEP
 
 import graphene
 from graphene import Field
+from graphene.types.structures import Structure
+from graphene.types.unmountedtype import UnmountedType
+from graphene.relay import PageInfo
+
+from graphene_django_helpers.annotations import AnnotationRegistry
+from graphene_django_helpers.arguments import Argument
+from graphene_django_helpers.batching import get_loader
+from graphene_django_helpers.caching import ResultCache
+from graphene_django_helpers.conditions import is_empty, normalize_conditions
+from graphene_django_helpers.costs import QueryCostError, statement_timeout
+from graphene_django_helpers.counting import ExactCount
+from graphene_django_helpers.explain import capture_statements, explain_statement, is_explainable, summarize_plan
+from graphene_django_helpers.lookups import get_reverse_lookup
+from graphene_django_helpers.optimizer import QuerysetOptimizer
+from graphene_django_helpers.pagination import KeysetPaginator, OffsetPaginator
+from graphene_django_helpers.selections import get_node_selection
+from graphene_django_helpers.tracing import get_filter_trace
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def null_context(value=None):
+    yield value
+
+
+def map_arguments(arguments):
+    # Ordered like the declarations, which is the order filters are applied in
+    argument_map = OrderedDict()
+    for argument in arguments:
+        argument_item_mapping = argument.get_mapping()
+        if argument_item_mapping:
+            argument_map.update(argument_item_mapping)
+
+    return argument_map
+
+
+def check_argument_map(argument_map, field_class):
+    # The filter plan resolved for a request is passed to the stages as filter_plan
+    if 'filter_plan' in argument_map:
+        raise ImproperlyConfigured('Argument "filter_plan" of {} is reserved'.format(field_class.__name__))
+
+
+def mount_arguments(argument_map):
+    """
+    Returns the graphene arguments of argument_map, ordered like graphene orders the arguments given as kwargs.
+    """
+    arguments = []
+    for key, argument in argument_map.items():
+        of_type = argument['instance'].of_type
+        if not isinstance(of_type, graphene.Argument):
+            of_type = graphene.Argument.mounted(of_type)
+        arguments.append((key, of_type))
+    return OrderedDict(sorted(arguments, key=lambda item: item[1]))
+
+
+class FilterPlan(object):
+    """
+    Compiled view of the arguments of a field for a given set of provided argument keys.
+
+    Entries are `(key, instance, params)` tuples ordered as the arguments were declared in the field, with the params
+    already compiled by `Argument.compile_params`. Each stage only keeps the arguments that override its hook, and
+    the conditions of filters compiled to `EXISTS` subqueries are kept apart in `exists`.
+    `annotations` holds the annotations declared by the arguments, each one applied once, and `routing` the entries
+    of the arguments declaring a routing rule. `cost` adds up the costs of the arguments.
+    """
+
+    def __init__(self, entries, annotations=None) -> None:
+        super().__init__()
+        self.entries = tuple(entries)
+        self.annotations = annotations or AnnotationRegistry()
+        self.related_models = {}
+        self.before = self.get_stage_entries('alter_queryset_before')
+        conditions = self.get_stage_entries('alter_filter_conditions')
+        self.conditions = tuple(entry for entry in conditions if 'exists_relation' not in entry[2])
+        self.exists = tuple(entry for entry in conditions if 'exists_relation' in entry[2])
+        # Tables joined again by queryset methods, by argument key, once they have been reported
+        self.extra_joins = {}
+        # Whether the plan of a statement slower than the threshold of the field has been logged
+        self.slow_plan_logged = False
+        self.after = self.get_stage_entries('alter_queryset_after')
+        self.routing = tuple(entry for entry in self.entries if entry[1].routing is not None)
+        self.cost = sum(params.get('cost', 0) for key, instance, params in self.entries)
+
+    def get_stage_entries(self, hook):
+        default = getattr(Argument, hook)
+        return tuple(entry for entry in self.entries if getattr(type(entry[1]), hook) is not default)
+
+    def get_related_models(self, field, model):
+        if model not in self.related_models:
+            models = self.annotations.get_related_models(model)
+            for key, instance, params in self.entries:
+                models.extend(instance.get_related_models(field, model, params))
+            self.related_models[model] = models
+        return self.related_models[model]
 
 
 class FieldWithArgumentsMixin(object):
     arguments = []
+    filter_plan_cache_size = 128
+    queryset_optimization = False
+    queryset_projection = False
+    queryset_optimizer_class = QuerysetOptimizer
+    annotation_registry_class = AnnotationRegistry
+    condition_analysis = True
+    cache_results = False
+    cache_results_timeout = 60
+    cache_results_alias = 'default'
+    cache_results_max_entries = 1000
+    cache_results_models = []
+    routing_rules = []
+    # Highest cost of the arguments given at once, and seconds the statements of the field may run, when set
+    cost_budget = None
+    statement_timeout = None
+    # Attach the plans of the statements of the field to its filter trace, and log the plan of the first statement
+    # slower than explain_threshold milliseconds of each filter plan
+    explain_plans = False
+    explain_threshold = None
 
     def __init__(self, *args, **kwargs):
-        self.argument_map = self.build_argument_map()
-        for key, argument in self.argument_map.items():
-            # @TODO - We should change how we set the arguments as long as name, type and description are kwargs of
-            # @TODO - graphene.Field. We should find another way to define arguments
-            kwargs.setdefault(key, argument['instance'].of_type)
-        super().__init__(*args, **kwargs)
-
-    def build_argument_map(self):
-        argument_map = {}
-        for argument in self.arguments:
-            argument_item_mapping = argument.get_mapping()
-            if argument_item_mapping:
-                argument_map.update(argument_item_mapping)
-
-        return argument_map
+        if self.has_instance_arguments():
+            self.argument_map = self.build_instance_argument_map()
+            check_argument_map(self.argument_map, type(self))
+            graphene_arguments = mount_arguments(self.argument_map)
+        else:
+            self.argument_map = self.get_argument_map()
+            graphene_arguments = self.get_graphene_arguments()
+        # Queries not run because the conditions of the arguments matched no row
+        self.skipped_queries = 0
+        self.pinned_filter_plans = {}
+        self.get_cached_filter_plan = lru_cache(maxsize=self.filter_plan_cache_size)(self.compile_filter_plan)
+        self.result_cache = ResultCache(
+            self,
+            timeout=self.cache_results_timeout,
+            alias=self.cache_results_alias,
+            max_entries=self.cache_results_max_entries,
+        )
+        # Arguments are passed apart from the kwargs of graphene.Field, so they can be named like its parameters
+        arguments = OrderedDict(
+            (key, argument) for key, argument in graphene_arguments.items()
+            if not isinstance(kwargs.get(key), (graphene.Argument, UnmountedType))
+        )
+        arguments.update(kwargs.pop('args', None) or {})
+        super().__init__(*args, args=arguments, **kwargs)
+
+    @classmethod
+    def build_argument_map(cls):
+        return map_arguments(cls.arguments)
+
+    def has_instance_arguments(self):
+        """
+        Whether the arguments of the field are set on the instance, or mapped by a `build_argument_map` instance
+        method, in which case the field gets its own argument map instead of the one shared by its class.
+        """
+        return 'arguments' in self.__dict__ or not self.maps_arguments_by_class()
+
+    def maps_arguments_by_class(self):
+        return isinstance(inspect.getattr_static(type(self), 'build_argument_map'), classmethod)
+
+    def build_instance_argument_map(self):
+        """
+        Returns the argument map of the instance, which its instance methods may change like before argument maps
+        were shared.
+        """
+        if self.maps_arguments_by_class():
+            # The class method only maps the arguments declared on the class
+            return map_arguments(self.arguments)
+        return self.build_argument_map()
+
+    @classmethod
+    def get_argument_map(cls):
+        """
+        Returns the argument map of the class, built the first time it is needed and shared, read only, by all its
+        instances. It is stored in the class itself, so subclasses declaring other arguments get their own.
+        """
+        if '_argument_map' not in cls.__dict__:
+            argument_map = cls.build_argument_map()
+            check_argument_map(argument_map, cls)
+            cls._argument_map = MappingProxyType(OrderedDict(
+                (key, MappingProxyType({
+                    'instance': argument['instance'],
+                    'params': MappingProxyType(argument['params']),
+                }))
+                for key, argument in argument_map.items()
+            ))
+        return cls._argument_map
+
+    @classmethod
+    def get_graphene_arguments(cls):
+        """
+        Returns the graphene arguments of the class, mounted once from the types of its arguments and shared by all its
+        instances, ordered like graphene orders the arguments given as kwargs.
+        """
+        if '_graphene_arguments' not in cls.__dict__:
+            cls._graphene_arguments = mount_arguments(cls.get_argument_map())
+        return cls._graphene_arguments
 
     def get_argument_instances(self, **args):
         for key in args:
@@ -32,31 +216,326 @@ class FieldWithArgumentsMixin(object):
             if argument:
                 yield key, argument['instance'], argument['params']
 
-    def alter_queryset_before(self, queryset, info, **args):
-        for key, instance, params in self.get_argument_instances(**args):
+    def get_node_type(self):
+        """
+        Returns the type of the nodes this field resolves, the node type of connections.
+        """
+        graphene_type = self.type
+        while isinstance(graphene_type, Structure):
+            graphene_type = graphene_type.of_type
+        node = getattr(getattr(graphene_type, '_meta', None), 'node', None)
+        return node if node is not None else graphene_type
+
+    def get_model(self):
+        """
+        Returns the model of the nodes this field resolves, or None when it is not a Django type.
+        """
+        return getattr(getattr(self.get_node_type(), '_meta', None), 'model', None)
+
+    def compile_filter_plan(self, keys):
+        model = self.get_model()
+        arguments = [
+            (key, argument['instance'], dict(argument['params'], model=model))
+            for key, argument in self.argument_map.items() if key in keys
+        ]
+
+        joins = []
+        if model is not None:
+            joins = [(instance, instance.get_joins(self, model, params)) for key, instance, params in arguments]
+
+        annotations = self.annotation_registry_class()
+        for key, instance, params in arguments:
+            params['multi_valued_joins'] = sorted(set(
+                path for other, paths in joins if other is not instance for path in paths
+            ))
+            for alias, expression in instance.get_annotations(self, params).items():
+                annotations.register(alias, expression)
+
+        entries = []
+        for key, instance, params in arguments:
+            params['annotation_aliases'] = annotations.aliases
+            entries.append((key, instance, instance.compile_params(self, params)))
+        return FilterPlan(entries, annotations=annotations)
+
+    def get_filter_plan(self, filter_plan=None, **args):
+        """
+        Returns the filter plan of the argument keys of args, or filter_plan when it was already resolved for the
+        request.
+        """
+        if filter_plan is not None:
+            return filter_plan
+        keys = frozenset(key for key in args if key in self.argument_map)
+        plan = self.pinned_filter_plans.get(keys)
+        if plan is None:
+            plan = self.get_cached_filter_plan(keys)
+        return plan
+
+    def pin_filter_plan(self, keys):
+        """
+        Compiles the filter plan of the argument keys, and keeps it out of the LRU cache so it is never evicted.
+        """
+        keys = frozenset(key for key in keys if key in self.argument_map)
+        if keys not in self.pinned_filter_plans:
+            self.pinned_filter_plans[keys] = self.compile_filter_plan(keys)
+        return self.pinned_filter_plans[keys]
+
+    def alter_queryset_before(self, queryset, info, filter_plan=None, **args):
+        trace = get_filter_trace(info)
+        for key, instance, params in self.get_filter_plan(filter_plan, **args).before:
+            if trace is not None:
+                start = time.perf_counter()
             queryset = instance.alter_queryset_before(self, queryset, params, args[key], info)
+            if trace is not None:
+                trace.add_argument(info, key, 'alter_queryset_before', start)
         return queryset
 
-    def alter_queryset_after(self, queryset, info, **args):
-        for key, instance, params in self.get_argument_instances(**args):
+    def alter_queryset_after(self, queryset, info, filter_plan=None, **args):
+        trace = get_filter_trace(info)
+        plan = self.get_filter_plan(filter_plan, **args)
+        for key, instance, params in plan.after:
+            if trace is not None:
+                start = time.perf_counter()
+            tables = self.get_joined_tables(queryset) if 'method' in params else None
             queryset = instance.alter_queryset_after(self, queryset, params, args[key], info)
+            extra_joins = self.get_extra_joins(tables, queryset) if tables is not None else None
+            if extra_joins and key not in plan.extra_joins:
+                plan.extra_joins[key] = extra_joins
+                logger.warning(
+                    'Method of argument "%s" of %s joins %s again in its own filter() call, a conditions_method would '
+                    'share the joins of the other conditions',
+                    key, type(self).__name__, ', '.join(extra_joins),
+                )
+            if trace is not None:
+                trace.add_argument(info, key, 'alter_queryset_after', start, extra_joins=extra_joins)
         return queryset
 
-    def alter_filter_conditions(self, conditions, info, **args):
-        for key, instance, params in self.get_argument_instances(**args):
+    def get_joined_tables(self, queryset):
+        return [join.table_name for join in queryset.query.alias_map.values()]
+
+    def get_extra_joins(self, tables, queryset):
+        """
+        Returns the tables of tables that queryset joins again, besides the joins in tables.
+        """
+        return [table for table in self.get_joined_tables(queryset)[len(tables):] if table in tables]
+
+    def alter_filter_conditions(self, conditions, info, filter_plan=None, **args):
+        trace = get_filter_trace(info)
+        for key, instance, params in self.get_filter_plan(filter_plan, **args).conditions:
+            if trace is not None:
+                start = time.perf_counter()
             conditions = instance.alter_filter_conditions(self, conditions, params, args[key], info)
+            if trace is not None:
+                trace.add_argument(info, key, 'alter_filter_conditions', start)
         return conditions
 
+    def filter_related_rows(self, queryset, info, filter_plan=None, **args):
+        """
+        Filters queryset with one correlated `EXISTS` subquery per multi-valued relation, holding the conditions of
+        every filter on that relation.
+        """
+        trace = get_filter_trace(info)
+        relations = OrderedDict()
+        for key, instance, params in self.get_filter_plan(filter_plan, **args).exists:
+            if trace is not None:
+                start = time.perf_counter()
+            relation = params['exists_relation']
+            conditions = relations.get(relation)
+            relations[relation] = instance.alter_filter_conditions(self, conditions, params, args[key], info)
+            if trace is not None:
+                trace.add_argument(info, key, 'alter_filter_conditions', start)
+
+        for relation, conditions in relations.items():
+            related_model, outer_lookup = get_reverse_lookup(queryset.model, relation)
+            if self.condition_analysis:
+                conditions = normalize_conditions(conditions)
+                if is_empty(conditions, related_model._base_manager.all()):
+                    return self.get_empty_queryset(queryset, info, **args)
+            if not conditions:
+                continue
+            related_queryset = related_model._base_manager.filter(conditions, **{outer_lookup: OuterRef('pk')})
+            alias = '{}_exists'.format(relation.replace(LOOKUP_SEP, '_'))
+            # Django 2.x can only filter on an EXISTS once it has been annotated
+            queryset = queryset.annotate(**{alias: Exists(related_queryset.order_by())}).filter(**{alias: True})
+        return queryset
+
+    def get_empty_queryset(self, queryset, info, **args):
+        """
+        Returns the queryset resolved when the conditions of the arguments provably match no row, which never runs a
+        query.
+        """
+        self.skipped_queries += 1
+        trace = get_filter_trace(info)
+        if trace is not None:
+            trace.add_skipped_query(info)
+        return queryset.none()
+
+    def optimize_queryset(self, queryset, info, **args):
+        node_type, tree = get_node_selection(info)
+        if not tree:
+            return queryset
+        optimizer = self.queryset_optimizer_class(
+            info,
+            select_related=self.queryset_optimization,
+            projection=self.queryset_projection,
+        )
+        return optimizer.optimize(queryset, node_type, tree)
+
+    def get_database(self, queryset, info, filter_plan=None, **args):
+        """
+        Returns the database picked by the routing rules of the given arguments, then by those of the field, or None.
+        """
+        for key, instance, params in self.get_filter_plan(filter_plan, **args).routing:
+            database = instance.routing.get_database(self, queryset, info, args)
+            if database:
+                return database
+        for rule in self.routing_rules:
+            database = rule.get_database(self, queryset, info, args)
+            if database:
+                return database
+        return None
+
+    def route_queryset(self, queryset, info, filter_plan=None, **args):
+        database = self.get_database(queryset, info, filter_plan=filter_plan, **args)
+        if database and database != queryset.db:
+            queryset = queryset.using(database)
+        return queryset
+
+    def get_related_models(self, model, filter_plan=None, **args):
+        plan = self.get_filter_plan(filter_plan, **args)
+        return plan.get_related_models(self, model) + list(self.cache_results_models)
+
+    def annotate_queryset(self, queryset, info, filter_plan=None, **args):
+        return self.get_filter_plan(filter_plan, **args).annotations.annotate(queryset)
+
+    def check_cost(self, info, filter_plan=None, **args):
+        """
+        Raises `QueryCostError` when the arguments given cost more than `cost_budget`.
+        """
+        if self.cost_budget is None:
+            return
+        cost = self.get_filter_plan(filter_plan, **args).cost
+        if cost > self.cost_budget:
+            raise QueryCostError('Arguments of {} cost {}, over the budget of {}'.format(
+                info.field_name, cost, self.cost_budget,
+            ))
+
+    def filter_queryset(self, queryset, info, filter_plan=None, **args):
+        """
+        Returns queryset filtered by every stage of the filter plan of args, without the optimizations that depend on
+        the selection of the query, so it can also be used outside of a GraphQL execution.
+        """
+        filter_plan = self.get_filter_plan(filter_plan, **args)
+        self.check_cost(info, filter_plan=filter_plan, **args)
+        queryset = self.alter_queryset_before(queryset, info, filter_plan=filter_plan, **args)
+        queryset = self.annotate_queryset(queryset, info, filter_plan=filter_plan, **args)
+        conditions = None
+        conditions = self.alter_filter_conditions(conditions, info, filter_plan=filter_plan, **args)
+        if self.condition_analysis:
+            conditions = normalize_conditions(conditions)
+            if is_empty(conditions, queryset):
+                return self.get_empty_queryset(queryset, info, **args)
+        if conditions:
+            queryset = queryset.filter(conditions)
+        queryset = self.filter_related_rows(queryset, info, filter_plan=filter_plan, **args)
+        return self.alter_queryset_after(queryset, info, filter_plan=filter_plan, **args)
+
+    def process_queryset(self, queryset, info, filter_plan=None, **args):
+        queryset = self.filter_queryset(queryset, info, filter_plan=filter_plan, **args)
+        if self.queryset_optimization or self.queryset_projection:
+            queryset = self.optimize_queryset(queryset, info, **args)
+        return queryset
+
+    def resolve_queryset(self, queryset, info, filter_plan=None, **args):
+        return self.process_queryset(queryset, info, filter_plan=filter_plan, **args)
+
+    def get_cached_nodes(self, queryset, info, ids, **args):
+        queryset = queryset.filter(pk__in=ids)
+        if self.queryset_optimization or self.queryset_projection:
+            queryset = self.optimize_queryset(queryset, info, **args)
+        nodes = dict((node.pk, node) for node in queryset)
+        return [nodes[pk] for pk in ids if pk in nodes]
+
+    def dump_cached_result(self, result):
+        result = list(result)
+        return result, [node.pk for node in result]
+
+    def load_cached_result(self, queryset, info, value, filter_plan=None, **args):
+        return self.get_cached_nodes(queryset, info, value, **args)
+
+    def resolve_results(self, root, info, queryset, filter_plan=None, **args):
+        if self.cache_results:
+            return self.result_cache.resolve(root, info, queryset, args, filter_plan=filter_plan)
+        return self.resolve_queryset(queryset, info, filter_plan=filter_plan, **args)
+
+    @contextmanager
+    def capture_trace(self, info, using):
+        """
+        Records the statements run on the database using in the block in the filter trace of the field, if any.
+        """
+        trace = get_filter_trace(info)
+        if trace is None:
+            yield None
+            return
+        with trace.capture(info, using) as field:
+            yield field
+
+    def resolve_arguments(self, root, info, queryset, filter_plan=None, **args):
+        explain = self.explain_plans or self.explain_threshold is not None
+        traced = get_filter_trace(info) is not None
+        if not self.statement_timeout and not explain and not traced:
+            return self.resolve_results(root, info, queryset, filter_plan=filter_plan, **args)
+
+        connection = connections[queryset.db]
+        statements = []
+        # The statements setting the timeout and explaining the plans are kept out of the trace
+        with statement_timeout(connection, self.statement_timeout):
+            with capture_statements(connection) if explain else null_context(statements) as statements:
+                with self.capture_trace(info, queryset.db):
+                    result = self.resolve_results(root, info, queryset, filter_plan=filter_plan, **args)
+                    # Lists are evaluated here, so their SQL runs under the timeout, is traced and explained
+                    if isinstance(result, QuerySet):
+                        result = list(result)
+        if statements:
+            self.explain_statements(connection, statements, info, filter_plan=filter_plan, **args)
+        return result
+
+    def explain_statements(self, connection, statements, info, filter_plan=None, **args):
+        """
+        Explains the statements the field ran, attaching their plans to the filter trace when `explain_plans` is set,
+        and logging the plan of the first one slower than `explain_threshold` for each filter plan.
+        """
+        trace = get_filter_trace(info) if self.explain_plans else None
+        plan = self.get_filter_plan(filter_plan, **args)
+        for sql, params, duration in statements:
+            slow = not plan.slow_plan_logged and self.explain_threshold is not None
+            slow = slow and duration > self.explain_threshold
+            if (trace is None and not slow) or not is_explainable(connection, sql):
+                continue
+            lines = explain_statement(connection, sql, params)
+            summary = summarize_plan(lines)
+            if trace is not None:
+                entry = OrderedDict([('sql', sql), ('duration', duration)])
+                entry.update(summary)
+                entry['plan'] = lines
+                trace.add_plan(info, entry)
+            if slow:
+                plan.slow_plan_logged = True
+                logger.warning(
+                    'Statement of %s with arguments %s took %sms, over %sms, full scans: %s, temporary B-trees: %s, '
+                    'plan:\n%s\n%s',
+                    type(self).__name__, ', '.join(sorted(key for key in args if key in self.argument_map)) or 'none',
+                    duration, self.explain_threshold, ', '.join(summary['full_scans']) or 'none',
+                    ', '.join(summary['temp_btrees']) or 'none', '\n'.join(lines), sql,
+                )
+
     @classmethod
     def resolve_and_process_arguments(cls, root, info, parent_resolver=None, field_instance=None, **args):
         iterable = parent_resolver(root, info, **args)
         if field_instance and isinstance(iterable, QuerySet):
-            iterable = field_instance.alter_queryset_before(iterable, info, **args)
-            conditions = None
-            conditions = field_instance.alter_filter_conditions(conditions, info, **args)
-            if conditions:
-                iterable = iterable.filter(conditions)
-            iterable = field_instance.alter_queryset_after(iterable, info, **args)
+            # Resolved once, every stage of the request gets it
+            filter_plan = field_instance.get_filter_plan(**args)
+            iterable = field_instance.route_queryset(iterable, info, filter_plan=filter_plan, **args)
+            iterable = field_instance.resolve_arguments(root, info, iterable, filter_plan=filter_plan, **args)
         return iterable
 
     def get_resolver(self, parent_resolver):
@@ -69,4 +548,93 @@ class FieldWithArguments(FieldWithArgumentsMixin, Field):
 
 
 class ConnectionFieldWithArguments(FieldWithArgumentsMixin, graphene.relay.ConnectionField):
-    pass
+    keyset_pagination = False
+    keyset_ordering = None
+    keyset_paginator_class = KeysetPaginator
+    offset_paginator_class = OffsetPaginator
+    count_strategy = None
+
+    def get_keyset_paginator(self):
+        return self.keyset_paginator_class(ordering=self.keyset_ordering)
+
+    def get_paginator(self):
+        if self.keyset_pagination:
+            return self.get_keyset_paginator()
+        return self.offset_paginator_class()
+
+    def get_count_strategy(self):
+        return self.count_strategy or ExactCount()
+
+    def get_connection_type(self):
+        connection_type = self.type
+        if isinstance(connection_type, graphene.NonNull):
+            connection_type = connection_type.of_type
+        return connection_type
+
+    def alter_queryset_after(self, queryset, info, filter_plan=None, **args):
+        queryset = super().alter_queryset_after(queryset, info, filter_plan=filter_plan, **args)
+        if self.keyset_pagination:
+            # Ordering is set before the optimizer runs, so the projection keeps the columns the cursors need
+            queryset = self.get_keyset_paginator().order_queryset(queryset)
+        return queryset
+
+    def resolve_queryset(self, queryset, info, filter_plan=None, **args):
+        queryset = self.process_queryset(queryset, info, filter_plan=filter_plan, **args)
+        connection = self.get_paginator().paginate(queryset, self.get_connection_type(), args)
+        connection.count_strategy = self.get_count_strategy()
+        return connection
+
+    def dump_cached_result(self, result):
+        page_info = result.page_info
+        value = {
+            'ids': [edge.node.pk for edge in result.edges],
+            'cursors': [edge.cursor for edge in result.edges],
+            'page_info': {
+                'start_cursor': page_info.start_cursor,
+                'end_cursor': page_info.end_cursor,
+                'has_previous_page': page_info.has_previous_page,
+                'has_next_page': page_info.has_next_page,
+            },
+            'length': result.length,
+        }
+        return result, value
+
+    def load_cached_result(self, queryset, info, value, filter_plan=None, **args):
+        connection_type = self.get_connection_type()
+        nodes = self.get_cached_nodes(queryset, info, value['ids'], **args)
+        cursors = dict(zip(value['ids'], value['cursors']))
+        connection = connection_type(
+            edges=[connection_type.Edge(node=node, cursor=cursors[node.pk]) for node in nodes],
+            page_info=PageInfo(**value['page_info']),
+        )
+        # Building the queryset does not hit the database, it is only evaluated if totalCount is selected
+        connection.iterable = self.process_queryset(queryset, info, filter_plan=filter_plan, **args)
+        connection.length = value['length']
+        connection.count_strategy = self.get_count_strategy()
+        return connection
+
+
+class BatchedConnectionFieldWithArguments(ConnectionFieldWithArguments):
+    """
+    Connection field for nested connections that loads the connections of every parent resolved in the same execution
+    with the same arguments together, instead of running one filtered query per parent.
+
+    `batch_key` is the name of the foreign key of the node model pointing to the parent. The parent resolver is not
+    used, the rows come from `get_batch_queryset` and go through the same argument pipeline.
+    """
+
+    batch_key = None
+
+    def get_batch_queryset(self, info, **args):
+        return self.get_connection_type()._meta.node._meta.model._default_manager.all()
+
+    def get_batch_key(self, root):
+        return root.pk
+
+    @classmethod
+    def resolve_and_process_arguments(cls, root, info, parent_resolver=None, field_instance=None, **args):
+        if field_instance is None or root is None:
+            return super().resolve_and_process_arguments(
+                root, info, parent_resolver=parent_resolver, field_instance=field_instance, **args
+            )
+        return get_loader(field_instance, info, args).load(field_instance.get_batch_key(root))
@@ -0,0 +1,231 @@
+import hashlib
+import json
+from collections import Counter, OrderedDict
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Index
+from django.db.models.constants import LOOKUP_SEP
+
+from graphene.utils.str_converters import to_camel_case
+
+from graphene_django_helpers.arguments import Filter
+from graphene_django_helpers.costs import EXPENSIVE_LOOKUPS
+from graphene_django_helpers.lookups import get_lookup_fields, is_indexed
+
+# Lookups comparing the case folded column, which only a functional index on the folded column serves
+CASE_INSENSITIVE_LOOKUPS = ('iexact', 'istartswith')
+
+BTREE = 'btree'
+FUNCTIONAL = 'functional'
+UNINDEXABLE = 'unindexable'
+
+
+class IndexAdvice(object):
+    """
+    A filter whose lookup forces a sequential scan of the table of `model`, along with the index that would serve it,
+    of `kind` `BTREE` or `FUNCTIONAL`, or `UNINDEXABLE` when no B-tree index can.
+    """
+
+    def __init__(self, field_name, key, model, model_field, lookup, kind, function=None) -> None:
+        super().__init__()
+        self.field_name = field_name
+        self.key = key
+        self.model = model
+        self.model_field = model_field
+        self.lookup = lookup
+        self.kind = kind
+        self.function = function
+        self.uses = 0
+
+    def __str__(self):
+        return '{}({}) on {}.{} {}: {}'.format(
+            self.field_name, to_camel_case(self.key), self.model._meta.label, self.model_field.name, self.lookup,
+            self.get_description(),
+        )
+
+    def get_description(self):
+        if self.kind == BTREE:
+            return 'sequential scan, index on {} suggested'.format(self.model_field.column)
+        if self.kind == FUNCTIONAL:
+            return 'sequential scan, index on {}({}) suggested'.format(self.function, self.model_field.column)
+        return 'sequential scan, {} lookups can not use a B-tree index'.format(self.lookup)
+
+    @property
+    def index_key(self):
+        return self.model, self.model_field.column, self.kind, self.function
+
+    def get_index_name(self):
+        table = self.model._meta.db_table
+        if self.kind == BTREE:
+            index = Index(fields=[self.model_field.name])
+            index.set_name_with_model(self.model)
+            return index.name
+        digest = hashlib.md5('{}.{}.{}'.format(table, self.model_field.column, self.function).encode()).hexdigest()
+        return '{}_{}_{}'.format(table[:11], self.model_field.column[:7], digest[:8])
+
+    def get_operation(self, connection):
+        """
+        Returns the source of the migration operation creating the index, or None when there is none.
+        """
+        if self.kind == BTREE:
+            return (
+                'migrations.AddIndex(\n'
+                '    model_name={!r},\n'
+                '    index=models.Index(fields=[{!r}], name={!r}),\n'
+                ')'
+            ).format(self.model._meta.model_name, self.model_field.name, self.get_index_name())
+        if self.kind == FUNCTIONAL:
+            quote_name = connection.ops.quote_name
+            create_sql = 'CREATE INDEX {} ON {} ({}({}))'.format(
+                quote_name(self.get_index_name()), quote_name(self.model._meta.db_table), self.function,
+                quote_name(self.model_field.column),
+            )
+            drop_sql = 'DROP INDEX {}'.format(quote_name(self.get_index_name()))
+            return 'migrations.RunSQL(\n    {!r},\n    reverse_sql={!r},\n)'.format(create_sql, drop_sql)
+        return None
+
+
+class IndexAdvisor(object):
+    """
+    Compares the lookups declared by the filters of every field with arguments of a schema with the indexes of the
+    models, known from their `_meta` and from the database `using`, and advises the missing ones.
+
+    Case insensitive lookups are served by functional indexes on the column folded the way Django folds it, by the
+    case collation of the column on MySQL, and by no B-tree index on SQLite, where they are `LIKE` comparisons.
+    Filters on annotations, methods and transforms are not columns and are not advised.
+    """
+
+    def __init__(self, schema, using=DEFAULT_DB_ALIAS) -> None:
+        super().__init__()
+        self.schema = schema
+        self.using = using
+        self.database_indexes = {}
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def get_case_function(self):
+        """
+        Returns the function case insensitive lookups apply to the column, or None when they apply none.
+        """
+        return 'UPPER' if self.connection.vendor in ('postgresql', 'oracle') else None
+
+    def get_fields(self):
+        """
+        Yields the name and the instance of every field with arguments of the schema, once per instance.
+        """
+        seen = set()
+        auto_camelcase = getattr(self.schema, 'auto_camelcase', True)
+        for graphql_type in self.schema.get_type_map().values():
+            graphene_type = getattr(graphql_type, 'graphene_type', None)
+            fields = getattr(getattr(graphene_type, '_meta', None), 'fields', None) or {}
+            for name, field in fields.items():
+                if hasattr(field, 'argument_map') and id(field) not in seen:
+                    seen.add(id(field))
+                    yield (getattr(field, 'name', None) or (to_camel_case(name) if auto_camelcase else name)), field
+
+    def get_database_indexes(self, model):
+        """
+        Returns the names of the indexes of the table of model and the columns of its single column indexes.
+        """
+        table = model._meta.db_table
+        if table not in self.database_indexes:
+            with self.connection.cursor() as cursor:
+                constraints = self.connection.introspection.get_constraints(cursor, table)
+            names = set(constraints)
+            columns = set(
+                constraint['columns'][0] for constraint in constraints.values()
+                if (constraint['index'] or constraint['unique'] or constraint['primary_key'])
+                and len(constraint['columns'] or []) == 1
+            )
+            self.database_indexes[table] = names, columns
+        return self.database_indexes[table]
+
+    def get_field_advice(self, field_name, field):
+        model = field.get_model()
+        if model is None:
+            return
+        for key, argument in field.argument_map.items():
+            instance = argument['instance']
+            if not isinstance(instance, Filter) or instance.method or instance.conditions_method:
+                continue
+            params = field.compile_filter_plan(frozenset([key])).entries[0][2]
+            if instance.get_annotations(field, params):
+                continue
+
+            path = instance.get_field_path(params)
+            lookup = params.get('lookup') or 'exact'
+            model_fields = get_lookup_fields(model, path)
+            if not model_fields or len(model_fields) != len(path.split(LOOKUP_SEP)):
+                # Annotations and transforms
+                continue
+            model_field = model_fields[-1]
+            if model_field.is_relation:
+                # Relations are looked up on their primary or foreign keys
+                continue
+
+            advice = self.get_lookup_advice(field_name, key, model_field, lookup)
+            if advice is not None:
+                yield advice
+
+    def get_lookup_advice(self, field_name, key, model_field, lookup):
+        model = model_field.model
+        names, columns = self.get_database_indexes(model)
+        if lookup in CASE_INSENSITIVE_LOOKUPS and self.connection.vendor != 'mysql':
+            function = self.get_case_function()
+            if function is None:
+                return IndexAdvice(field_name, key, model, model_field, lookup, UNINDEXABLE)
+            advice = IndexAdvice(field_name, key, model, model_field, lookup, FUNCTIONAL, function)
+            return None if advice.get_index_name() in names else advice
+        if lookup in EXPENSIVE_LOOKUPS and lookup not in CASE_INSENSITIVE_LOOKUPS:
+            return IndexAdvice(field_name, key, model, model_field, lookup, UNINDEXABLE)
+        if is_indexed(model_field) or model_field.column in columns:
+            return None
+        return IndexAdvice(field_name, key, model, model_field, lookup, BTREE)
+
+    def get_advice(self, uses=None):
+        """
+        Returns the advice for every field, ranked by the uses of their arguments, keyed by field name and argument
+        key, when given.
+        """
+        advice = []
+        for field_name, field in self.get_fields():
+            advice.extend(self.get_field_advice(field_name, field))
+        for item in advice:
+            item.uses = (uses or {}).get((item.field_name, item.key), 0)
+        return sorted(advice, key=lambda item: -item.uses)
+
+    def get_operations(self, advice):
+        """
+        Returns the migration operations creating the indexes of advice, once per index, by app label.
+        """
+        operations = OrderedDict()
+        seen = set()
+        for item in advice:
+            operation = item.get_operation(self.connection)
+            if operation is not None and item.index_key not in seen:
+                seen.add(item.index_key)
+                operations.setdefault(item.model._meta.app_label, []).append(operation)
+        return operations
+
+
+def read_access_log(path):
+    """
+    Returns the uses of every argument, by field name and argument key, counted from a file with one entry of the
+    `filterTrace` extension, a JSON object with a `path` and `arguments`, per line.
+    """
+    uses = Counter()
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            names = [item for item in entry.get('path', []) if isinstance(item, str)]
+            if not names:
+                continue
+            # Each argument is reported once per stage it runs in
+            for key in set(argument['argument'] for argument in entry.get('arguments', [])):
+                uses[(names[-1], key)] += 1
+    return uses
@@ -0,0 +1,128 @@
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F
+from django.db.models.expressions import Expression
+from django.db.models.constants import LOOKUP_SEP
+
+
+def get_lookup_fields(model, lookup):
+    """
+    Returns the model fields traversed by lookup, starting at model. Resolution stops at the first part that is not a
+    field, which is either a lookup, a transform or an annotation.
+    """
+    fields = []
+    opts = model._meta
+    for part in lookup.split(LOOKUP_SEP):
+        if part == 'pk':
+            part = opts.pk.name
+        try:
+            field = opts.get_field(part)
+        except FieldDoesNotExist:
+            break
+        fields.append(field)
+        if not field.is_relation or field.related_model is None:
+            break
+        opts = field.related_model._meta
+    return fields
+
+
+def get_lookup_models(model, lookup):
+    return [
+        field.related_model for field in get_lookup_fields(model, lookup) if field.is_relation and field.related_model
+    ]
+
+
+def is_indexed(field):
+    """
+    Returns whether lookups on field can use an index: its own, one of the single column indexes of its model, or,
+    for reverse relations, the foreign key of the related model.
+    """
+    if field.is_relation and not field.concrete:
+        return True
+    if field.primary_key or field.unique or field.db_index:
+        return True
+    return any(list(index.fields) == [field.name] for index in field.model._meta.indexes)
+
+
+def get_value_field(field):
+    """
+    Returns the field holding the values lookups on field compare with: the target of forward relations and the
+    primary key of the related model for reverse ones.
+    """
+    if field.is_relation and not field.concrete:
+        return field.related_model._meta.pk
+    if field.is_relation:
+        return field.target_field
+    return field
+
+
+def is_multi_valued(field):
+    return field.is_relation and bool(field.one_to_many or field.many_to_many)
+
+
+def get_multi_valued_paths(model, lookup):
+    """
+    Returns the prefixes of lookup that end in a multi-valued relation, whose joins may duplicate the rows of model.
+    """
+    paths = []
+    parts = []
+    for field in get_lookup_fields(model, lookup):
+        parts.append(field.name)
+        if is_multi_valued(field):
+            paths.append(LOOKUP_SEP.join(parts))
+    return paths
+
+
+def get_reverse_lookup(model, lookup):
+    """
+    Returns the model reached by the relations of lookup, starting at model, and the lookup that leads back to model
+    from it, so querysets of that model can be correlated with model rows.
+    """
+    fields = get_lookup_fields(model, lookup)
+    parts = []
+    for field in fields:
+        if field.auto_created and not field.concrete:
+            # Reverse relations know the field that points to the model they start at
+            parts.append(field.field.name)
+        else:
+            parts.append(field.related_query_name())
+    return fields[-1].related_model, LOOKUP_SEP.join(reversed(parts))
+
+
+def get_expression_lookups(expression):
+    """
+    Returns the lookups referenced by the `F()` nodes of expression.
+    """
+    if isinstance(expression, F):
+        return [expression.name]
+    lookups = []
+    for source in getattr(expression, 'get_source_expressions', list)():
+        lookups.extend(get_expression_lookups(source))
+    return lookups
+
+
+class ValueList(Expression):
+    """
+    Right hand side of an `__in` lookup with the `values` of `output_field` sent as a single parameter: a JSON array
+    read by `json_each` on SQLite and an array read by `unnest` on PostgreSQL. The statement is then the same whatever
+    the number of values, and stays under the variable limit of SQLite. Other databases get one placeholder per value.
+    """
+
+    def __init__(self, values, output_field) -> None:
+        super().__init__(output_field=output_field)
+        self.values = list(values)
+
+    def get_db_values(self, connection):
+        return [self.output_field.get_db_prep_value(value, connection) for value in self.values]
+
+    def as_sql(self, compiler, connection):
+        return ', '.join(['%s'] * len(self.values)), self.get_db_values(connection)
+
+    def as_sqlite(self, compiler, connection):
+        return 'SELECT value FROM json_each(%s)', [json.dumps(self.get_db_values(connection))]
+
+    def as_postgresql(self, compiler, connection):
+        return 'SELECT unnest(%s::{}[])'.format(self.output_field.rel_db_type(connection)), [
+            self.get_db_values(connection),
+        ]
@@ -0,0 +1,37 @@
+import importlib
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from graphene_django.settings import graphene_settings
+
+from graphene_django_helpers.search import search_indexes
+
+
+class Command(BaseCommand):
+    help = 'Creates the search indexes, all of them by default, and indexes every row of their models again.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('search_indexes', nargs='*', help='Search indexes to build, e.g. myapp_blogpost_search')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database whose indexes are built')
+        parser.add_argument(
+            '--schema',
+            default=graphene_settings.SCHEMA,
+            help='Schema whose modules declare the search indexes, e.g. myproject.core.schema.schema',
+        )
+
+    def handle(self, *args, **options):
+        # Search indexes are declared along with the models or the arguments, which the schema imports
+        if isinstance(options['schema'], str):
+            importlib.import_module(options['schema'].rsplit('.', 1)[0])
+
+        names = options['search_indexes']
+        unknown = set(names) - set(str(search_index) for search_index in search_indexes)
+        if unknown:
+            raise CommandError('Unknown search indexes: {}'.format(', '.join(sorted(unknown))))
+
+        for search_index in search_indexes:
+            if names and str(search_index) not in names:
+                continue
+            rows = search_index.build(using=options['database'])
+            self.stdout.write('Built {}: {} rows'.format(search_index, rows))
@@ -0,0 +1,62 @@
+import importlib
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from graphene_django.settings import graphene_settings
+
+from graphene_django_helpers.indexes import IndexAdvisor, read_access_log
+
+
+class Command(BaseCommand):
+    help = (
+        'Reports the filters of the fields with arguments of the schema whose lookups force sequential scans, '
+        'optionally with the migration operations creating the missing indexes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema',
+            default=graphene_settings.SCHEMA,
+            help='Schema to inspect, e.g. myproject.core.schema.schema',
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database whose indexes are compared')
+        parser.add_argument(
+            '--access-log',
+            help='File with one filterTrace extension entry per line, to rank the filters by their uses',
+        )
+        parser.add_argument(
+            '--migrations', action='store_true', help='Print the migration operations creating the missing indexes',
+        )
+
+    def get_schema(self, schema):
+        if isinstance(schema, str):
+            module_name, schema_name = schema.rsplit('.', 1)
+            schema = getattr(importlib.import_module(module_name), schema_name)
+        if not schema:
+            raise CommandError('Specify schema on GRAPHENE.SCHEMA setting or by using --schema')
+        return schema
+
+    def handle(self, *args, **options):
+        advisor = IndexAdvisor(self.get_schema(options['schema']), using=options['database'])
+        uses = None
+        if options['access_log']:
+            try:
+                uses = read_access_log(options['access_log'])
+            except (OSError, ValueError) as e:
+                raise CommandError('Can not read {}: {}'.format(options['access_log'], e))
+
+        advice = advisor.get_advice(uses=uses)
+        for item in advice:
+            if uses is not None:
+                self.stdout.write('{} [{} uses]'.format(item, item.uses))
+            else:
+                self.stdout.write(str(item))
+        if not advice:
+            self.stdout.write('Every filter can use an index')
+
+        if options['migrations']:
+            for app_label, operations in advisor.get_operations(advice).items():
+                self.stdout.write('\n# {}\noperations = [\n{}\n]'.format(app_label, '\n'.join(
+                    '    {},'.format(operation.replace('\n', '\n    ')) for operation in operations
+                )))
@@ -0,0 +1,64 @@
+import importlib
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from graphene_django.settings import graphene_settings
+
+from graphene_django_helpers.persisted import PersistedQueryRegistry
+
+
+class Command(BaseCommand):
+    help = (
+        'Preloads a persisted query registry file against the schema, parsing, validating and planning every '
+        'document, optionally adding the documents of GraphQL files to it first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('registry', help='Persisted query registry file, created when adding to a missing one')
+        parser.add_argument('--add', nargs='+', default=[], help='GraphQL files with a document to add')
+        parser.add_argument(
+            '--schema',
+            default=graphene_settings.SCHEMA,
+            help='Schema to validate the documents against, e.g. myproject.core.schema.schema',
+        )
+
+    def get_schema(self, schema):
+        if isinstance(schema, str):
+            module_name, schema_name = schema.rsplit('.', 1)
+            schema = getattr(importlib.import_module(module_name), schema_name)
+        if not schema:
+            raise CommandError('Specify schema on GRAPHENE.SCHEMA setting or by using --schema')
+        return schema
+
+    def handle(self, *args, **options):
+        schema = self.get_schema(options['schema'])
+        path = options['registry']
+        registry = PersistedQueryRegistry()
+
+        invalid = []
+        try:
+            if os.path.exists(path) or not options['add']:
+                invalid.extend(registry.load(schema, path))
+        except (OSError, ValueError) as e:
+            raise CommandError('Can not load {}: {}'.format(path, e))
+
+        for document_path in options['add']:
+            with open(document_path) as f:
+                persisted_query = registry.add(schema, f.read())
+            if persisted_query.errors:
+                invalid.append(persisted_query)
+            else:
+                self.stdout.write('Added {} as {}'.format(document_path, persisted_query.hash))
+
+        for persisted_query in invalid:
+            self.stderr.write('Persisted query {} is invalid:'.format(persisted_query.hash))
+            for error in persisted_query.errors:
+                self.stderr.write('  {}'.format(error))
+        if invalid:
+            raise CommandError('{} persisted queries are invalid'.format(len(invalid)))
+
+        if options['add']:
+            registry.write(path)
+        plans = sum(len(persisted_query.plans) for persisted_query in registry.persisted.values())
+        self.stdout.write('{} persisted queries preloaded with {} filter plans'.format(len(registry.persisted), plans))
@@ -0,0 +1,38 @@
+import importlib
+
+from django.core.management.base import BaseCommand, CommandError
+
+from graphene_django.settings import graphene_settings
+
+from graphene_django_helpers.counters import counter_caches
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes the counts kept by counter caches, all of them by default, fixing the ones bulk operations did '
+        'not update.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('counter_caches', nargs='*', help='Counter caches to rebuild, e.g. myapp.blog.posts_count')
+        parser.add_argument(
+            '--schema',
+            default=graphene_settings.SCHEMA,
+            help='Schema whose modules declare the counter caches, e.g. myproject.core.schema.schema',
+        )
+
+    def handle(self, *args, **options):
+        # Counter caches are declared along with the arguments, which the schema imports
+        if isinstance(options['schema'], str):
+            importlib.import_module(options['schema'].rsplit('.', 1)[0])
+
+        names = options['counter_caches']
+        unknown = set(names) - set(str(counter_cache) for counter_cache in counter_caches)
+        if unknown:
+            raise CommandError('Unknown counter caches: {}'.format(', '.join(sorted(unknown))))
+
+        for counter_cache in counter_caches:
+            if names and str(counter_cache) not in names:
+                continue
+            rows = counter_cache.rebuild()
+            self.stdout.write('Rebuilt {}: {} rows'.format(counter_cache, rows))
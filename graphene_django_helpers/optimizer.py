@@ -0,0 +1,109 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.db.models.query import ModelIterable
+
+from graphene_django_helpers.selections import get_type_fields, is_connection
+
+
+class QuerysetOptimizer(object):
+    """
+    Adds `select_related` and `prefetch_related` to a queryset from the selection tree of its node type.
+
+    Forward and one to one relations are followed with `select_related`, so Django reuses any join a filter already
+    introduced for the same path. Multi-valued relations exposed as lists get a `Prefetch` with their own optimized
+    queryset. Multi-valued relations exposed as connections are left alone because graphene-django queries them again.
+
+    With projection enabled, `.only()` restricts every model to the selected columns plus the primary key, the
+    relation columns the joins and prefetches need and the ordering columns. A type whose selection includes a field
+    that is not a plain model field, or that has its own resolver, loads all of its columns since it is not possible
+    to know which ones that resolver uses.
+    """
+
+    def __init__(self, info, select_related=True, projection=False) -> None:
+        super().__init__()
+        self.info = info
+        self.select_related = select_related
+        self.projection = projection
+
+    def optimize(self, queryset, node_type, tree, extra_only=None):
+        select_related = []
+        prefetch_related = []
+        only = list(extra_only or [])
+        self.collect(queryset.model, node_type, tree, '', select_related, prefetch_related, only)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if self.projection and queryset._iterable_class is ModelIterable:
+            only.extend(self.get_ordering_fields(queryset))
+            queryset = queryset.only(*only)
+        return queryset
+
+    def get_ordering_fields(self, queryset):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        fields = []
+        for item in ordering:
+            if not isinstance(item, str):
+                continue
+            name = item.lstrip('-+')
+            if name == 'pk' or not name or '__' in name:
+                continue
+            try:
+                queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                # Annotations and expressions are computed by the query itself
+                continue
+            fields.append(name)
+        return fields
+
+    def get_related_queryset(self, model_field, node_type, tree):
+        related_model = model_field.related_model
+        extra_only = []
+        if model_field.one_to_many:
+            # Prefetching a reverse foreign key needs the column pointing back to the parent
+            extra_only.append(model_field.field.name)
+        return self.optimize(related_model._default_manager.all(), node_type, tree, extra_only=extra_only)
+
+    def get_projectable_field(self, model, node_type, name):
+        if getattr(node_type, 'resolve_{}'.format(name), None):
+            return None
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+    def collect(self, model, node_type, tree, prefix, select_related, prefetch_related, only):
+        type_model = getattr(getattr(node_type, '_meta', None), 'model', None)
+        projectable = type_model is not None and issubclass(model, type_model)
+        level_only = [model._meta.pk.name]
+        for name, field_type, subtree in get_type_fields(self.info, node_type, tree):
+            model_field = self.get_projectable_field(model, node_type, name)
+            if model_field is None:
+                # Node ids are resolved from the primary key, which is always loaded
+                projectable = projectable and name == 'id'
+                continue
+            if not model_field.is_relation:
+                level_only.append(name)
+                continue
+            if not subtree:
+                continue
+
+            path = prefix + name
+            if model_field.many_to_one or model_field.one_to_one:
+                if model_field.concrete:
+                    level_only.append(name)
+                if self.select_related:
+                    select_related.append(path)
+                    if not model_field.concrete:
+                        only.append('{}__{}'.format(path, model_field.field.name))
+                    self.collect(
+                        model_field.related_model, field_type, subtree, path + '__', select_related, prefetch_related,
+                        only,
+                    )
+            elif self.select_related and not is_connection(field_type):
+                queryset = self.get_related_queryset(model_field, field_type, subtree)
+                prefetch_related.append(Prefetch(path, queryset=queryset))
+
+        if not projectable:
+            level_only = [field.name for field in model._meta.concrete_fields]
+        only.extend(prefix + name for name in level_only)
@@ -0,0 +1,197 @@
+import datetime
+import decimal
+import json
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from graphene.relay import PageInfo
+from graphql_relay.connection.arrayconnection import (
+    connection_from_list_slice, get_offset_with_default, offset_to_cursor,
+)
+from graphql_relay.utils import base64, unbase64
+
+KEYSET_CURSOR_PREFIX = 'keyset:'
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    Encodes the values of keyset cursors without losing precision, unlike `DjangoJSONEncoder`, which truncates times
+    to milliseconds, so seeking from a cursor never matches the row it was taken from again.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+            return o.isoformat()
+        if isinstance(o, decimal.Decimal):
+            return str(o)
+        return super().default(o)
+
+
+class OffsetPaginator(object):
+    """
+    Paginates a queryset with the same offset cursors and page info as graphql-relay array connections, but slicing
+    it in the database. The queryset is only counted when `last` or `before` need its length.
+    """
+
+    def paginate(self, queryset, connection_type, args):
+        first = args.get('first')
+        last = args.get('last')
+        length = None
+
+        if isinstance(last, int) or args.get('before'):
+            length = queryset.count()
+            connection = connection_from_list_slice(
+                queryset,
+                args,
+                connection_type=connection_type,
+                edge_type=connection_type.Edge,
+                pageinfo_type=PageInfo,
+                list_length=length,
+                list_slice_length=length,
+            )
+        else:
+            start = get_offset_with_default(args.get('after'), -1) + 1
+            has_next_page = False
+            if isinstance(first, int):
+                nodes = list(queryset[start:start + max(first, 0) + 1])
+                has_next_page = len(nodes) > first
+                nodes = nodes[:max(first, 0)]
+            else:
+                nodes = list(queryset[start:])
+
+            edges = [
+                connection_type.Edge(node=node, cursor=offset_to_cursor(start + i)) for i, node in enumerate(nodes)
+            ]
+            connection = connection_type(
+                edges=edges,
+                page_info=PageInfo(
+                    start_cursor=edges[0].cursor if edges else None,
+                    end_cursor=edges[-1].cursor if edges else None,
+                    has_previous_page=False,
+                    has_next_page=has_next_page,
+                ),
+            )
+
+        connection.iterable = queryset
+        connection.length = length
+        return connection
+
+
+class KeysetPaginator(object):
+    """
+    Paginates a queryset seeking from the values of the ordering columns encoded in the cursors instead of using
+    offsets, so the cost of a page does not depend on how deep it is.
+
+    The primary key is always appended to the ordering to make it total. Ordering columns should not be nullable,
+    since NULL values can not be compared.
+    """
+
+    def __init__(self, ordering=None) -> None:
+        super().__init__()
+        self.ordering = ordering
+
+    def get_ordering(self, queryset):
+        ordering = list(self.ordering or queryset.query.order_by or queryset.model._meta.ordering)
+        ordering = [item for item in ordering if isinstance(item, str) and item.lstrip('-') not in ('', '?')]
+        pk_names = ('pk', queryset.model._meta.pk.name, queryset.model._meta.pk.attname)
+        if not any(item.lstrip('-') in pk_names for item in ordering):
+            ordering.append('pk')
+        return ordering
+
+    def order_queryset(self, queryset):
+        return queryset.order_by(*self.get_ordering(queryset))
+
+    def get_value(self, node, name):
+        value = node
+        parts = name.split('__')
+        for part in parts[:-1]:
+            value = getattr(value, part)
+        name = parts[-1]
+        if name == 'pk':
+            return value.pk
+        try:
+            field = value._meta.get_field(name)
+            name = field.attname
+        except FieldDoesNotExist:
+            pass
+        return getattr(value, name)
+
+    def get_cursor(self, node, ordering):
+        values = [self.get_value(node, item.lstrip('-')) for item in ordering]
+        return base64(KEYSET_CURSOR_PREFIX + json.dumps(values, cls=CursorEncoder))
+
+    def get_cursor_values(self, cursor, ordering):
+        if not cursor:
+            return None
+        try:
+            data = unbase64(cursor)
+            if not data.startswith(KEYSET_CURSOR_PREFIX):
+                return None
+            values = json.loads(data[len(KEYSET_CURSOR_PREFIX):])
+        except (BinasciiError, UnicodeDecodeError, ValueError):
+            return None
+        if not isinstance(values, list) or len(values) != len(ordering):
+            return None
+        return values
+
+    def get_seek_conditions(self, ordering, values, forward=True):
+        """
+        Expands `(col1, col2, pk) > (v1, v2, vpk)` into `col1 > v1 OR (col1 = v1 AND col2 > v2) OR ...`, flipping the
+        comparison of descending columns and of the whole condition when seeking backwards.
+        """
+        conditions = None
+        equals = {}
+        for item, value in zip(ordering, values):
+            name = item.lstrip('-')
+            ascending = not item.startswith('-')
+            lookup = 'gt' if ascending == forward else 'lt'
+            q = Q(**equals) & Q(**{'{}__{}'.format(name, lookup): value})
+            conditions = q if conditions is None else conditions | q
+            equals[name] = value
+        return conditions
+
+    def paginate(self, queryset, connection_type, args):
+        ordering = self.get_ordering(queryset)
+        queryset = iterable = queryset.order_by(*ordering)
+
+        after = self.get_cursor_values(args.get('after'), ordering)
+        if after is not None:
+            queryset = queryset.filter(self.get_seek_conditions(ordering, after, forward=True))
+        before = self.get_cursor_values(args.get('before'), ordering)
+        if before is not None:
+            queryset = queryset.filter(self.get_seek_conditions(ordering, before, forward=False))
+
+        first = args.get('first')
+        last = args.get('last')
+        has_next_page = False
+        has_previous_page = False
+        if isinstance(first, int):
+            nodes = list(queryset[:first + 1])
+            has_next_page = len(nodes) > first
+            nodes = nodes[:first]
+            if isinstance(last, int):
+                has_previous_page = len(nodes) > last
+                nodes = nodes[max(len(nodes) - last, 0):]
+        elif isinstance(last, int):
+            nodes = list(queryset.reverse()[:last + 1])
+            has_previous_page = len(nodes) > last
+            nodes = list(reversed(nodes[:last]))
+        else:
+            nodes = list(queryset)
+
+        edges = [connection_type.Edge(node=node, cursor=self.get_cursor(node, ordering)) for node in nodes]
+        connection = connection_type(
+            edges=edges,
+            page_info=PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=has_previous_page,
+                has_next_page=has_next_page,
+            ),
+        )
+        connection.iterable = iterable
+        connection.length = None
+        return connection
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import partial
+
+from graphene.utils.str_converters import to_camel_case
+from graphql.backend.base import GraphQLDocument
+from graphql.backend.core import GraphQLCoreBackend
+from graphql.execution import ExecutionResult, execute
+from graphql.language import ast
+from graphql.language.parser import parse
+from graphql.language.visitor import TypeInfoVisitor, Visitor, visit
+from graphql.utils.type_info import TypeInfo
+from graphql.validation import validate
+
+REGISTRY_FORMAT_VERSION = 1
+
+
+def get_query_hash(query):
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+def get_graphene_field(schema, parent_type, field_name):
+    """
+    Returns the graphene field of the schema named field_name in parent_type, or None.
+    """
+    graphene_type = getattr(parent_type, 'graphene_type', None)
+    fields = getattr(getattr(graphene_type, '_meta', None), 'fields', None) or {}
+    auto_camelcase = getattr(schema, 'auto_camelcase', True)
+    for name, field in fields.items():
+        # Dynamic fields, like the relations of Django types, have no name
+        if (getattr(field, 'name', None) or (to_camel_case(name) if auto_camelcase else name)) == field_name:
+            return field
+    return None
+
+
+class FilterPlanVisitor(Visitor):
+    """
+    Collects the fields with arguments of a document along with the keys of the arguments given to them.
+    """
+
+    def __init__(self, schema, type_info) -> None:
+        super().__init__()
+        self.schema = schema
+        self.type_info = type_info
+        self.plans = []
+
+    def enter_Field(self, node, key, parent, path, ancestors):
+        field_def = self.type_info.get_field_def()
+        field = get_graphene_field(self.schema, self.type_info.get_parent_type(), node.name.value)
+        if field_def is None or not hasattr(field, 'pin_filter_plan'):
+            return
+        keys = []
+        for argument in node.arguments or []:
+            argument_def = field_def.args.get(argument.name.value)
+            if argument_def is not None:
+                keys.append(argument_def.out_name or argument.name.value)
+        self.plans.append((field, frozenset(keys)))
+
+
+class PersistedQuery(object):
+    """
+    A document parsed, validated and planned once: its AST, its validation errors and the filter plans of its fields
+    with arguments, so executing it only binds variables.
+    """
+
+    def __init__(self, schema, query) -> None:
+        super().__init__()
+        self.schema = schema
+        self.query = query
+        self.hash = get_query_hash(query)
+        self.document_ast = parse(query)
+        self.errors = validate(schema, self.document_ast)
+        self.plans = []
+        if not self.errors:
+            type_info = TypeInfo(schema)
+            visitor = FilterPlanVisitor(schema, type_info)
+            visit(self.document_ast, TypeInfoVisitor(type_info, visitor))
+            self.plans = visitor.plans
+
+    def pin_filter_plans(self):
+        for field, keys in self.plans:
+            field.pin_filter_plan(keys)
+
+    def warm_filter_plans(self):
+        for field, keys in self.plans:
+            field.get_filter_plan(**dict.fromkeys(keys))
+
+
+class PersistedQueryRegistry(object):
+    """
+    Persisted documents, by hash, and the ad-hoc documents seen the most recently, up to `max_entries`.
+
+    Persisted documents are loaded from the JSON file at `path`, if any, the first time the registry is used with a
+    schema. Their filter plans are pinned, while the plans of ad-hoc documents go through the LRU cache of their fields.
+    The file holds `{"version": 1, "queries": {<sha256 of the document>: <document>}}`.
+    """
+
+    def __init__(self, path=None, max_entries=1000) -> None:
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.persisted = {}
+        self.documents = OrderedDict()
+        self.loaded_schema = None
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+
+    def ensure_loaded(self, schema):
+        with self.lock:
+            if self.loaded_schema is not schema:
+                self.loaded_schema = schema
+                if self.path:
+                    self.load(schema, self.path)
+
+    def read(self, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != REGISTRY_FORMAT_VERSION:
+            raise ValueError('Unsupported persisted query registry version: {}'.format(data.get('version')))
+        queries = data.get('queries', {})
+        for query_hash, query in queries.items():
+            if get_query_hash(query) != query_hash:
+                raise ValueError('Persisted query {} does not match its hash'.format(query_hash))
+        return queries
+
+    def write(self, path):
+        data = {
+            'version': REGISTRY_FORMAT_VERSION,
+            'queries': dict((query_hash, query.query) for query_hash, query in self.persisted.items()),
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+
+    def load(self, schema, path):
+        """
+        Adds the documents of the file at path and returns the ones with validation errors.
+        """
+        invalid = []
+        for query in self.read(path).values():
+            persisted_query = self.add(schema, query)
+            if persisted_query.errors:
+                invalid.append(persisted_query)
+        return invalid
+
+    def add(self, schema, query):
+        persisted_query = PersistedQuery(schema, query)
+        persisted_query.pin_filter_plans()
+        with self.lock:
+            self.persisted[persisted_query.hash] = persisted_query
+            self.documents.pop(persisted_query.hash, None)
+        return persisted_query
+
+    def get_query(self, schema, query_hash):
+        """
+        Returns the document with query_hash, or None when it is unknown.
+        """
+        self.ensure_loaded(schema)
+        with self.lock:
+            persisted_query = self.persisted.get(query_hash) or self.documents.get(query_hash)
+        return persisted_query.query if persisted_query is not None else None
+
+    def get(self, schema, query):
+        self.ensure_loaded(schema)
+        query_hash = get_query_hash(query)
+        with self.lock:
+            persisted_query = self.persisted.get(query_hash)
+            if persisted_query is None and query_hash in self.documents:
+                persisted_query = self.documents[query_hash]
+                self.documents.move_to_end(query_hash)
+        if persisted_query is not None and persisted_query.schema is schema:
+            self.hits += 1
+            return persisted_query
+
+        self.misses += 1
+        persisted_query = PersistedQuery(schema, query)
+        persisted_query.warm_filter_plans()
+        with self.lock:
+            self.documents[query_hash] = persisted_query
+            while len(self.documents) > self.max_entries:
+                self.documents.popitem(last=False)
+        return persisted_query
+
+
+# Registry of the views and backends not given one
+default_registry = PersistedQueryRegistry()
+
+
+class PersistedQueryBackend(GraphQLCoreBackend):
+    """
+    graphql-core backend that parses, validates and plans every document once through a `PersistedQueryRegistry`.
+    """
+
+    def __init__(self, registry=None, executor=None) -> None:
+        super().__init__(executor=executor)
+        self.registry = registry or default_registry
+
+    def document_from_string(self, schema, document_string):
+        if isinstance(document_string, ast.Document):
+            return super().document_from_string(schema, document_string)
+
+        persisted_query = self.registry.get(schema, document_string)
+        return GraphQLDocument(
+            schema=schema,
+            document_string=document_string,
+            document_ast=persisted_query.document_ast,
+            execute=partial(self.execute, persisted_query, **self.execute_params),
+        )
+
+    def execute(self, persisted_query, *args, **kwargs):
+        if persisted_query.errors:
+            return ExecutionResult(errors=persisted_query.errors, invalid=True)
+        return execute(persisted_query.schema, persisted_query.document_ast, *args, **kwargs)
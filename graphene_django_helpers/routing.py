@@ -0,0 +1,95 @@
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+LAST_WRITE_ATTRIBUTE = '_graphene_django_helpers_last_write'
+LAST_WRITE_SESSION_KEY = 'graphene_django_helpers:last_write'
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def record_write(request):
+    """
+    Records that request wrote to the database now, in its session when it has one, so the following requests of the
+    same client see it too.
+    """
+    now = time.time()
+    setattr(request, LAST_WRITE_ATTRIBUTE, now)
+    session = getattr(request, 'session', None)
+    if session is not None:
+        session[LAST_WRITE_SESSION_KEY] = now
+
+
+def get_last_write(request):
+    """
+    Returns the timestamp of the last write recorded for request, or None.
+    """
+    last_write = getattr(request, LAST_WRITE_ATTRIBUTE, None)
+    session = getattr(request, 'session', None)
+    if last_write is None and session is not None:
+        last_write = session.get(LAST_WRITE_SESSION_KEY)
+    return last_write
+
+
+class RecentWriteMiddleware(object):
+    """
+    Records the requests that run `INSERT`, `UPDATE` or `DELETE` statements on the `using` database, for the routing
+    rules reading from replicas only when the client did not write recently. It must come after `SessionMiddleware`.
+    """
+
+    using = DEFAULT_DB_ALIAS
+
+    def __init__(self, get_response) -> None:
+        super().__init__()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        def execute_wrapper(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            if sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+                record_write(request)
+            return result
+
+        with connections[self.using].execute_wrapper(execute_wrapper):
+            return self.get_response(request)
+
+
+class RoutingRule(object):
+    """
+    Picks the database the queryset of a field is read from. Rules are declared as `routing_rules` on fields and as
+    `routing` on arguments, and the first one returning an alias wins. None leaves the choice to the next rule, and to
+    the parent resolver in the end.
+    """
+
+    def get_database(self, field, queryset, info, args):
+        return None
+
+
+class UseDatabase(RoutingRule):
+    """
+    Always reads from `database`, like an analytics replica for heavy aggregate filters.
+    """
+
+    def __init__(self, database) -> None:
+        super().__init__()
+        self.database = database
+
+    def get_database(self, field, queryset, info, args):
+        return self.database
+
+
+class ReplicaUnlessRecentWrite(RoutingRule):
+    """
+    Reads from `replica` unless the client wrote less than `window` seconds ago, as recorded by
+    `RecentWriteMiddleware`, so it reads its own writes while the replica catches up.
+    """
+
+    def __init__(self, replica, window=5) -> None:
+        super().__init__()
+        self.replica = replica
+        self.window = window
+
+    def get_database(self, field, queryset, info, args):
+        last_write = get_last_write(info.context)
+        if last_write is not None and time.time() - last_write < self.window:
+            return None
+        return self.replica
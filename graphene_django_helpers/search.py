@@ -0,0 +1,162 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db import NotSupportedError, connections, router
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import Expression, RawSQL
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+# Every search index declared, in declaration order
+search_indexes = []
+SUPPORTED_VENDORS = ('sqlite', 'postgresql')
+
+
+def get_match_query(value):
+    """
+    Returns an FTS5 query matching the rows containing every word of value, which is never parsed as FTS5 syntax.
+    """
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in value.split())
+
+
+class MatchingRows(Expression):
+    """
+    Primary keys of the rows of the model of `index` matching `value`, for `pk__in` lookups. It is compiled for the
+    database the queryset is read from, like the rank of the rows.
+    """
+
+    def __init__(self, index, value) -> None:
+        super().__init__(output_field=index.model._meta.pk)
+        self.index = index
+        self.value = value
+
+    def as_sql(self, compiler, connection):
+        raise NotSupportedError('Search indexes are not supported on {}'.format(connection.vendor))
+
+    def as_sqlite(self, compiler, connection):
+        return 'SELECT rowid FROM {0} WHERE {0} MATCH %s'.format(connection.ops.quote_name(self.index.table)), [
+            get_match_query(self.value),
+        ]
+
+    def as_postgresql(self, compiler, connection):
+        from django.contrib.postgres.search import SearchQuery
+        self.index.check_vector_field(connection)
+        queryset = self.index.model._base_manager.filter(**{self.index.vector_field: SearchQuery(self.value)})
+        return queryset.values('pk').query.get_compiler(connection=connection).as_sql()
+
+
+class SearchIndex(object):
+    """
+    Full-text index of the text `fields` of `model`, kept in sync with post_save/post_delete.
+
+    On SQLite it is an FTS5 table, named after the table of model unless `table` is given, whose rowids are the
+    primary keys of model, created on migrate. On PostgreSQL it is the `SearchVectorField` of model named by
+    `vector_field`, which should have a GIN index. Rows written by bulk operations are indexed by `build`, and the
+    `build_search_indexes` command builds every index.
+    """
+
+    def __init__(self, model, fields, table=None, vector_field=None) -> None:
+        super().__init__()
+        self.model = model
+        self.fields = list(fields)
+        self.table = table or '{}_search'.format(model._meta.db_table)
+        self.vector_field = vector_field
+        search_indexes.append(self)
+        uid = 'graphene_django_helpers.search.{}'.format(self.table)
+        post_migrate.connect(self.create_table, dispatch_uid='{}.post_migrate'.format(uid))
+        post_save.connect(self.update_saved, sender=model, dispatch_uid='{}.post_save'.format(uid))
+        post_delete.connect(self.update_deleted, sender=model, dispatch_uid='{}.post_delete'.format(uid))
+
+    def __str__(self):
+        return self.table
+
+    def check_vector_field(self, connection):
+        if connection.vendor == 'postgresql' and not self.vector_field:
+            raise ImproperlyConfigured('Search index {} requires a vector_field on PostgreSQL'.format(self))
+
+    def get_connection(self, using=None):
+        connection = connections[using or router.db_for_read(self.model)]
+        if connection.vendor not in SUPPORTED_VENDORS:
+            raise NotSupportedError('Search indexes are not supported on {}'.format(connection.vendor))
+        self.check_vector_field(connection)
+        return connection
+
+    def get_columns(self):
+        return [self.model._meta.get_field(name).column for name in self.fields]
+
+    def get_search_vector(self):
+        from django.contrib.postgres.search import SearchVector
+        return SearchVector(*self.fields)
+
+    def create_table(self, using, **kwargs):
+        connection = connections[using]
+        if not router.allow_migrate_model(using, self.model):
+            return
+        # Saves would fail without it
+        self.check_vector_field(connection)
+        if connection.vendor != 'sqlite':
+            return
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE VIRTUAL TABLE IF NOT EXISTS {} USING fts5({})'.format(
+                quote_name(self.table), ', '.join(quote_name(column) for column in self.get_columns()),
+            ))
+
+    def index_rows(self, queryset, using):
+        """
+        Indexes the rows of queryset again.
+        """
+        connection = self.get_connection(using)
+        if connection.vendor == 'postgresql':
+            queryset.update(**{self.vector_field: self.get_search_vector()})
+            return
+        table = connection.ops.quote_name(self.table)
+        columns = ', '.join(connection.ops.quote_name(column) for column in self.get_columns())
+        pk_sql, pk_params = queryset.values('pk').query.sql_with_params()
+        rows_sql, rows_params = queryset.values_list('pk', *self.fields).query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM {} WHERE rowid IN ({})'.format(table, pk_sql), pk_params)
+            cursor.execute('INSERT INTO {} (rowid, {}) {}'.format(table, columns, rows_sql), rows_params)
+
+    def update_saved(self, sender, instance, using, **kwargs):
+        if connections[using].vendor in SUPPORTED_VENDORS:
+            self.index_rows(self.model._base_manager.using(using).filter(pk=instance.pk), using)
+
+    def update_deleted(self, sender, instance, using, **kwargs):
+        connection = connections[using]
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('DELETE FROM {} WHERE rowid = %s'.format(connection.ops.quote_name(self.table)), [
+                    instance.pk,
+                ])
+
+    def build(self, using=None):
+        """
+        Indexes every row of model again in the database using, and returns the number of rows.
+        """
+        using = using or router.db_for_write(self.model)
+        connection = self.get_connection(using)
+        queryset = self.model._base_manager.using(using).all()
+        if connection.vendor == 'sqlite':
+            self.create_table(using)
+            with connection.cursor() as cursor:
+                cursor.execute('DELETE FROM {}'.format(connection.ops.quote_name(self.table)))
+        self.index_rows(queryset, using)
+        return queryset.count()
+
+    def get_conditions(self, value):
+        """
+        Returns the conditions matching the rows of model containing every word of value.
+        """
+        return Q(pk__in=MatchingRows(self, value))
+
+    def get_rank(self, value, using=None):
+        """
+        Returns the relevance of the rows matching value, higher for the most relevant ones.
+        """
+        connection = self.get_connection(using)
+        if connection.vendor == 'postgresql':
+            from django.contrib.postgres.search import SearchQuery, SearchRank
+            return SearchRank(F(self.vector_field), SearchQuery(value))
+        quote_name = connection.ops.quote_name
+        sql = '(SELECT -bm25({0}) FROM {0} WHERE {0} MATCH %s AND {0}.rowid = {1}.{2})'.format(
+            quote_name(self.table), quote_name(self.model._meta.db_table), quote_name(self.model._meta.pk.column),
+        )
+        return RawSQL(sql, [get_match_query(value)], output_field=FloatField())
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+
+from graphql.language import ast
+from graphql.type import GraphQLBoolean
+from graphql.utils.value_from_ast import value_from_ast
+
+import graphene
+from graphene.types.dynamic import Dynamic
+from graphene.utils.str_converters import to_camel_case
+
+
+def should_include(info, selection):
+    for directive in selection.directives or []:
+        name = directive.name.value
+        if name not in ('skip', 'include'):
+            continue
+        value = True
+        for argument in directive.arguments:
+            if argument.name.value == 'if':
+                value = value_from_ast(argument.value, GraphQLBoolean, info.variable_values)
+        if (name == 'skip') == bool(value):
+            return False
+    return True
+
+
+def merge_selection_set(info, selection_set, tree):
+    """
+    Merges a selection set into tree, a dict of field names (aliases are ignored) to the tree of their own selections.
+    Fragment spreads and inline fragments are expanded in place regardless of their type condition.
+    """
+    if not selection_set:
+        return tree
+
+    for selection in selection_set.selections:
+        if not should_include(info, selection):
+            continue
+        if isinstance(selection, ast.Field):
+            subtree = tree.setdefault(selection.name.value, OrderedDict())
+            merge_selection_set(info, selection.selection_set, subtree)
+        elif isinstance(selection, ast.FragmentSpread):
+            fragment = info.fragments.get(selection.name.value)
+            if fragment:
+                merge_selection_set(info, fragment.selection_set, tree)
+        elif isinstance(selection, ast.InlineFragment):
+            merge_selection_set(info, selection.selection_set, tree)
+    return tree
+
+
+def get_selection_tree(info):
+    tree = OrderedDict()
+    for field_ast in info.field_asts:
+        merge_selection_set(info, field_ast.selection_set, tree)
+    return tree
+
+
+def get_named_type(graphene_type):
+    while getattr(graphene_type, 'of_type', None) is not None:
+        graphene_type = graphene_type.of_type
+    return graphene_type
+
+
+def is_connection(graphene_type):
+    return isinstance(graphene_type, type) and issubclass(graphene_type, graphene.Connection)
+
+
+def get_node_selection(info):
+    """
+    Returns the graphene type of the nodes returned by the field being resolved and the selection tree over them.
+    For connections the tree is the one under `edges.node`.
+    """
+    graphene_type = getattr(get_named_type(info.return_type), 'graphene_type', None)
+    tree = get_selection_tree(info)
+    if is_connection(graphene_type):
+        graphene_type = graphene_type._meta.node
+        tree = tree.get('edges', {}).get('node', OrderedDict())
+    return graphene_type, tree
+
+
+def get_type_fields(info, graphene_type, tree):
+    """
+    Yields `(name, field_type, subtree)` for every field of graphene_type present in tree, where name is the python
+    name of the field and field_type its unwrapped graphene type.
+    """
+    meta = getattr(graphene_type, '_meta', None)
+    fields = getattr(meta, 'fields', None) or {}
+    auto_camelcase = getattr(info.schema, 'auto_camelcase', True)
+    for name, field in fields.items():
+        graphql_name = getattr(field, 'name', None) or (to_camel_case(name) if auto_camelcase else name)
+        if graphql_name not in tree:
+            continue
+        if isinstance(field, Dynamic):
+            field = field.get_type(info.schema)
+            if field is None:
+                continue
+        yield name, get_named_type(field.type), tree[graphql_name]
@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.db import connections
+
+TRACE_ATTRIBUTE = 'filter_trace'
+
+
+def get_filter_trace(info):
+    """
+    Returns the trace of the current execution, or None when tracing is disabled, which is the only cost paid then.
+    """
+    return getattr(info.context, TRACE_ATTRIBUTE, None)
+
+
+def get_duration(start):
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+class FilterTrace(object):
+    """
+    Collects, for every field with arguments resolved in an execution, the time spent by each argument hook and the
+    SQL run while the field was being resolved. Durations are in milliseconds.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.fields = OrderedDict()
+
+    def get_field(self, info):
+        path = tuple(info.path or [info.field_name])
+        if path not in self.fields:
+            self.fields[path] = OrderedDict([
+                ('path', list(path)),
+                ('duration', None),
+                ('arguments', []),
+                ('queries', []),
+                ('skipped_queries', 0),
+            ])
+        return self.fields[path]
+
+    def add_argument(self, info, key, stage, start, extra_joins=None):
+        argument = OrderedDict([
+            ('argument', key),
+            ('stage', stage),
+            ('duration', get_duration(start)),
+        ])
+        if extra_joins:
+            argument['extra_joins'] = extra_joins
+        self.get_field(info)['arguments'].append(argument)
+
+    def add_skipped_query(self, info):
+        self.get_field(info)['skipped_queries'] += 1
+
+    def add_plan(self, info, plan):
+        self.get_field(info).setdefault('plans', []).append(plan)
+
+    @contextmanager
+    def capture(self, info, using):
+        field = self.get_field(info)
+
+        def execute_wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                field['queries'].append(OrderedDict([
+                    ('sql', sql),
+                    ('params', [str(param) for param in params or []]),
+                    ('duration', get_duration(start)),
+                ]))
+
+        start = time.perf_counter()
+        with connections[using].execute_wrapper(execute_wrapper):
+            yield field
+        field['duration'] = get_duration(start)
+
+    def as_list(self):
+        return list(self.fields.values())
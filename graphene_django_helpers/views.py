@@ -0,0 +1,176 @@
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.http import HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse
+from django.views.generic import View
+
+from graphene_django.views import GraphQLView
+
+from graphene_django_helpers.costs import QueryCostError
+from graphene_django_helpers.exports import CSVWriter, ExportInfo, NDJSONWriter, parse_argument_value, stream_rows
+from graphene_django_helpers.persisted import PersistedQueryBackend, default_registry
+from graphene_django_helpers.tracing import TRACE_ATTRIBUTE, FilterTrace
+
+
+class TracingGraphQLView(GraphQLView):
+    """
+    GraphQL view that reports the filter trace of every execution under `extensions.filterTrace`.
+
+    Tracing is enabled for every request with `trace=True`, or per request with the `X-Filter-Trace` header when
+    `settings.DEBUG` is on or the user is staff, since the trace exposes the SQL of the queries.
+    """
+
+    trace = False
+    trace_header = 'HTTP_X_FILTER_TRACE'
+
+    def __init__(self, trace=False, **kwargs):
+        super().__init__(**kwargs)
+        self.trace = self.trace or trace
+
+    def is_trace_enabled(self, request):
+        if self.trace:
+            return True
+        if not request.META.get(self.trace_header):
+            return False
+        user = getattr(request, 'user', None)
+        return settings.DEBUG or bool(user is not None and user.is_staff)
+
+    def get_response(self, request, data, show_graphiql=False):
+        if self.is_trace_enabled(request):
+            setattr(request, TRACE_ATTRIBUTE, FilterTrace())
+        return super().get_response(request, data, show_graphiql)
+
+    def json_encode(self, request, d, pretty=False):
+        trace = getattr(request, TRACE_ATTRIBUTE, None)
+        if trace is not None and ('data' in d or 'errors' in d):
+            d = dict(d)
+            d.setdefault('extensions', {})['filterTrace'] = trace.as_list()
+        return super().json_encode(request, d, pretty)
+
+
+class PersistedQueryGraphQLView(GraphQLView):
+    """
+    GraphQL view that parses, validates and plans every document once, through the `PersistedQueryRegistry` given as
+    `registry`. Clients may send the sha256 hash of a known document as `id` instead of the document itself.
+    """
+
+    registry = None
+
+    def __init__(self, registry=None, **kwargs):
+        self.registry = registry or self.registry or default_registry
+        kwargs.setdefault('backend', PersistedQueryBackend(self.registry))
+        super().__init__(**kwargs)
+
+    def get_graphql_params(self, request, data):
+        query, variables, operation_name, id = super().get_graphql_params(request, data)
+        if not query and id:
+            query = self.registry.get_query(self.schema, id)
+        return query, variables, operation_name, id
+
+
+class FilteredExportView(View):
+    """
+    Streams the rows of `field` matching the arguments given in the query string, by their keys, as NDJSON or CSV.
+
+    Rows go through the same filter pipeline as when the field is resolved, and are then read with
+    `.iterator(chunk_size=...)`, which uses server-side cursors where the database supports them. The response is
+    produced while the client consumes it, so memory stays flat however many rows match. `columns` are the lookups
+    exported, by default the columns of the model fields the node type of field exposes.
+
+    The rows are read from `queryset`, or from the queryset returned by `get_queryset(request)`, which should scope
+    them like the parent resolver of field does. Requests failing `has_permission`, which checks the permissions of
+    `permission_required` when given, are forbidden.
+    """
+
+    field = None
+    queryset = None
+    columns = None
+    ordering = ('pk',)
+    chunk_size = 2000
+    writer_classes = {
+        'ndjson': NDJSONWriter,
+        'csv': CSVWriter,
+    }
+    default_format = 'ndjson'
+    format_param = 'format'
+    filename = None
+    permission_required = None
+
+    def has_permission(self, request):
+        if self.permission_required is None:
+            return True
+        permissions = self.permission_required
+        if isinstance(permissions, str):
+            permissions = (permissions,)
+        return request.user.has_perms(permissions)
+
+    def get_queryset(self, request):
+        if self.queryset is None:
+            raise ImproperlyConfigured(
+                '{} requires either a queryset or a get_queryset(request) implementation'.format(type(self).__name__)
+            )
+        return self.queryset.all()
+
+    def get_columns(self, queryset):
+        """
+        Returns the lookups exported, by default the columns of the model fields exposed by the node type of field
+        and not resolved by it.
+        """
+        if self.columns:
+            return list(self.columns)
+        node_type = self.field.get_node_type()
+        columns = []
+        for name in node_type._meta.fields:
+            if name == 'id':
+                model_field = queryset.model._meta.pk
+            elif getattr(node_type, 'resolve_{}'.format(name), None):
+                continue
+            else:
+                try:
+                    model_field = queryset.model._meta.get_field(name)
+                except FieldDoesNotExist:
+                    continue
+            if model_field.concrete and not model_field.many_to_many and model_field.attname not in columns:
+                columns.append(model_field.attname)
+        return columns
+
+    def get_arguments(self, request):
+        arguments = {}
+        for key in request.GET:
+            if key == self.format_param:
+                continue
+            argument = self.field.argument_map.get(key)
+            if argument is None:
+                raise ValueError('Unknown argument "{}"'.format(key))
+            arguments[key] = parse_argument_value(argument['instance'], request.GET.getlist(key))
+        return arguments
+
+    def get_filename(self, queryset, writer):
+        return self.filename or '{}.{}'.format(queryset.model._meta.model_name, writer.extension)
+
+    def get(self, request, *args, **kwargs):
+        if not self.has_permission(request):
+            return HttpResponseForbidden()
+        writer_class = self.writer_classes.get(request.GET.get(self.format_param, self.default_format))
+        if writer_class is None:
+            return HttpResponseBadRequest('Unsupported format')
+        try:
+            arguments = self.get_arguments(request)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
+        info = ExportInfo(request, type(self.field).__name__)
+        filter_plan = self.field.get_filter_plan(**arguments)
+        queryset = self.field.route_queryset(self.get_queryset(request), info, filter_plan=filter_plan, **arguments)
+        try:
+            queryset = self.field.filter_queryset(queryset, info, filter_plan=filter_plan, **arguments)
+        except QueryCostError as e:
+            return HttpResponseBadRequest(e.message)
+        if not queryset.ordered:
+            queryset = queryset.order_by(*self.ordering)
+        columns = self.get_columns(queryset)
+        writer = writer_class(columns)
+        rows = queryset.values_list(*columns).iterator(chunk_size=self.chunk_size)
+
+        response = StreamingHttpResponse(stream_rows(writer, rows, self.chunk_size), content_type=writer.content_type)
+        response['Content-Disposition'] = 'attachment; filename="{}"'.format(self.get_filename(queryset, writer))
+        return response
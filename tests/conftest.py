@@ -9,7 +9,15 @@ def pytest_configure(config):
             'default': {
                 'ENGINE': 'django.db.backends.sqlite3',
                 'NAME': ':memory:'
-            }
+            },
+            'replica': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': ':memory:'
+            },
+            'analytics': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': ':memory:'
+            },
         },
         SECRET_KEY='CHANGE ME!!',
         USE_I18N=True,
@@ -39,6 +47,7 @@ def pytest_configure(config):
             'django.contrib.auth.middleware.AuthenticationMiddleware',
             'django.contrib.messages.middleware.MessageMiddleware',
             'django.middleware.clickjacking.XFrameOptionsMiddleware',
+            'graphene_django_helpers.routing.RecentWriteMiddleware',
         ),
         INSTALLED_APPS=(
             'django.contrib.admin',
@@ -48,6 +57,7 @@ def pytest_configure(config):
             'django.contrib.messages',
             'django.contrib.staticfiles',
             'graphene_django',
+            'graphene_django_helpers',
             'tests',
         ),
         GRAPHENE={
@@ -1,10 +1,14 @@
 from django.db.models import Count
 
 from graphene_django_helpers import arguments
+from graphene_django_helpers.counters import CounterCache
+from tests.models import Blog
+
+blog_posts_count = CounterCache(Blog, 'posts_count', 'posts')
 
 
 class BlogPostCountFilter(arguments.IntFilter):
     field_name = 'blog_post_count'
-
-    def alter_queryset_before(self, field, queryset, params, value, info):
-        return queryset.annotate(blog_post_count=Count('posts'))
+    annotations = {
+        'blog_post_count': Count('posts'),
+    }
@@ -1,13 +1,12 @@
-import graphene
-
+from graphene_django_helpers.connections import CountableConnection
 from tests.graphql.types import BlogType, BlogPostType
 
 
-class BlogConnection(graphene.Connection):
+class BlogConnection(CountableConnection):
     class Meta:
         node = BlogType
 
 
-class BlogPostConnection(graphene.Connection):
+class BlogPostConnection(CountableConnection):
     class Meta:
         node = BlogPostType
@@ -1,34 +1,90 @@
 import graphene
-from django.db.models import Count
+from django.db.models import Count, Q
 
 from graphene_django_helpers import fields, arguments
-from tests.graphql.arguments import BlogPostCountFilter
+from graphene_django_helpers.asynchronous import AsyncFieldWithArgumentsMixin
+from graphene_django_helpers.routing import ReplicaUnlessRecentWrite, UseDatabase
+from tests.graphql.arguments import BlogPostCountFilter, blog_posts_count
+from tests.models import post_search_index
 
 
 class BlogField(fields.ConnectionFieldWithArguments):
-    # @TODO - Be careful, name, description and type are protected names
-    #  as long as we pass them as kwargs to graphene.Field
+    keyset_pagination = True
+
     arguments = [
         arguments.Filter('title'),
         arguments.Filter('title_filter_with_field_name', field_name='title'),
         arguments.Filter('filter_by_description', field_name='description', lookups=['iexact', 'exact']),
         arguments.Filter('enabled', of_type=graphene.Boolean()),
-        arguments.IntFilter('count', method='filter_by_count', lookups=['exact', 'gte']),
+        arguments.Filter('posts_count', lookups=['gte', 'lte']),
+        arguments.IntFilter(
+            'count',
+            conditions_method='filter_by_count',
+            lookups=['exact', 'gte'],
+            annotations={'count': Count('posts')},
+            joins=[],
+        ),
         BlogPostCountFilter('filter_by_count', lookups=['exact', 'gte']),
+        BlogPostCountFilter('cached_post_count', lookups=['exact', 'gte'], counter_cache=blog_posts_count),
+        arguments.CountFilter('post_count', 'posts', lookups=['exact', 'gte', 'lte']),
+        arguments.CountFilter('analytics_post_count', 'posts', lookups=['gte'], routing=UseDatabase('analytics')),
+        arguments.MaxFilter('max_post_id', 'posts', aggregate_field='id', lookups=['gte', 'lte']),
+        arguments.ExistsFilter('has_posts', 'posts'),
+        arguments.Filter('post_title', field_name='posts__title'),
+        arguments.Filter('post_body', field_name='body', path='posts'),
+        arguments.Filter('post_title_method', method='filter_by_post_title'),
+        arguments.Filter('post_body_method', conditions_method='filter_by_post_body'),
         arguments.Argument('my_argument', of_type=graphene.Int()),
     ]
 
-    def filter_by_count(self, queryset, params, value, info):
+    def filter_by_count(self, params, value, info):
         conditions = {}
-        key = 'count__{}'.format(params['lookup']) if params['lookup'] else 'count'
+        alias = params['annotation_aliases']['count']
+        key = '{}__{}'.format(alias, params['lookup']) if params['lookup'] else alias
         conditions[key] = value
-        return queryset.annotate(count=Count('posts')).filter(**conditions)
+        return Q(**conditions)
+
+    def filter_by_post_title(self, queryset, params, value, info):
+        return queryset.filter(posts__title=value)
+
+    def filter_by_post_body(self, params, value, info):
+        return Q(posts__body=value)
+
+
+class LimitedBlogField(BlogField):
+    cost_budget = 20
+    statement_timeout = 1
 
 
 class BlogPostField(fields.ConnectionFieldWithArguments):
+    queryset_optimization = True
+    queryset_projection = True
+
     arguments = [
         arguments.Filter('title'),
         arguments.Filter('blog__title'),
         arguments.Filter('blog_title_filter_with_field_name', field_name='blog__title'),
         arguments.Filter('blog_title_filter_with_field_name_and_path', field_name='title', path='blog'),
+        arguments.SearchFilter('search', index=post_search_index),
+        arguments.ListFilter('ids', field_name='pk', threshold=3),
+        arguments.ListFilter('blog_ids', field_name='blog', threshold=3),
+    ]
+
+
+class CachedBlogPostField(BlogPostField):
+    cache_results = True
+
+
+class ReplicaBlogPostField(BlogPostField):
+    routing_rules = [ReplicaUnlessRecentWrite('replica', window=5)]
+
+
+class BatchedBlogPostField(fields.BatchedConnectionFieldWithArguments):
+    batch_key = 'blog'
+    arguments = [
+        arguments.Filter('title', lookups=['exact', 'icontains']),
     ]
+
+
+class AsyncBlogPostField(AsyncFieldWithArgumentsMixin, BlogPostField):
+    pass
@@ -1,21 +1,33 @@
 import graphene
 
 from tests.graphql.connections import BlogConnection, BlogPostConnection
-from tests.graphql.fields import BlogField, BlogPostField
+from tests.graphql.fields import BlogField, BlogPostField, CachedBlogPostField, LimitedBlogField, ReplicaBlogPostField
 from tests.graphql.types import BlogType, BlogPostType
 from tests.models import Blog, BlogPost
 
 
 class BlogQuery(graphene.ObjectType):
     all_blogs = BlogField(BlogConnection)
+    all_limited_blogs = LimitedBlogField(BlogConnection)
     all_blog_posts = BlogPostField(BlogPostConnection)
+    all_cached_blog_posts = CachedBlogPostField(BlogPostConnection)
+    all_replica_blog_posts = ReplicaBlogPostField(BlogPostConnection)
 
     def resolve_all_blogs(self, info, **kwargs):
         return Blog.objects.all()
 
+    def resolve_all_limited_blogs(self, info, **kwargs):
+        return Blog.objects.all()
+
     def resolve_all_blog_posts(self, info, **kwargs):
         return BlogPost.objects.all()
 
+    def resolve_all_cached_blog_posts(self, info, **kwargs):
+        return BlogPost.objects.all()
+
+    def resolve_all_replica_blog_posts(self, info, **kwargs):
+        return BlogPost.objects.all()
+
 
 class Query(
     BlogQuery,
@@ -1,6 +1,7 @@
 import graphene
 from graphene_django import DjangoObjectType
 
+from tests.graphql.fields import BatchedBlogPostField
 from tests.models import Blog, BlogPost
 
 
@@ -14,6 +15,8 @@ class BlogType(DjangoObjectType):
             'posts',
         )
 
+    filtered_posts = BatchedBlogPostField('tests.graphql.connections.BlogPostConnection')
+
 
 class BlogPostType(DjangoObjectType):
     class Meta:
@@ -24,3 +27,6 @@ class BlogPostType(DjangoObjectType):
             'body',
             'blog',
         )
+
+    # Relevance annotated by the search argument
+    search_rank = graphene.Float()
@@ -2,6 +2,8 @@ from __future__ import unicode_literals
 
 from django.db import models
 
+from graphene_django_helpers.search import SearchIndex
+
 
 class TestModel(models.Model):
     """
@@ -17,9 +19,13 @@ class Blog(TestModel):
     title = models.CharField(max_length=255)
     description = models.TextField(null=True)
     enabled = models.BooleanField(default=True)
+    posts_count = models.PositiveIntegerField(default=0, db_index=True)
 
 
 class BlogPost(TestModel):
     title = models.CharField(max_length=255)
     body = models.TextField(null=True)
     blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='posts')
+
+
+post_search_index = SearchIndex(BlogPost, ['title', 'body'])
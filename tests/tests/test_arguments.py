@@ -1,9 +1,14 @@
 import json
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from graphql_relay import to_global_id
 
+from graphene_django_helpers import arguments
+
+from tests.graphql.schema import BlogQuery
 from tests.models import Blog, BlogPost
 
 
@@ -551,3 +556,205 @@ class ArgumentTests(TestCase):
         })
         data = response.json()
         self.assertEqual(len(data['data']['allBlogs']['edges']), 0)
+
+
+class AggregateFilterTests(TestCase):
+    query = '''
+    query (
+        $postCount: Int, $postCountGte: Int, $maxPostIdLte: Int, $hasPosts: Boolean, $postTitle: String,
+        $filterByCountGte: Int
+    ) {
+        allBlogs(
+            postCount: $postCount, postCount_Gte: $postCountGte, maxPostId_Lte: $maxPostIdLte, hasPosts: $hasPosts,
+            postTitle: $postTitle, filterByCount_Gte: $filterByCountGte
+        ) {
+            edges {
+                node {
+                    title
+                }
+            }
+        }
+    }
+    '''
+
+    def setUp(self):
+        self.blog1 = Blog.objects.create(title='Blog 1', description='Description 1')
+        self.blog2 = Blog.objects.create(title='Blog 2', description='Description 2')
+        self.blog3 = Blog.objects.create(title='Blog 3', description='Description 3')
+
+        self.blog1_post1 = BlogPost.objects.create(title='Blog 1 - Post 1', body='Body 1 - 1', blog=self.blog1)
+        self.blog1_post2 = BlogPost.objects.create(title='Blog 1 - Post 2', body='Body 1 - 2', blog=self.blog1)
+        self.blog2_post1 = BlogPost.objects.create(title='Blog 2 - Post 1', body='Body 2 - 1', blog=self.blog2)
+
+        self.field = BlogQuery._meta.fields['all_blogs']
+
+    def get_titles(self, variables):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post('/graphql/', {'query': self.query, 'variables': json.dumps(variables)})
+        data = response.json()
+        self.assertNotIn('errors', data)
+        self.sql = context.captured_queries[-1]['sql']
+        return [edge['node']['title'] for edge in data['data']['allBlogs']['edges']]
+
+    def test_count_filter(self):
+        self.assertEqual(self.get_titles({'postCountGte': 1}), ['Blog 1', 'Blog 2'])
+        self.assertIn('GROUP BY "tests_blog"', self.sql)
+        self.assertEqual(self.get_titles({'postCount': 0}), ['Blog 3'])
+
+    def test_max_filter(self):
+        self.assertEqual(self.get_titles({'maxPostIdLte': self.blog2_post1.pk - 1}), ['Blog 1'])
+
+    def test_aggregate_of_primary_keys(self):
+        queryset = Blog.objects.all()
+        for subquery in (False, True):
+            argument = arguments.MaxFilter('max_post', 'posts', lookups=['lte'], subquery=subquery)
+            params = {'model': Blog}
+            annotations = argument.get_annotations(self.field, params)
+            self.assertEqual(
+                list(queryset.annotate(**annotations).filter(max_post_aggregate__lte=self.blog2_post1.pk - 1)),
+                [self.blog1],
+            )
+
+    def test_exists_filter(self):
+        self.assertEqual(self.get_titles({'hasPosts': True}), ['Blog 1', 'Blog 2'])
+        self.assertEqual(self.get_titles({'hasPosts': False}), ['Blog 3'])
+        self.assertIn('EXISTS', self.sql)
+        self.assertNotIn('JOIN', self.sql)
+
+    def test_subquery_is_used_with_other_multi_valued_joins(self):
+        plan = self.field.get_filter_plan(post_count__gte=2, filter_by_count__gte=1)
+        params = dict((key, params) for key, instance, params in plan.entries)
+        self.assertEqual(params['post_count__gte']['multi_valued_joins'], ['posts'])
+        self.assertEqual(params['filter_by_count__gte']['multi_valued_joins'], ['posts'])
+
+        self.assertEqual(self.get_titles({'postCountGte': 2, 'filterByCountGte': 1}), ['Blog 1'])
+        self.assertEqual(self.sql.count('COUNT("tests_blogpost"."id")'), 2)
+        self.assertEqual(self.sql.count('JOIN'), 1)
+
+        # Both lookups of an argument share its expression
+        plan = self.field.get_filter_plan(post_count=2, post_count__gte=2)
+        self.assertEqual(list(plan.annotations.expressions), ['post_count_aggregate'])
+
+    def test_subquery_is_used_with_conditions_methods(self):
+        BlogPost.objects.filter(blog=self.blog1).update(body='same')
+        query = self.query.replace('$filterByCountGte: Int', '$filterByCountGte: Int, $postBody: String').replace(
+            'filterByCount_Gte: $filterByCountGte', 'filterByCount_Gte: $filterByCountGte, postBodyMethod: $postBody',
+        )
+        self.query = query
+        # The joins of the conditions do not multiply the count, the rows are duplicated by the join like without it
+        self.assertEqual(set(self.get_titles({'postCount': 2, 'postBody': 'same'})), {'Blog 1'})
+        self.assertEqual(self.get_titles({'postCount': 2}), ['Blog 1'])
+
+        plan = self.field.get_filter_plan(post_count=2, post_body_method='same')
+        params = dict((key, params) for key, instance, params in plan.entries)
+        self.assertEqual(params['post_count']['multi_valued_joins'], ['posts'])
+
+    def test_subquery_is_used_with_methods(self):
+        BlogPost.objects.filter(blog=self.blog1).update(title='x')
+        self.query = self.query.replace('$filterByCountGte: Int', '$filterByCountGte: Int, $title: String').replace(
+            'filterByCount_Gte: $filterByCountGte', 'filterByCount_Gte: $filterByCountGte, postTitleMethod: $title',
+        )
+        # The join of the queryset method does not multiply the count
+        self.assertEqual(set(self.get_titles({'postCount': 2, 'title': 'x'})), {'Blog 1'})
+
+        plan = self.field.get_filter_plan(post_count=2, post_title_method='x')
+        params = dict((key, params) for key, instance, params in plan.entries)
+        self.assertEqual(params['post_count']['multi_valued_joins'], ['posts'])
+
+    def test_multi_valued_filters_use_exists(self):
+        self.assertEqual(self.get_titles({'postTitle': 'Blog 1 - Post 1'}), ['Blog 1'])
+        self.assertIn('EXISTS', self.sql)
+        self.assertNotIn('JOIN', self.sql)
+        self.assertNotIn('DISTINCT', self.sql)
+
+        # Aggregates no longer need a subquery next to them
+        plan = self.field.get_filter_plan(post_count__gte=2, post_title='Blog 1 - Post 1')
+        params = dict((key, params) for key, instance, params in plan.entries)
+        self.assertEqual(params['post_count__gte']['multi_valued_joins'], [])
+        self.assertEqual(params['post_title']['exists_relation'], 'posts')
+        self.assertEqual(params['post_title']['field_lookup'], 'title')
+        self.assertEqual(self.get_titles({'postCountGte': 2, 'postTitle': 'Blog 1 - Post 1'}), ['Blog 1'])
+
+    def test_filters_on_the_same_relation_share_exists(self):
+        query = '''
+        query ($title: String, $body: String) {
+            allBlogs(postTitle: $title, postBody: $body) {
+                edges {
+                    node {
+                        title
+                    }
+                }
+            }
+        }
+        '''
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post('/graphql/', {
+                'query': query,
+                'variables': json.dumps({'title': 'Blog 1 - Post 1', 'body': 'Body 1 - 2'}),
+            })
+        # Both conditions must hold on the same post
+        self.assertEqual(response.json()['data']['allBlogs']['edges'], [])
+        self.assertEqual(context.captured_queries[-1]['sql'].count('AS "posts_exists"'), 1)
+
+        response = self.client.post('/graphql/', {
+            'query': query,
+            'variables': json.dumps({'title': 'Blog 1 - Post 1', 'body': 'Body 1 - 1'}),
+        })
+        self.assertEqual([edge['node']['title'] for edge in response.json()['data']['allBlogs']['edges']], ['Blog 1'])
+
+
+class MethodFilterTests(TestCase):
+    query = '''
+    query ($titleMethod: String, $bodyMethod: String, $body: String) {
+        allBlogs(postTitleMethod: $titleMethod, postBodyMethod: $bodyMethod, postBody: $body) {
+            edges {
+                node {
+                    title
+                }
+            }
+        }
+    }
+    '''
+
+    def setUp(self):
+        self.blog1 = Blog.objects.create(title='Blog 1', description='Description 1')
+        self.blog2 = Blog.objects.create(title='Blog 2', description='Description 2')
+
+        BlogPost.objects.create(title='Blog 1 - Post 1', body='Body 1 - 1', blog=self.blog1)
+        BlogPost.objects.create(title='Blog 2 - Post 1', body='Body 2 - 1', blog=self.blog2)
+
+        self.field = BlogQuery._meta.fields['all_blogs']
+        self.field.get_cached_filter_plan.cache_clear()
+
+    def get_titles(self, variables):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post('/graphql/', {'query': self.query, 'variables': json.dumps(variables)})
+        data = response.json()
+        self.assertNotIn('errors', data)
+        self.sql = context.captured_queries[-1]['sql']
+        return [edge['node']['title'] for edge in data['data']['allBlogs']['edges']]
+
+    def test_conditions_method(self):
+        plan = self.field.get_filter_plan(post_body_method='Body 1 - 1')
+        self.assertEqual([key for key, instance, params in plan.conditions], ['post_body_method'])
+
+        self.assertEqual(self.get_titles({'bodyMethod': 'Body 1 - 1'}), ['Blog 1'])
+        self.assertEqual(self.sql.count('JOIN'), 1)
+
+    def test_queryset_method_extra_joins_are_reported(self):
+        with self.assertLogs('graphene_django_helpers.fields', level='WARNING') as logs:
+            titles = self.get_titles({'titleMethod': 'Blog 1 - Post 1', 'bodyMethod': 'Body 1 - 1'})
+        self.assertEqual(titles, ['Blog 1'])
+        self.assertEqual(self.sql.count('JOIN'), 2)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('"post_title_method"', logs.output[0])
+        self.assertIn('tests_blogpost', logs.output[0])
+
+        plan = self.field.get_filter_plan(post_title_method='Blog 1 - Post 1', post_body_method='Body 1 - 1')
+        self.assertEqual(plan.extra_joins, {'post_title_method': ['tests_blogpost']})
+
+    def test_queryset_method_without_extra_joins(self):
+        # The post body filter runs in an EXISTS subquery, so the method join is the only one
+        with self.assertRaises(AssertionError):
+            with self.assertLogs('graphene_django_helpers.fields', level='WARNING'):
+                self.assertEqual(self.get_titles({'titleMethod': 'Blog 1 - Post 1', 'body': 'Body 1 - 1'}), ['Blog 1'])
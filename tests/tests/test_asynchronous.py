@@ -0,0 +1,112 @@
+import asyncio
+from concurrent.futures import Executor, Future
+
+import graphene
+from django.test import TestCase
+
+from graphql.execution.executors.asyncio import AsyncioExecutor
+
+from tests.graphql.connections import BlogPostConnection
+from tests.graphql.fields import AsyncBlogPostField
+from tests.models import Blog, BlogPost
+
+
+class InlineExecutor(Executor):
+    """
+    Runs the submitted calls in the calling thread, so they share the connection and transaction of the test.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def submit(self, fn, *args, **kwargs):
+        self.calls += 1
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class AsyncQuery(graphene.ObjectType):
+    all_blog_posts = AsyncBlogPostField(BlogPostConnection)
+    all_blog_posts_sync_parent = AsyncBlogPostField(BlogPostConnection)
+
+    async def resolve_all_blog_posts(self, info, **kwargs):
+        await asyncio.sleep(0)
+        return BlogPost.objects.all()
+
+    def resolve_all_blog_posts_sync_parent(self, info, **kwargs):
+        return BlogPost.objects.all()
+
+
+schema = graphene.Schema(query=AsyncQuery)
+
+
+class AsyncFieldTests(TestCase):
+    def setUp(self):
+        self.blog1 = Blog.objects.create(title='Blog 1')
+        self.blog2 = Blog.objects.create(title='Blog 2')
+        BlogPost.objects.create(title='Blog 1 - Post 1', blog=self.blog1)
+        BlogPost.objects.create(title='Blog 1 - Post 2', blog=self.blog1)
+        BlogPost.objects.create(title='Blog 2 - Post 1', blog=self.blog2)
+
+        self.executor = InlineExecutor()
+        for name in ['all_blog_posts', 'all_blog_posts_sync_parent']:
+            AsyncQuery._meta.fields[name].async_executor = self.executor
+
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def execute(self, query):
+        result = schema.execute(query, executor=AsyncioExecutor(loop=self.loop))
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def test_coroutine_parent_resolver(self):
+        data = self.execute('''
+        {
+            allBlogPosts(blog_Title: "Blog 1", first: 1) {
+                totalCount
+                edges {
+                    node {
+                        title
+                        blog {
+                            title
+                        }
+                    }
+                }
+            }
+        }
+        ''')
+        self.assertEqual(data['allBlogPosts']['totalCount'], 2)
+        self.assertEqual(len(data['allBlogPosts']['edges']), 1)
+        self.assertEqual(data['allBlogPosts']['edges'][0]['node']['blog']['title'], 'Blog 1')
+        self.assertEqual(self.executor.calls, 1)
+
+    def test_multiple_root_fields(self):
+        with self.assertNumQueries(2):
+            data = self.execute('''
+            {
+                allBlogPosts(title: "Blog 2 - Post 1") {
+                    edges {
+                        node {
+                            title
+                        }
+                    }
+                }
+                allBlogPostsSyncParent(blog_Title: "Blog 1") {
+                    edges {
+                        node {
+                            title
+                        }
+                    }
+                }
+            }
+            ''')
+        self.assertEqual(len(data['allBlogPosts']['edges']), 1)
+        self.assertEqual(len(data['allBlogPostsSyncParent']['edges']), 2)
+        self.assertEqual(self.executor.calls, 2)
@@ -0,0 +1,125 @@
+import json
+
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from graphene_django_helpers.conditions import is_empty, normalize_conditions
+from tests.graphql.schema import BlogQuery
+from tests.models import Blog, BlogPost
+
+
+class ConditionAnalysisTests(TestCase):
+    def test_normalize_conditions(self):
+        conditions = (Q(title='Blog 1') & Q(enabled=True)) & (Q(title='Blog 1') & Q(count__gte=1))
+        normalized = normalize_conditions(conditions)
+        self.assertEqual(normalized.connector, Q.AND)
+        self.assertEqual(normalized.children, [('title', 'Blog 1'), ('enabled', True), ('count__gte', 1)])
+
+        conditions = Q(title='Blog 1') | Q(title='Blog 1') | ~Q(enabled=True)
+        normalized = normalize_conditions(conditions)
+        self.assertEqual(normalized.connector, Q.OR)
+        self.assertEqual(normalized.children, [('title', 'Blog 1'), ~Q(enabled=True)])
+
+    def test_empty_conditions(self):
+        queryset = Blog.objects.annotate(count=Count('posts'))
+        self.assertTrue(is_empty(Q(id__in=[])))
+        self.assertTrue(is_empty(Q(id__in=[None])))
+        self.assertTrue(is_empty(Q(count__gte=10) & Q(count=3), queryset))
+        self.assertTrue(is_empty(Q(count__gt=3) & Q(count__lte=3), queryset))
+        self.assertTrue(is_empty(Q(count__range=(5, 10)) & Q(count__in=[1, 2, 11]), queryset))
+        self.assertTrue(is_empty(Q(posts_count__gte='10') & Q(posts_count__lte='9'), queryset))
+        self.assertTrue(is_empty(Q(id__in=[]) | (Q(count__gt=1) & Q(count__lt=1)), queryset))
+
+    def test_satisfiable_or_unknown_conditions(self):
+        queryset = Blog.objects.annotate(count=Count('posts'))
+        self.assertFalse(is_empty(None))
+        self.assertFalse(is_empty(Q()))
+        self.assertFalse(is_empty(Q(count__gte=3) & Q(count__lte=3), queryset))
+        self.assertFalse(is_empty(Q(count__range=(5, 10)) & Q(count__in=[1, 5]), queryset))
+        self.assertFalse(is_empty(Q(id__in=[]) | Q(title='Blog 1'), queryset))
+        # Values are compared like the column compares them
+        self.assertFalse(is_empty(Q(posts_count__gte='9') & Q(posts_count__lte='10'), queryset))
+        self.assertFalse(is_empty(Q(id='1') & Q(id=1), queryset))
+        # Strings depend on the collation of the column, and other paths are unknown
+        self.assertFalse(is_empty(Q(title='Blog 1') & Q(title='Blog 2'), queryset))
+        self.assertFalse(is_empty(Q(title__gte='a') & Q(title__lte='B'), queryset))
+        self.assertFalse(is_empty(Q(count__gte=10) & Q(count=3)))
+        # Negated nodes and values the database may convert are not analyzed
+        self.assertFalse(is_empty(~Q(id__in=[])))
+        self.assertFalse(is_empty(Q(id='x') & Q(id=2), queryset))
+        self.assertFalse(is_empty(Q(created__gt=None) & Q(created__lt=None), queryset))
+
+
+class EmptyResultTests(TestCase):
+    query = '''
+    query ($countGte: Int, $countLte: Int, $postBody: String, $postTitle: String) {
+        allBlogs(postCount_Gte: $countGte, postCount_Lte: $countLte, postBodyMethod: $postBody, postTitle: $postTitle) {
+            totalCount
+            edges {
+                node {
+                    title
+                }
+            }
+        }
+    }
+    '''
+
+    def setUp(self):
+        self.blog1 = Blog.objects.create(title='Blog 1', description='Description 1')
+        BlogPost.objects.create(title='Blog 1 - Post 1', body='Body 1 - 1', blog=self.blog1)
+
+        self.field = BlogQuery._meta.fields['all_blogs']
+        self.field.skipped_queries = 0
+
+    def run_gql(self, variables):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post('/graphql/', {'query': self.query, 'variables': json.dumps(variables)})
+        self.queries = context.captured_queries
+        data = response.json()
+        self.assertNotIn('errors', data)
+        return data['data']['allBlogs']
+
+    def test_exclusive_ranges_skip_the_query(self):
+        data = self.run_gql({'countGte': 3, 'countLte': 1})
+        self.assertEqual(data, {'totalCount': 0, 'edges': []})
+        self.assertEqual(self.queries, [])
+        self.assertEqual(self.field.skipped_queries, 1)
+
+        data = self.run_gql({'countGte': 1, 'countLte': 1})
+        self.assertEqual(data['totalCount'], 1)
+        self.assertEqual(self.field.skipped_queries, 1)
+
+    @override_settings(DEBUG=True)
+    def test_skipped_queries_are_traced(self):
+        response = self.client.post(
+            '/graphql/trace/',
+            {'query': self.query, 'variables': json.dumps({'countGte': 3, 'countLte': 1})},
+            HTTP_X_FILTER_TRACE='1',
+        )
+        trace = response.json()['extensions']['filterTrace']
+        self.assertEqual(trace[0]['skipped_queries'], 1)
+        self.assertEqual(trace[0]['queries'], [])
+
+    def test_string_arguments_are_converted_by_the_column(self):
+        self.blog1.posts_count = 9
+        self.blog1.save(update_fields=['posts_count'])
+        query = '''
+        query ($gte: String, $lte: String) {
+            allBlogs(postsCount_Gte: $gte, postsCount_Lte: $lte) {
+                edges {
+                    node {
+                        title
+                    }
+                }
+            }
+        }
+        '''
+        response = self.client.post('/graphql/', {'query': query, 'variables': json.dumps({'gte': '9', 'lte': '10'})})
+        self.assertEqual(len(response.json()['data']['allBlogs']['edges']), 1)
+        self.assertEqual(self.field.skipped_queries, 0)
+
+        response = self.client.post('/graphql/', {'query': query, 'variables': json.dumps({'gte': '10', 'lte': '9'})})
+        self.assertEqual(response.json()['data']['allBlogs']['edges'], [])
+        self.assertEqual(self.field.skipped_queries, 1)
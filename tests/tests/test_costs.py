@@ -0,0 +1,70 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from graphene_django_helpers.costs import QueryTimeoutError, statement_timeout
+from tests.graphql.schema import BlogQuery
+from tests.models import Blog, BlogPost
+
+
+class CostTests(TestCase):
+
+    def setUp(self):
+        self.field = BlogQuery._meta.fields['all_limited_blogs']
+        blog = Blog.objects.create(title='Blog 1', description='First')
+        BlogPost.objects.create(title='Post 1', blog=blog)
+
+    def get_costs(self, **args):
+        plan = self.field.get_filter_plan(**args)
+        return dict((key, params['cost']) for key, instance, params in plan.entries), plan.cost
+
+    def test_argument_costs(self):
+        costs, total = self.get_costs(
+            title=None,
+            filter_by_description__iexact=None,
+            post_count__gte=None,
+            cached_post_count__gte=None,
+            post_title_method=None,
+            has_posts=None,
+            my_argument=None,
+        )
+        self.assertEqual(costs, {
+            'title': 5,
+            'filter_by_description__iexact': 10,
+            'post_count__gte': 20,
+            'cached_post_count__gte': 1,
+            'post_title_method': 10,
+            'has_posts': 20,
+            'my_argument': 0,
+        })
+        self.assertEqual(total, 66)
+
+    def run_gql(self, arguments):
+        query = '{{ allLimitedBlogs({}) {{ edges {{ node {{ title }} }} }} }}'.format(arguments)
+        return self.client.post('/graphql/', {'query': query}).json()
+
+    def test_budget(self):
+        data = self.run_gql('postCount_Gte: 1')
+        self.assertNotIn('errors', data)
+        self.assertEqual(len(data['data']['allLimitedBlogs']['edges']), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self.run_gql('postCount_Gte: 1, filterByDescription_Iexact: "first"')
+        self.assertEqual(data['errors'][0]['message'], 'Arguments of allLimitedBlogs cost 30, over the budget of 20')
+        self.assertIsNone(data['data']['allLimitedBlogs'])
+        self.assertEqual(len(queries), 0)
+
+    def test_statement_timeout(self):
+        endless = 'WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c'
+        with self.assertRaises(QueryTimeoutError):
+            with statement_timeout(connection, 0.05):
+                with connection.cursor() as cursor:
+                    cursor.execute(endless)
+
+        # The timeout only applies to the block
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM tests_blog')
+            self.assertEqual(cursor.fetchone(), (1,))
+
+        data = self.run_gql('title: "Blog 1"')
+        self.assertEqual(len(data['data']['allLimitedBlogs']['edges']), 1)
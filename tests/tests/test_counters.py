@@ -0,0 +1,123 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models.signals import post_init
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from tests.graphql.arguments import blog_posts_count
+from tests.graphql.connections import BlogConnection
+from tests.graphql.fields import BlogField
+from tests.models import Blog, BlogPost
+
+
+class CounterCacheTests(TestCase):
+    databases = {'default', 'replica'}
+    # Django < 2.2
+    multi_db = True
+
+    def setUp(self):
+        self.blog1 = Blog.objects.create(title='Blog 1')
+        self.blog2 = Blog.objects.create(title='Blog 2')
+
+    def get_counts(self):
+        return list(Blog.objects.order_by('pk').values_list('posts_count', flat=True))
+
+    def test_counts_follow_related_rows(self):
+        post1 = BlogPost.objects.create(title='Post 1', blog=self.blog1)
+        post2 = BlogPost.objects.create(title='Post 2', blog=self.blog1)
+        self.assertEqual(self.get_counts(), [2, 0])
+
+        post2.blog = self.blog2
+        post2.save()
+        self.assertEqual(self.get_counts(), [1, 1])
+
+        # Saving again does not count the post as moved twice
+        post2.save()
+        BlogPost.objects.get(pk=post1.pk).save()
+        self.assertEqual(self.get_counts(), [1, 1])
+
+        post1.delete()
+        BlogPost.objects.filter(pk=post2.pk).delete()
+        self.assertEqual(self.get_counts(), [0, 0])
+
+    def test_saving_a_loaded_row_keeps_its_count(self):
+        blog = Blog.objects.get(pk=self.blog1.pk)
+        BlogPost.objects.create(title='Post 1', blog=self.blog1)
+        BlogPost.objects.create(title='Post 2', blog=self.blog1)
+
+        blog.title = 'Blog'
+        blog.save()
+        self.assertEqual(self.get_counts(), [2, 0])
+        self.assertEqual(blog.posts_count, 2)
+
+        blog.posts_count = 5
+        blog.save(update_fields=['posts_count'])
+        self.assertEqual(self.get_counts(), [5, 0])
+
+    def test_signals_are_only_connected_to_the_related_model(self):
+        self.assertIn(blog_posts_count.remember_key, post_init._live_receivers(BlogPost))
+        self.assertNotIn(blog_posts_count.remember_key, post_init._live_receivers(Blog))
+
+    def test_counts_are_updated_in_the_database_written(self):
+        blog = Blog.objects.using('replica').create(title='Replica blog')
+        post = BlogPost.objects.using('replica').create(title='Post', blog=blog)
+        self.assertEqual(Blog.objects.using('replica').get(pk=blog.pk).posts_count, 1)
+        post.delete()
+        self.assertEqual(Blog.objects.using('replica').get(pk=blog.pk).posts_count, 0)
+        self.assertEqual(self.get_counts(), [0, 0])
+
+    def test_rebuild(self):
+        BlogPost.objects.bulk_create([BlogPost(title='Post', blog=self.blog2) for i in range(3)])
+        self.assertEqual(self.get_counts(), [0, 0])
+
+        self.assertEqual(blog_posts_count.rebuild(), 2)
+        self.assertEqual(self.get_counts(), [0, 3])
+
+    def test_command(self):
+        BlogPost.objects.bulk_create([BlogPost(title='Post', blog=self.blog1)])
+        out = StringIO()
+        call_command('rebuild_counter_caches', 'tests.blog.posts_count', stdout=out)
+        self.assertEqual(out.getvalue(), 'Rebuilt tests.blog.posts_count: 2 rows\n')
+        self.assertEqual(self.get_counts(), [1, 0])
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_counter_caches', 'tests.blog.unknown', stdout=out)
+
+    def test_filter_uses_column(self):
+        BlogPost.objects.create(title='Post 1', blog=self.blog1)
+        BlogPost.objects.create(title='Post 2', blog=self.blog1)
+        query = '''
+        {
+            allBlogs(cachedPostCount_Gte: 2) {
+                edges {
+                    node {
+                        title
+                    }
+                }
+            }
+        }
+        '''
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/graphql/', {'query': query}).json()
+        titles = [edge['node']['title'] for edge in response['data']['allBlogs']['edges']]
+        self.assertEqual(titles, ['Blog 1'])
+
+        sql = queries[-1]['sql']
+        self.assertIn('"tests_blog"."posts_count" >= 2', sql)
+        self.assertNotIn('COUNT', sql)
+        self.assertNotIn('JOIN', sql)
+
+    def test_disabled_filter_annotates_count(self):
+        blog_posts_count.enabled = False
+        try:
+            plan = BlogField(BlogConnection).get_filter_plan(cached_post_count__gte=2)
+        finally:
+            blog_posts_count.enabled = True
+        self.assertEqual(list(plan.annotations.expressions), ['blog_post_count'])
+        self.assertEqual(plan.entries[0][2]['field_lookup'], 'blog_post_count__gte')
+
+        plan = BlogField(BlogConnection).get_filter_plan(cached_post_count__gte=2)
+        self.assertEqual(list(plan.annotations.expressions), [])
+        self.assertEqual(plan.entries[0][2]['field_lookup'], 'posts_count__gte')
@@ -0,0 +1,94 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from graphene_django_helpers.explain import summarize_plan
+from tests.graphql.schema import BlogQuery
+from tests.models import Blog, BlogPost
+
+supports_explain = getattr(connection.features, 'supports_explaining_query_execution', False)
+
+
+class SummarizePlanTests(TestCase):
+
+    def test_sqlite(self):
+        summary = summarize_plan([
+            'SCAN tests_blogpost',
+            'SEARCH tests_blog USING INTEGER PRIMARY KEY (rowid=?)',
+            'SEARCH U0 USING INDEX tests_blogpost_blog_id_a3e1b2f5 (blog_id=?)',
+            'USE TEMP B-TREE FOR ORDER BY',
+        ])
+        self.assertEqual(summary['full_scans'], ['tests_blogpost'])
+        self.assertEqual(summary['temp_btrees'], ['ORDER BY'])
+        self.assertEqual(summary['indexes'], ['INTEGER PRIMARY KEY', 'tests_blogpost_blog_id_a3e1b2f5'])
+
+    def test_postgresql(self):
+        summary = summarize_plan([
+            'Sort  (cost=25.1..25.2 rows=6 width=520)',
+            '  Sort Key: tests_blogpost.id',
+            '  ->  Nested Loop  (cost=0.15..25.0 rows=6 width=520)',
+            '        ->  Seq Scan on tests_blogpost  (cost=0.00..12.0 rows=1 width=520)',
+            '        ->  Index Scan using tests_blog_pkey on tests_blog  (cost=0.15..8.17 rows=1 width=4)',
+        ])
+        self.assertEqual(summary['full_scans'], ['tests_blogpost'])
+        self.assertEqual(summary['temp_btrees'], ['SORT'])
+        self.assertEqual(summary['indexes'], ['tests_blog_pkey'])
+
+
+class ExplainTests(TestCase):
+    query = '''
+    {
+        allBlogPosts(title: "Post 1") {
+            edges {
+                node {
+                    title
+                }
+            }
+        }
+    }
+    '''
+
+    def setUp(self):
+        self.field = BlogQuery._meta.fields['all_blog_posts']
+        self.field.get_cached_filter_plan.cache_clear()
+        blog = Blog.objects.create(title='Blog 1')
+        BlogPost.objects.create(title='Post 1', blog=blog)
+
+    def tearDown(self):
+        for name in ('explain_plans', 'explain_threshold'):
+            self.field.__dict__.pop(name, None)
+        self.field.get_cached_filter_plan.cache_clear()
+
+    @skipUnless(supports_explain, 'Explaining queries requires Django 2.1')
+    @override_settings(DEBUG=True)
+    def test_plans_are_attached_to_the_trace(self):
+        self.field.explain_plans = True
+        data = self.client.post('/graphql/trace/', {'query': self.query}, HTTP_X_FILTER_TRACE='1').json()
+        self.assertEqual(len(data['data']['allBlogPosts']['edges']), 1)
+
+        plans = data['extensions']['filterTrace'][0]['plans']
+        self.assertEqual(len(plans), 1)
+        self.assertIn('"tests_blogpost"."title" = %s', plans[0]['sql'])
+        self.assertEqual(plans[0]['full_scans'], ['tests_blogpost'])
+        self.assertGreaterEqual(plans[0]['duration'], 0)
+        self.assertTrue(plans[0]['plan'])
+
+        # Explaining is not a query of the field
+        queries = data['extensions']['filterTrace'][0]['queries']
+        self.assertEqual([query['sql'] for query in queries], [plans[0]['sql']])
+
+    @override_settings(DEBUG=True)
+    def test_plans_are_only_attached_when_enabled(self):
+        data = self.client.post('/graphql/trace/', {'query': self.query}, HTTP_X_FILTER_TRACE='1').json()
+        self.assertNotIn('plans', data['extensions']['filterTrace'][0])
+
+    @skipUnless(supports_explain, 'Explaining queries requires Django 2.1')
+    def test_slow_plans_are_logged_once(self):
+        self.field.explain_threshold = -1
+        with self.assertLogs('graphene_django_helpers.fields', 'WARNING') as logs:
+            self.client.post('/graphql/', {'query': self.query})
+            self.client.post('/graphql/', {'query': self.query})
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('Statement of BlogPostField with arguments title took', logs.output[0])
+        self.assertIn('full scans: tests_blogpost', logs.output[0])
@@ -0,0 +1,91 @@
+import json
+
+from django.contrib.auth.models import Permission, User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from graphene_django_helpers.views import FilteredExportView
+from tests.graphql.schema import BlogQuery
+from tests.models import Blog, BlogPost
+
+
+class FilteredExportViewTests(TestCase):
+
+    def setUp(self):
+        self.blog1 = Blog.objects.create(title='Blog 1')
+        self.blog2 = Blog.objects.create(title='Blog 2', enabled=False)
+        self.posts = [
+            BlogPost.objects.create(title='Blog 1 - Post {}'.format(i), blog=self.blog1) for i in range(1, 6)
+        ]
+        BlogPost.objects.create(title='Blog 2 - Post 1', blog=self.blog2)
+
+    def get_lines(self, response):
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_ndjson(self):
+        response = self.client.get('/exports/blog-posts/', {'blog__title': 'Blog 1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('filename="blogpost.ndjson"', response['Content-Disposition'])
+
+        rows = [json.loads(line) for line in self.get_lines(response)]
+        self.assertEqual(rows, [
+            {'id': post.pk, 'title': post.title, 'blog__title': 'Blog 1'} for post in self.posts
+        ])
+
+    def test_csv(self):
+        response = self.client.get('/exports/blog-posts/', {'format': 'csv', 'title': 'Blog 2 - Post 1'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(self.get_lines(response), [
+            'id,title,blog__title',
+            '{},Blog 2 - Post 1,Blog 2'.format(BlogPost.objects.get(blog=self.blog2).pk),
+        ])
+
+    def test_rows_are_streamed_in_chunks_from_one_query(self):
+        response = self.client.get('/exports/blog-posts/', {'blog__title': 'Blog 1'})
+        with CaptureQueriesContext(connection) as queries:
+            chunks = list(response.streaming_content)
+        # Two rows per chunk
+        self.assertEqual([chunk.count(b'\n') for chunk in chunks], [2, 2, 1])
+        self.assertEqual(len(queries), 1)
+
+    def test_arguments_are_parsed_by_type(self):
+        response = self.client.get('/exports/blogs/', {'enabled': 'false'})
+        self.assertEqual([json.loads(line)['title'] for line in self.get_lines(response)], ['Blog 2'])
+
+        response = self.client.get('/exports/blogs/', {'post_count__gte': '2'})
+        self.assertEqual([json.loads(line)['title'] for line in self.get_lines(response)], ['Blog 1'])
+
+    def test_empty_result_runs_no_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/exports/blogs/', {'post_count__gte': '2', 'post_count__lte': '1'})
+            self.assertEqual(self.get_lines(response), [])
+        self.assertEqual(len(queries), 0)
+
+    def test_invalid_arguments(self):
+        self.assertEqual(self.client.get('/exports/blogs/', {'unknown': '1'}).status_code, 400)
+        self.assertEqual(self.client.get('/exports/blogs/', {'post_count__gte': 'many'}).status_code, 400)
+        self.assertEqual(self.client.get('/exports/blogs/', {'enabled': 'maybe'}).status_code, 400)
+        self.assertEqual(self.client.get('/exports/blogs/', {'format': 'xml'}).status_code, 400)
+
+    def test_default_columns_are_exposed_by_the_node_type(self):
+        response = self.client.get('/exports/blogs/', {'title': 'Blog 1'})
+        self.assertEqual([json.loads(line) for line in self.get_lines(response)], [
+            {'id': self.blog1.pk, 'title': 'Blog 1', 'description': None},
+        ])
+
+    def test_permission_required(self):
+        self.assertEqual(self.client.get('/exports/private-blogs/').status_code, 403)
+
+        user = User.objects.create_user('user')
+        user.user_permissions.add(Permission.objects.get(codename='change_blog'))
+        self.client.force_login(user)
+        self.assertEqual(self.client.get('/exports/private-blogs/').status_code, 200)
+
+    def test_queryset_is_required(self):
+        view = FilteredExportView(field=BlogQuery._meta.fields['all_blogs'])
+        with self.assertRaises(ImproperlyConfigured):
+            view.get_queryset(None)
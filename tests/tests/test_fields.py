@@ -0,0 +1,687 @@
+import datetime
+import decimal
+import json
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import Case, DateTimeField, Value, When
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from graphql_relay.connection.arrayconnection import offset_to_cursor
+
+from graphene_django_helpers import arguments, fields
+from graphene_django_helpers.caching import get_version_key
+from graphene_django_helpers.counting import CachedCount, CappedCount, ExplainCount
+from graphene_django_helpers.pagination import CursorEncoder, KeysetPaginator
+from tests.graphql.connections import BlogConnection
+from tests.graphql.schema import BlogQuery
+from tests.models import Blog, BlogPost
+
+
+class ArgumentMapTests(TestCase):
+    def test_argument_map_is_shared_by_instances(self):
+        field = BlogQuery._meta.fields['all_blogs']
+        other = type(field)(BlogConnection)
+        self.assertIs(other.argument_map, field.argument_map)
+        self.assertIs(other.args['title'], field.args['title'])
+        with self.assertRaises(TypeError):
+            other.argument_map['title'] = None
+        with self.assertRaises(TypeError):
+            other.argument_map['title']['params']['name'] = None
+
+    def test_subclasses_get_their_own_argument_map(self):
+        field_class = BlogQuery._meta.fields['all_blogs'].__class__
+        subclass = type('SubclassField', (field_class,), {'arguments': [arguments.Filter('title')]})
+        self.assertEqual(list(subclass(BlogConnection).argument_map), ['title'])
+        self.assertIn('enabled', field_class(BlogConnection).argument_map)
+
+    def test_instance_argument_maps(self):
+        field_class = BlogQuery._meta.fields['all_blogs'].__class__
+
+        class InstanceArgumentsField(field_class):
+            def __init__(self, *args, **kwargs):
+                self.arguments = [arguments.Filter('title')]
+                super().__init__(*args, **kwargs)
+
+        class InstanceMapField(field_class):
+            def build_argument_map(self):
+                argument_map = dict(super().build_argument_map())
+                del argument_map['title']
+                return argument_map
+
+        field = InstanceArgumentsField(BlogConnection)
+        self.assertEqual(list(field.argument_map), ['title'])
+        self.assertEqual(list(field.args), ['title', 'before', 'after', 'first', 'last'])
+        field.argument_map['title'] = field.argument_map['title']
+        self.assertIn('enabled', field_class.get_argument_map())
+
+        field = InstanceMapField(BlogConnection)
+        self.assertNotIn('title', field.argument_map)
+        self.assertNotIn('title', field.args)
+        self.assertIn('enabled', field.args)
+        self.assertIsNot(InstanceMapField(BlogConnection).argument_map, field.argument_map)
+
+    def test_arguments_named_like_field_parameters(self):
+        field_class = type('NamedArgumentsField', (fields.ConnectionFieldWithArguments,), {
+            'arguments': [arguments.Filter('name', field_name='title'), arguments.Filter('description')],
+        })
+        field = field_class(BlogConnection, description='Blogs')
+        self.assertEqual(field.description, 'Blogs')
+        self.assertIsNone(field.name)
+        self.assertEqual(
+            list(field.args), ['name', 'description', 'before', 'after', 'first', 'last'],
+        )
+
+    def test_filter_plan_argument_is_reserved(self):
+        field_class = type('ReservedArgumentField', (fields.ConnectionFieldWithArguments,), {
+            'arguments': [arguments.Filter('filter_plan', field_name='title')],
+        })
+        with self.assertRaises(ImproperlyConfigured):
+            field_class(BlogConnection)
+
+
+class FilterPlanTests(TestCase):
+    def setUp(self):
+        self.blog1 = Blog.objects.create(title='Blog 1', description='Description 1', enabled=False)
+        self.blog2 = Blog.objects.create(title='Blog 2', description='Description 2')
+
+        self.blog1_post1 = BlogPost.objects.create(title='Blog 1 - Post 1', body='Body 1 - 1', blog=self.blog1)
+
+        self.field = BlogQuery._meta.fields['all_blogs']
+        self.field.get_cached_filter_plan.cache_clear()
+
+    def run_gql(self, query, variables=None):
+        data = {
+            'query': query,
+        }
+        if variables:
+            data['variables'] = json.dumps(variables)
+        return self.client.post('/graphql/', data)
+
+    def test_plan_is_cached_per_argument_keys(self):
+        query = '''
+        query ($enabled: Boolean, $title: String) {
+            allBlogs(enabled: $enabled, title: $title, first: 10) {
+                edges {
+                    node {
+                        id
+                    }
+                }
+            }
+        }
+        '''
+        for title in ['Blog 1', 'Blog 2', 'Blog 3']:
+            response = self.run_gql(query, {
+                'enabled': True,
+                'title': title,
+            })
+            self.assertEqual(response.status_code, 200)
+
+        cache_info = self.field.get_cached_filter_plan.cache_info()
+        # Compiled for the first request only
+        self.assertEqual(cache_info.misses, 1)
+
+    def test_plan_entries(self):
+        plan = self.field.get_filter_plan(count__gte=1, enabled=True, title='Blog 1', first=10)
+
+        # Entries follow the declaration order of the field arguments
+        self.assertEqual([key for key, instance, params in plan.entries], ['title', 'enabled', 'count__gte'])
+        self.assertEqual([key for key, instance, params in plan.before], [])
+        self.assertEqual([key for key, instance, params in plan.after], ['title', 'enabled', 'count__gte'])
+
+        params = dict((key, params) for key, instance, params in plan.entries)
+        self.assertEqual(params['title']['field_lookup'], 'title')
+        self.assertEqual(params['enabled']['field_lookup'], 'enabled')
+        self.assertEqual(params['count__gte']['conditions_method'], self.field.filter_by_count)
+        self.assertNotIn('field_lookup', params['count__gte'])
+
+        self.assertIs(self.field.get_filter_plan(title='Blog 2', enabled=False, count__gte=1), plan)
+
+    def test_subclass_annotations_are_planned(self):
+        plan = self.field.get_filter_plan(filter_by_count__gte=1)
+        self.assertEqual([key for key, instance, params in plan.before], [])
+        self.assertEqual(list(plan.annotations.expressions), ['blog_post_count'])
+        self.assertEqual(plan.entries[0][2]['field_lookup'], 'blog_post_count__gte')
+
+    def test_identical_annotations_are_applied_once(self):
+        plan = self.field.get_filter_plan(count__gte=1, filter_by_count__gte=1)
+        self.assertEqual(list(plan.annotations.expressions), ['count'])
+        self.assertEqual(plan.annotations.aliases, {'count': 'count', 'blog_post_count': 'count'})
+        self.assertEqual(plan.entries[1][2]['field_lookup'], 'count__gte')
+
+        query = '''
+        query blogs($count: Int, $filterByCount: Int) {
+            allBlogs(count_Gte: $count, filterByCount_Gte: $filterByCount) {
+                edges {
+                    node {
+                        title
+                    }
+                }
+            }
+        }
+        '''
+        with CaptureQueriesContext(connection) as context:
+            response = self.run_gql(query, {'count': 1, 'filterByCount': 1})
+        data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual([edge['node']['title'] for edge in data['data']['allBlogs']['edges']], ['Blog 1'])
+        sql = context.captured_queries[-1]['sql']
+        self.assertNotIn('blog_post_count', sql)
+        self.assertEqual(sql.count('JOIN'), 1)
+
+
+class QuerysetOptimizationTests(TestCase):
+    def setUp(self):
+        self.blog1 = Blog.objects.create(title='Blog 1', description='Description 1')
+        self.blog2 = Blog.objects.create(title='Blog 2', description='Description 2')
+
+        BlogPost.objects.create(title='Blog 1 - Post 1', body='Body 1 - 1', blog=self.blog1)
+        BlogPost.objects.create(title='Blog 1 - Post 2', body='Body 1 - 2', blog=self.blog1)
+        BlogPost.objects.create(title='Blog 2 - Post 1', body='Body 2 - 1', blog=self.blog2)
+
+    def run_gql(self, query, variables=None):
+        data = {
+            'query': query,
+        }
+        if variables:
+            data['variables'] = json.dumps(variables)
+        return self.client.post('/graphql/', data)
+
+    def test_forward_relation_is_selected(self):
+        query = '''
+        {
+            allBlogPosts {
+                edges {
+                    node {
+                        ...PostFragment
+                    }
+                }
+            }
+        }
+        fragment PostFragment on BlogPostType {
+            title
+            blog {
+                title
+            }
+        }
+        '''
+        with self.assertNumQueries(1):
+            response = self.run_gql(query)
+        data = response.json()
+        self.assertEqual(len(data['data']['allBlogPosts']['edges']), 3)
+        self.assertEqual(data['data']['allBlogPosts']['edges'][2]['node']['blog']['title'], 'Blog 2')
+
+    def test_filter_join_is_reused(self):
+        query = '''
+        {
+            allBlogPosts(blog_Title: "Blog 1") {
+                edges {
+                    node {
+                        title
+                        blog {
+                            title
+                        }
+                    }
+                }
+            }
+        }
+        '''
+        with CaptureQueriesContext(connection) as context:
+            response = self.run_gql(query)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(context.captured_queries[0]['sql'].count('JOIN'), 1)
+        data = response.json()
+        self.assertEqual(len(data['data']['allBlogPosts']['edges']), 2)
+        self.assertEqual(data['data']['allBlogPosts']['edges'][0]['node']['blog']['title'], 'Blog 1')
+
+    def test_skipped_relation_is_not_selected(self):
+        query = '''
+        query ($skip: Boolean!) {
+            allBlogPosts {
+                edges {
+                    node {
+                        title
+                        blog @skip(if: $skip) {
+                            title
+                        }
+                    }
+                }
+            }
+        }
+        '''
+        with CaptureQueriesContext(connection) as context:
+            self.run_gql(query, {'skip': True})
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('JOIN', context.captured_queries[0]['sql'])
+
+    def test_projection(self):
+        query = '''
+        {
+            allBlogPosts {
+                edges {
+                    node {
+                        id
+                        title
+                        blog {
+                            title
+                        }
+                    }
+                }
+            }
+        }
+        '''
+        with CaptureQueriesContext(connection) as context:
+            response = self.run_gql(query)
+        self.assertEqual(len(context.captured_queries), 1)
+        sql = context.captured_queries[0]['sql']
+        self.assertNotIn('"body"', sql)
+        self.assertNotIn('"description"', sql)
+        self.assertIn('"tests_blogpost"."blog_id"', sql)
+        data = response.json()
+        self.assertEqual(data['data']['allBlogPosts']['edges'][0]['node']['blog']['title'], 'Blog 1')
+
+    def test_projection_with_deferred_text_field_selected(self):
+        query = '''
+        {
+            allBlogPosts {
+                edges {
+                    node {
+                        body
+                    }
+                }
+            }
+        }
+        '''
+        with self.assertNumQueries(1):
+            response = self.run_gql(query)
+        data = response.json()
+        self.assertEqual(data['data']['allBlogPosts']['edges'][0]['node']['body'], 'Body 1 - 1')
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.blogs = [
+            Blog.objects.create(title='Blog {}'.format(i), description='Description {}'.format(i)) for i in range(5)
+        ]
+
+    def run_gql(self, query, variables=None):
+        data = {
+            'query': query,
+        }
+        if variables:
+            data['variables'] = json.dumps(variables)
+        return self.client.post('/graphql/', data)
+
+    def get_page(self, **variables):
+        query = '''
+        query ($first: Int, $last: Int, $after: String, $before: String) {
+            allBlogs(first: $first, last: $last, after: $after, before: $before) {
+                pageInfo {
+                    hasNextPage
+                    hasPreviousPage
+                    startCursor
+                    endCursor
+                }
+                edges {
+                    node {
+                        title
+                    }
+                }
+            }
+        }
+        '''
+        response = self.run_gql(query, variables)
+        return response.json()['data']['allBlogs']
+
+    def get_titles(self, page):
+        return [edge['node']['title'] for edge in page['edges']]
+
+    def test_forward(self):
+        page = self.get_page(first=2)
+        self.assertEqual(self.get_titles(page), ['Blog 0', 'Blog 1'])
+        self.assertTrue(page['pageInfo']['hasNextPage'])
+
+        page = self.get_page(first=2, after=page['pageInfo']['endCursor'])
+        self.assertEqual(self.get_titles(page), ['Blog 2', 'Blog 3'])
+        self.assertTrue(page['pageInfo']['hasNextPage'])
+
+        with CaptureQueriesContext(connection) as context:
+            page = self.get_page(first=2, after=page['pageInfo']['endCursor'])
+        self.assertEqual(self.get_titles(page), ['Blog 4'])
+        self.assertFalse(page['pageInfo']['hasNextPage'])
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('OFFSET', context.captured_queries[0]['sql'])
+
+    def test_backward(self):
+        page = self.get_page(last=2)
+        self.assertEqual(self.get_titles(page), ['Blog 3', 'Blog 4'])
+        self.assertTrue(page['pageInfo']['hasPreviousPage'])
+
+        page = self.get_page(last=2, before=page['pageInfo']['startCursor'])
+        self.assertEqual(self.get_titles(page), ['Blog 1', 'Blog 2'])
+
+        page = self.get_page(last=2, before=page['pageInfo']['startCursor'])
+        self.assertEqual(self.get_titles(page), ['Blog 0'])
+        self.assertFalse(page['pageInfo']['hasPreviousPage'])
+
+    def test_invalid_cursor_is_ignored(self):
+        page = self.get_page(first=1, after='invalid')
+        self.assertEqual(self.get_titles(page), ['Blog 0'])
+
+    def test_mixed_ordering(self):
+        Blog.objects.filter(pk__in=[self.blogs[0].pk, self.blogs[1].pk]).update(title='Same')
+        paginator = KeysetPaginator(ordering=['-title'])
+        self.assertEqual(paginator.get_ordering(Blog.objects.all()), ['-title', 'pk'])
+
+        # Ties on title are broken by the primary key across pages
+        page = paginator.paginate(Blog.objects.all(), BlogConnection, {'first': 1})
+        self.assertEqual([edge.node.pk for edge in page.edges], [self.blogs[0].pk])
+
+        page = paginator.paginate(Blog.objects.all(), BlogConnection, {'first': 2, 'after': page.page_info.end_cursor})
+        self.assertEqual([edge.node.pk for edge in page.edges], [self.blogs[1].pk, self.blogs[4].pk])
+
+        page = paginator.paginate(Blog.objects.all(), BlogConnection, {'first': 3, 'after': page.page_info.end_cursor})
+        self.assertEqual([edge.node.pk for edge in page.edges], [self.blogs[3].pk, self.blogs[2].pk])
+        self.assertFalse(page.page_info.has_next_page)
+
+    def test_microsecond_cursors(self):
+        created = datetime.datetime(2020, 1, 1, 12, 0, 0, 123456)
+        queryset = Blog.objects.annotate(created=Case(
+            *[When(pk=blog.pk, then=Value(created + datetime.timedelta(microseconds=i))) for i, blog in enumerate(
+                self.blogs,
+            )],
+            output_field=DateTimeField(),
+        ))
+        paginator = KeysetPaginator(ordering=['created'])
+
+        page = paginator.paginate(queryset, BlogConnection, {'first': 2})
+        self.assertEqual([edge.node.pk for edge in page.edges], [self.blogs[0].pk, self.blogs[1].pk])
+        ordering = paginator.get_ordering(queryset)
+        self.assertEqual(
+            paginator.get_cursor_values(page.page_info.end_cursor, ordering),
+            ['2020-01-01T12:00:00.123457', self.blogs[1].pk],
+        )
+
+        # The last row of a page is not repeated on the next one
+        page = paginator.paginate(queryset, BlogConnection, {'first': 2, 'after': page.page_info.end_cursor})
+        self.assertEqual([edge.node.pk for edge in page.edges], [self.blogs[2].pk, self.blogs[3].pk])
+        self.assertEqual(
+            json.dumps([decimal.Decimal('1.10'), datetime.time(12, 0, 0, 123456)], cls=CursorEncoder),
+            '["1.10", "12:00:00.123456"]',
+        )
+
+
+class CountTests(TestCase):
+    def setUp(self):
+        self.blog1 = Blog.objects.create(title='Blog 1', description='Description 1')
+        self.blog2 = Blog.objects.create(title='Blog 2', description='Description 2')
+
+        for i in range(3):
+            BlogPost.objects.create(title='Blog 1 - Post {}'.format(i), body='Body', blog=self.blog1)
+        BlogPost.objects.create(title='Blog 2 - Post 1', body='Body', blog=self.blog2)
+
+    def run_gql(self, query, variables=None):
+        data = {
+            'query': query,
+        }
+        if variables:
+            data['variables'] = json.dumps(variables)
+        return self.client.post('/graphql/', data)
+
+    def test_count_only_runs_when_selected(self):
+        query = '''
+        query ($first: Int, $last: Int) {
+            allBlogPosts(blog_Title: "Blog 1", first: $first, last: $last) {
+                %s
+                edges {
+                    node {
+                        title
+                    }
+                }
+            }
+        }
+        '''
+        with self.assertNumQueries(1):
+            response = self.run_gql(query % '', {'first': 2})
+        self.assertEqual(len(response.json()['data']['allBlogPosts']['edges']), 2)
+
+        with self.assertNumQueries(2):
+            response = self.run_gql(query % 'totalCount', {'first': 2})
+        data = response.json()
+        self.assertEqual(data['data']['allBlogPosts']['totalCount'], 3)
+        self.assertEqual(len(data['data']['allBlogPosts']['edges']), 2)
+
+        # Paginating backwards already needs the length, which is reused
+        with self.assertNumQueries(2):
+            response = self.run_gql(query % 'totalCount', {'last': 1})
+        data = response.json()
+        self.assertEqual(data['data']['allBlogPosts']['totalCount'], 3)
+        self.assertEqual(data['data']['allBlogPosts']['edges'][0]['node']['title'], 'Blog 1 - Post 2')
+
+    def test_offset_pagination(self):
+        query = '''
+        query ($after: String) {
+            allBlogPosts(first: 2, after: $after) {
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+                edges {
+                    node {
+                        title
+                    }
+                }
+            }
+        }
+        '''
+        data = self.run_gql(query).json()['data']['allBlogPosts']
+        self.assertTrue(data['pageInfo']['hasNextPage'])
+
+        data = self.run_gql(query, {'after': data['pageInfo']['endCursor']}).json()['data']['allBlogPosts']
+        self.assertEqual([edge['node']['title'] for edge in data['edges']], ['Blog 1 - Post 2', 'Blog 2 - Post 1'])
+        self.assertFalse(data['pageInfo']['hasNextPage'])
+
+    def test_count_strategies(self):
+        self.assertEqual(CappedCount(cap=2).count(BlogPost.objects.all()), 2)
+        self.assertEqual(CappedCount(cap=10).count(BlogPost.objects.all()), 4)
+        # Estimates are not available on SQLite
+        self.assertEqual(ExplainCount(cap=3).count(BlogPost.objects.all()), 3)
+
+        plan = [{'Plan': {'Node Type': 'Seq Scan', 'Relation Name': 'tests_blogpost', 'Plan Rows': 1200}}]
+        self.assertEqual(ExplainCount().parse_estimate(plan), 1200)
+        self.assertEqual(ExplainCount().parse_estimate(json.dumps(plan)), 1200)
+
+        strategy = CachedCount(timeout=60)
+        queryset = BlogPost.objects.filter(blog=self.blog1)
+        cache.delete(strategy.get_cache_key(queryset))
+        self.assertEqual(strategy.count(queryset), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(strategy.count(BlogPost.objects.filter(blog=self.blog1)), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(strategy.count(BlogPost.objects.filter(pk__in=[])), 0)
+
+
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.blog1 = Blog.objects.create(title='Blog 1', description='Description 1')
+        self.blog2 = Blog.objects.create(title='Blog 2', description='Description 2')
+
+        self.blog1_post1 = BlogPost.objects.create(title='Blog 1 - Post 1', body='Body', blog=self.blog1)
+        self.blog1_post2 = BlogPost.objects.create(title='Blog 1 - Post 2', body='Body', blog=self.blog1)
+        self.blog2_post1 = BlogPost.objects.create(title='Blog 2 - Post 1', body='Body', blog=self.blog2)
+
+        self.field = BlogQuery._meta.fields['all_cached_blog_posts']
+        self.field.result_cache.hits = 0
+        self.field.result_cache.misses = 0
+
+    def run_gql(self, query, variables=None):
+        data = {
+            'query': query,
+        }
+        if variables:
+            data['variables'] = json.dumps(variables)
+        return self.client.post('/graphql/', data)
+
+    def get_titles(self, title, first=10):
+        query = '''
+        query ($title: String, $first: Int) {
+            allCachedBlogPosts(blog_Title: $title, first: $first) {
+                pageInfo {
+                    hasNextPage
+                }
+                edges {
+                    cursor
+                    node {
+                        title
+                    }
+                }
+            }
+        }
+        '''
+        data = self.run_gql(query, {'title': title, 'first': first}).json()['data']['allCachedBlogPosts']
+        return [edge['node']['title'] for edge in data['edges']], data
+
+    def test_hit_and_miss(self):
+        titles, data = self.get_titles('Blog 1', first=1)
+        self.assertEqual(titles, ['Blog 1 - Post 1'])
+        self.assertEqual((self.field.result_cache.hits, self.field.result_cache.misses), (0, 1))
+
+        with CaptureQueriesContext(connection) as context:
+            cached_titles, cached_data = self.get_titles('Blog 1', first=1)
+        self.assertEqual(cached_titles, titles)
+        self.assertEqual(cached_data, data)
+        self.assertEqual((self.field.result_cache.hits, self.field.result_cache.misses), (1, 1))
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertIn('IN (', context.captured_queries[0]['sql'])
+        self.assertNotIn('JOIN', context.captured_queries[0]['sql'])
+
+        # A different pagination window is a different entry
+        titles, data = self.get_titles('Blog 1', first=2)
+        self.assertEqual(titles, ['Blog 1 - Post 1', 'Blog 1 - Post 2'])
+        self.assertEqual((self.field.result_cache.hits, self.field.result_cache.misses), (1, 2))
+
+    def test_invalidation(self):
+        self.assertEqual(self.get_titles('Blog 1')[0], ['Blog 1 - Post 1', 'Blog 1 - Post 2'])
+        self.assertEqual(self.get_titles('Blog 1')[0], ['Blog 1 - Post 1', 'Blog 1 - Post 2'])
+
+        # Blog is touched through the blog__title filter
+        self.blog2.title = 'Blog 1'
+        self.blog2.save()
+        self.assertEqual(self.get_titles('Blog 1')[0], ['Blog 1 - Post 1', 'Blog 1 - Post 2', 'Blog 2 - Post 1'])
+
+        self.blog1_post2.delete()
+        self.assertEqual(self.get_titles('Blog 1')[0], ['Blog 1 - Post 1', 'Blog 2 - Post 1'])
+        self.assertEqual((self.field.result_cache.hits, self.field.result_cache.misses), (1, 3))
+
+    def test_invalidation_without_resolving(self):
+        # Processes that never resolved the field, like other workers, invalidate the results too
+        key = get_version_key('tests.blog')
+        cache.set(key, 'version')
+        self.blog1.save()
+        self.assertIsNone(cache.get(key))
+
+    def test_only_watched_models_are_invalidated(self):
+        self.assertEqual(self.field.result_cache.get_watched_labels(), {'tests.blog', 'tests.blogpost'})
+        key = get_version_key('auth.group')
+        cache.set(key, 'version')
+        Group.objects.create(name='Group')
+        self.assertEqual(cache.get(key), 'version')
+
+    def test_parent_queryset_is_part_of_the_key(self):
+        result_cache = self.field.result_cache
+        self.assertNotEqual(
+            result_cache.get_queryset_key(BlogPost.objects.filter(blog=self.blog1)),
+            result_cache.get_queryset_key(BlogPost.objects.filter(blog=self.blog2)),
+        )
+        self.assertEqual(result_cache.get_queryset_key(BlogPost.objects.none()), ['default', None, []])
+
+    def test_locmem_entries_are_bounded(self):
+        self.field.result_cache.max_entries = 1
+        try:
+            self.get_titles('Blog 1')
+            self.get_titles('Blog 2')
+            self.get_titles('Blog 1')
+        finally:
+            self.field.result_cache.max_entries = self.field.cache_results_max_entries
+        self.assertEqual((self.field.result_cache.hits, self.field.result_cache.misses), (0, 3))
+
+
+class BatchedConnectionTests(TestCase):
+    def setUp(self):
+        self.blogs = [Blog.objects.create(title='Blog {}'.format(i)) for i in range(3)]
+        for blog in self.blogs[:2]:
+            for i in range(4):
+                BlogPost.objects.create(title='{} - Post {}'.format(blog.title, i), blog=blog)
+
+    def run_gql(self, query, variables=None):
+        data = {
+            'query': query,
+        }
+        if variables:
+            data['variables'] = json.dumps(variables)
+        return self.client.post('/graphql/', data)
+
+    def get_posts(self, arguments, queries):
+        query = '''
+        {
+            allBlogs {
+                edges {
+                    node {
+                        title
+                        filteredPosts(%s) {
+                            totalCount
+                            pageInfo {
+                                hasNextPage
+                                hasPreviousPage
+                            }
+                            edges {
+                                node {
+                                    title
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+        ''' % arguments
+        with self.assertNumQueries(queries):
+            response = self.run_gql(query)
+        data = response.json()
+        return [edge['node']['filteredPosts'] for edge in data['data']['allBlogs']['edges']]
+
+    def get_titles(self, posts):
+        return [edge['node']['title'] for edge in posts['edges']]
+
+    def test_first(self):
+        posts = self.get_posts('first: 2', 3)
+        self.assertEqual(self.get_titles(posts[0]), ['Blog 0 - Post 0', 'Blog 0 - Post 1'])
+        self.assertEqual(self.get_titles(posts[1]), ['Blog 1 - Post 0', 'Blog 1 - Post 1'])
+        self.assertEqual(self.get_titles(posts[2]), [])
+        self.assertEqual([post['totalCount'] for post in posts], [4, 4, 0])
+        self.assertTrue(posts[0]['pageInfo']['hasNextPage'])
+
+    def test_after(self):
+        after = offset_to_cursor(1)
+        posts = self.get_posts('first: 3, after: "{}"'.format(after), 3)
+        self.assertEqual(self.get_titles(posts[0]), ['Blog 0 - Post 2', 'Blog 0 - Post 3'])
+        self.assertFalse(posts[0]['pageInfo']['hasNextPage'])
+
+    def test_last(self):
+        posts = self.get_posts('last: 1', 3)
+        self.assertEqual(self.get_titles(posts[0]), ['Blog 0 - Post 3'])
+        self.assertEqual(self.get_titles(posts[1]), ['Blog 1 - Post 3'])
+        self.assertTrue(posts[1]['pageInfo']['hasPreviousPage'])
+
+        posts = self.get_posts('last: 2, before: "{}"'.format(offset_to_cursor(2)), 3)
+        self.assertEqual(self.get_titles(posts[0]), ['Blog 0 - Post 0', 'Blog 0 - Post 1'])
+        self.assertFalse(posts[0]['pageInfo']['hasPreviousPage'])
+
+    def test_filters(self):
+        posts = self.get_posts('title_Icontains: "post 3"', 3)
+        self.assertEqual(self.get_titles(posts[0]), ['Blog 0 - Post 3'])
+        self.assertEqual(self.get_titles(posts[1]), ['Blog 1 - Post 3'])
+        self.assertEqual([post['totalCount'] for post in posts], [1, 1, 0])
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from graphene_django_helpers.indexes import FUNCTIONAL, IndexAdvice, IndexAdvisor, read_access_log
+from tests.graphql.schema import schema
+from tests.models import Blog
+
+
+class IndexAdvisorTests(TestCase):
+
+    def get_advice(self, field_name, **kwargs):
+        advice = IndexAdvisor(schema).get_advice(**kwargs)
+        return [(item.key, item.kind) for item in advice if item.field_name == field_name]
+
+    def test_advice(self):
+        self.assertEqual(self.get_advice('allBlogs'), [
+            ('title', 'btree'),
+            ('title_filter_with_field_name', 'btree'),
+            ('filter_by_description', 'btree'),
+            # Case insensitive lookups are LIKE comparisons on SQLite
+            ('filter_by_description__iexact', 'unindexable'),
+            ('enabled', 'btree'),
+            ('post_title', 'btree'),
+            ('post_body', 'btree'),
+        ])
+        self.assertEqual(self.get_advice('filteredPosts'), [
+            ('title', 'btree'),
+            ('title__icontains', 'unindexable'),
+        ])
+
+    def test_existing_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE INDEX "tests_blog_title_test" ON "tests_blog" ("title")')
+        advice = self.get_advice('allBlogPosts')
+        self.assertEqual(advice, [('title', 'btree')])
+
+    def test_functional_operation(self):
+        advice = IndexAdvice('allBlogs', 'title__iexact', Blog, Blog._meta.get_field('title'), 'iexact', FUNCTIONAL,
+                             'UPPER')
+        name = advice.get_index_name()
+        self.assertEqual(advice.get_operation(connection), (
+            'migrations.RunSQL(\n'
+            '    \'CREATE INDEX "{0}" ON "tests_blog" (UPPER("title"))\',\n'
+            '    reverse_sql=\'DROP INDEX "{0}"\',\n'
+            ')'
+        ).format(name))
+
+    def test_command(self):
+        entries = [
+            {'path': ['allBlogs'], 'arguments': [
+                {'argument': 'enabled', 'stage': 'alter_filter_conditions'},
+                {'argument': 'enabled', 'stage': 'alter_queryset_after'},
+            ]},
+            {'path': ['allBlogs'], 'arguments': [{'argument': 'enabled', 'stage': 'alter_filter_conditions'}]},
+            {'path': ['allBlogs'], 'arguments': [{'argument': 'post_title', 'stage': 'alter_filter_conditions'}]},
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as f:
+            f.write('\n'.join(json.dumps(entry) for entry in entries))
+        try:
+            self.assertEqual(read_access_log(f.name)[('allBlogs', 'enabled')], 2)
+            out = StringIO()
+            call_command('index_advisor', '--access-log', f.name, '--migrations', stdout=out)
+        finally:
+            os.unlink(f.name)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], (
+            'allBlogs(enabled) on tests.Blog.enabled exact: sequential scan, index on enabled suggested [2 uses]'
+        ))
+        self.assertTrue(lines[1].startswith('allBlogs(postTitle) on tests.BlogPost.title exact'))
+        self.assertIn('# tests', lines)
+        self.assertIn("        index=models.Index(fields=['enabled'], name='tests_blog_enabled_b25173_idx'),", lines)
@@ -0,0 +1,72 @@
+import json
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from graphene_django_helpers.lookups import ValueList
+from tests.models import Blog, BlogPost
+
+
+class ListFilterTests(TestCase):
+    query = '''
+    query ($ids: [ID!], $blogIds: [ID!]) {
+        allBlogPosts(ids: $ids, blogIds: $blogIds) {
+            edges {
+                node {
+                    title
+                }
+            }
+        }
+    }
+    '''
+
+    def setUp(self):
+        self.blog1 = Blog.objects.create(title='Blog 1')
+        self.blog2 = Blog.objects.create(title='Blog 2')
+        self.posts = [
+            BlogPost.objects.create(title='Post {}'.format(i), blog=self.blog1 if i < 4 else self.blog2)
+            for i in range(6)
+        ]
+
+    def get_titles(self, **variables):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                '/graphql/', {'query': self.query, 'variables': json.dumps(variables)},
+            ).json()
+        self.assertNotIn('errors', response)
+        self.sql = queries[-1]['sql'] if len(queries) else None
+        return [edge['node']['title'] for edge in response['data']['allBlogPosts']['edges']]
+
+    def test_short_list(self):
+        ids = [str(self.posts[2].pk), str(self.posts[0].pk), str(self.posts[2].pk)]
+        self.assertEqual(self.get_titles(ids=ids), ['Post 0', 'Post 2'])
+        # Deduplicated and sorted
+        self.assertIn('IN ({}, {})'.format(self.posts[0].pk, self.posts[2].pk), self.sql)
+
+    def test_long_list(self):
+        ids = [str(post.pk) for post in reversed(self.posts[1:])] + ['1000000']
+        self.assertEqual(self.get_titles(ids=ids), ['Post 1', 'Post 2', 'Post 3', 'Post 4', 'Post 5'])
+        self.assertIn('json_each', self.sql)
+
+        # One parameter whatever the length of the list
+        queryset = BlogPost.objects.filter(pk__in=ValueList([post.pk for post in self.posts], BlogPost._meta.pk))
+        self.assertEqual(len(queryset.query.sql_with_params()[1]), 1)
+
+    def test_list_over_sqlite_variable_limit(self):
+        ids = [str(pk) for pk in range(1000000, 1040000)] + [str(self.posts[5].pk)]
+        self.assertEqual(self.get_titles(ids=ids), ['Post 5'])
+
+    def test_relation_list(self):
+        self.assertEqual(self.get_titles(blogIds=[str(self.blog2.pk)]), ['Post 4', 'Post 5'])
+        self.assertEqual(
+            self.get_titles(blogIds=[str(self.blog2.pk), str(self.blog1.pk), '1000', '1001']),
+            ['Post 0', 'Post 1', 'Post 2', 'Post 3', 'Post 4', 'Post 5'],
+        )
+        self.assertIn('json_each', self.sql)
+
+    def test_empty_list(self):
+        # Matches nothing without running any query
+        self.assertEqual(self.get_titles(ids=[]), [])
+        self.assertIsNone(self.sql)
+        self.assertEqual(len(self.get_titles(ids=None)), 6)
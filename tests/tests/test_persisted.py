@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from graphene_django_helpers.persisted import PersistedQueryRegistry, get_query_hash
+from tests.graphql.schema import BlogQuery, schema
+from tests.models import Blog
+from tests.urls import persisted_queries
+
+
+class PersistedQueryTests(TestCase):
+    query = '''
+    query ($title: String) {
+        allBlogs(title: $title, first: 10) {
+            edges {
+                node {
+                    title
+                }
+            }
+        }
+    }
+    '''
+
+    def setUp(self):
+        Blog.objects.create(title='Blog 1', description='Description 1')
+        Blog.objects.create(title='Blog 2', description='Description 2')
+
+        persisted_queries.persisted.clear()
+        persisted_queries.documents.clear()
+        persisted_queries.hits = persisted_queries.misses = 0
+
+        self.field = BlogQuery._meta.fields['all_blogs']
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_gql(self, **data):
+        if 'variables' in data:
+            data['variables'] = json.dumps(data['variables'])
+        return self.client.post('/graphql/persisted/', data)
+
+    def get_titles(self, response):
+        return [edge['node']['title'] for edge in response.json()['data']['allBlogs']['edges']]
+
+    def test_documents_are_compiled_once(self):
+        for title in ['Blog 1', 'Blog 2']:
+            response = self.run_gql(query=self.query, variables={'title': title})
+            self.assertEqual(self.get_titles(response), [title])
+        self.assertEqual((persisted_queries.misses, persisted_queries.hits), (1, 1))
+
+        persisted_query = persisted_queries.get(schema, self.query)
+        self.assertEqual(persisted_query.plans, [(self.field, frozenset(['title', 'first']))])
+
+    def test_invalid_documents(self):
+        for _ in range(2):
+            response = self.run_gql(query='{ allBlogs { unknown } }')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('unknown', response.json()['errors'][0]['message'])
+        self.assertEqual((persisted_queries.misses, persisted_queries.hits), (1, 1))
+
+    def test_ad_hoc_documents_are_evicted(self):
+        queries = ['{ allBlogs(title: "Blog %s") { edges { node { id } } } }' % i for i in range(3)]
+        persisted_queries.add(schema, self.query)
+        for query in queries:
+            self.assertEqual(self.run_gql(query=query).status_code, 200)
+
+        self.assertEqual(list(persisted_queries.documents), [get_query_hash(query) for query in queries[1:]])
+        self.assertIn(get_query_hash(self.query), persisted_queries.persisted)
+
+    def test_persisted_documents_by_hash(self):
+        persisted_query = persisted_queries.add(schema, self.query)
+        self.assertIn(frozenset(['title']), self.field.pinned_filter_plans)
+
+        response = self.run_gql(id=persisted_query.hash, variables={'title': 'Blog 2'})
+        self.assertEqual(self.get_titles(response), ['Blog 2'])
+
+        response = self.run_gql(id=get_query_hash('{ unknown }'))
+        self.assertEqual(response.status_code, 400)
+
+    def test_registry_file(self):
+        path = os.path.join(self.directory, 'registry.json')
+        document_path = os.path.join(self.directory, 'blogs.graphql')
+        with open(document_path, 'w') as f:
+            f.write(self.query)
+
+        out = StringIO()
+        call_command('persisted_queries', path, add=[document_path], stdout=out)
+        self.assertIn('1 persisted queries preloaded with 1 filter plans', out.getvalue())
+        with open(path) as f:
+            self.assertEqual(json.load(f), {'version': 1, 'queries': {get_query_hash(self.query): self.query}})
+
+        registry = PersistedQueryRegistry(path=path)
+        self.assertEqual(registry.get_query(schema, get_query_hash(self.query)), self.query)
+        self.assertIs(registry.get(schema, self.query), registry.persisted[get_query_hash(self.query)])
+
+        with open(document_path, 'w') as f:
+            f.write('{ allBlogs { unknown } }')
+        with self.assertRaises(CommandError):
+            call_command('persisted_queries', path, add=[document_path], stdout=StringIO(), stderr=StringIO())
+
+        with open(path, 'w') as f:
+            json.dump({'version': 1, 'queries': {'0' * 64: self.query}}, f)
+        with self.assertRaises(CommandError):
+            call_command('persisted_queries', path, stdout=StringIO())
@@ -0,0 +1,71 @@
+import time
+
+from django.test import RequestFactory, TestCase
+
+from graphene_django_helpers.routing import (
+    LAST_WRITE_SESSION_KEY, RecentWriteMiddleware, ReplicaUnlessRecentWrite, get_last_write, record_write,
+)
+from tests.models import Blog, BlogPost
+
+
+class RoutingTests(TestCase):
+    databases = {'default', 'replica', 'analytics'}
+    # Django < 2.2
+    multi_db = True
+
+    def setUp(self):
+        for database in ('default', 'replica', 'analytics'):
+            blog = Blog.objects.using(database).create(title='{} blog'.format(database))
+            BlogPost.objects.using(database).create(title='{} post 1'.format(database), blog=blog)
+            BlogPost.objects.using(database).create(title='{} post 2'.format(database), blog=blog)
+
+    def run_gql(self, query):
+        response = self.client.post('/graphql/', {'query': query}).json()
+        self.assertNotIn('errors', response)
+        return response['data']
+
+    def get_titles(self, connection):
+        return [edge['node']['title'] for edge in connection['edges']]
+
+    def test_field_routing(self):
+        data = self.run_gql('{ allReplicaBlogPosts { edges { node { title } } } }')
+        self.assertEqual(self.get_titles(data['allReplicaBlogPosts']), ['replica post 1', 'replica post 2'])
+
+        # Other fields keep the database of their parent resolver
+        data = self.run_gql('{ allBlogPosts { edges { node { title } } } }')
+        self.assertEqual(self.get_titles(data['allBlogPosts']), ['default post 1', 'default post 2'])
+
+    def test_field_routing_after_recent_write(self):
+        session = self.client.session
+        session[LAST_WRITE_SESSION_KEY] = time.time()
+        session.save()
+        data = self.run_gql('{ allReplicaBlogPosts { edges { node { title } } } }')
+        self.assertEqual(self.get_titles(data['allReplicaBlogPosts']), ['default post 1', 'default post 2'])
+
+        session[LAST_WRITE_SESSION_KEY] = time.time() - 10
+        session.save()
+        data = self.run_gql('{ allReplicaBlogPosts { edges { node { title } } } }')
+        self.assertEqual(self.get_titles(data['allReplicaBlogPosts']), ['replica post 1', 'replica post 2'])
+
+    def test_argument_routing(self):
+        data = self.run_gql('{ allBlogs(analyticsPostCount_Gte: 2) { edges { node { title } } } }')
+        self.assertEqual(self.get_titles(data['allBlogs']), ['analytics blog'])
+
+        data = self.run_gql('{ allBlogs(postCount_Gte: 2) { edges { node { title } } } }')
+        self.assertEqual(self.get_titles(data['allBlogs']), ['default blog'])
+
+    def test_recent_write_middleware(self):
+        request = RequestFactory().get('/')
+        RecentWriteMiddleware(lambda request: Blog.objects.count())(request)
+        self.assertIsNone(get_last_write(request))
+
+        RecentWriteMiddleware(lambda request: Blog.objects.create(title='New blog'))(request)
+        self.assertAlmostEqual(get_last_write(request), time.time(), delta=1)
+
+    def test_replica_unless_recent_write(self):
+        rule = ReplicaUnlessRecentWrite('replica', window=5)
+        request = RequestFactory().get('/')
+        info = type('Info', (object,), {'context': request})
+        self.assertEqual(rule.get_database(None, None, info, {}), 'replica')
+        record_write(request)
+        self.assertIsNone(rule.get_database(None, None, info, {}))
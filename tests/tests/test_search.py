@@ -0,0 +1,99 @@
+import copy
+import json
+from io import StringIO
+from types import SimpleNamespace
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from tests.models import Blog, BlogPost, post_search_index
+
+
+class SearchFilterTests(TestCase):
+    query = '''
+    query ($search: String, $blogTitle: String) {
+        allBlogPosts(search: $search, blog_Title: $blogTitle) {
+            edges {
+                node {
+                    title
+                    searchRank
+                }
+            }
+        }
+    }
+    '''
+
+    def setUp(self):
+        self.blog1 = Blog.objects.create(title='Blog 1')
+        self.blog2 = Blog.objects.create(title='Blog 2')
+        self.post1 = BlogPost.objects.create(title='Django tips', body='Querysets are lazy', blog=self.blog1)
+        self.post2 = BlogPost.objects.create(title='Django querysets', body='Querysets and querysets', blog=self.blog1)
+        self.post3 = BlogPost.objects.create(title='Graphene', body='Django querysets in GraphQL', blog=self.blog2)
+
+    def search(self, search, **variables):
+        variables['search'] = search
+        response = self.client.post(
+            '/graphql/', {'query': self.query, 'variables': json.dumps(variables)},
+        ).json()
+        self.assertNotIn('errors', response)
+        return [edge['node'] for edge in response['data']['allBlogPosts']['edges']]
+
+    def get_titles(self, search, **variables):
+        return [node['title'] for node in self.search(search, **variables)]
+
+    def test_search(self):
+        with CaptureQueriesContext(connection) as queries:
+            nodes = self.search('querysets')
+        self.assertIn('MATCH', queries[-1]['sql'])
+        self.assertNotIn('LIKE', queries[-1]['sql'])
+
+        # The most relevant rows come first
+        self.assertEqual([node['title'] for node in nodes], ['Django querysets', 'Django tips', 'Graphene'])
+        self.assertTrue(all(node['searchRank'] > 0 for node in nodes))
+        self.assertGreater(nodes[0]['searchRank'], nodes[1]['searchRank'])
+
+        self.assertEqual(self.get_titles('django lazy'), ['Django tips'])
+        self.assertEqual(self.get_titles('querysets', blogTitle='Blog 2'), ['Graphene'])
+        self.assertEqual(self.get_titles('flask'), [])
+
+    def test_empty_search(self):
+        nodes = self.search(' ')
+        self.assertEqual(len(nodes), 3)
+        self.assertIsNone(nodes[0]['searchRank'])
+
+    def test_search_syntax_is_not_parsed(self):
+        self.assertEqual(self.get_titles('"querysets OR NEAR(django'), [])
+        self.assertEqual(self.get_titles('lazy"'), ['Django tips'])
+
+    def test_index_follows_rows(self):
+        self.post1.title = 'Flask tips'
+        self.post1.save()
+        self.assertEqual(self.get_titles('flask'), ['Flask tips'])
+        self.assertEqual(self.get_titles('tips django'), [])
+
+        self.post1.delete()
+        self.assertEqual(self.get_titles('flask'), [])
+
+    def test_build(self):
+        BlogPost.objects.bulk_create([BlogPost(title='Bulk post', blog=self.blog2)])
+        self.assertEqual(self.get_titles('bulk'), [])
+
+        out = StringIO()
+        call_command('build_search_indexes', 'tests_blogpost_search', stdout=out)
+        self.assertEqual(out.getvalue(), 'Built tests_blogpost_search: 4 rows\n')
+        self.assertEqual(self.get_titles('bulk'), ['Bulk post'])
+        self.assertEqual(self.get_titles('lazy'), ['Django tips'])
+
+    def test_conditions_are_compiled_for_the_queryset_database(self):
+        queryset = BlogPost.objects.using('replica').filter(post_search_index.get_conditions('querysets'))
+        self.assertIn('MATCH', str(queryset.query))
+
+    def test_vector_field_is_required_on_postgresql(self):
+        with self.assertRaises(ImproperlyConfigured):
+            post_search_index.check_vector_field(SimpleNamespace(vendor='postgresql'))
+        index = copy.copy(post_search_index)
+        index.vector_field = 'search_vector'
+        index.check_vector_field(SimpleNamespace(vendor='postgresql'))
@@ -0,0 +1,55 @@
+from django.test import TestCase, override_settings
+
+from tests.models import Blog, BlogPost
+
+
+class FilterTraceTests(TestCase):
+    query = '''
+    {
+        allBlogs(filterByCount_Gte: 1, enabled: true, count: 2) {
+            edges {
+                node {
+                    title
+                }
+            }
+        }
+    }
+    '''
+
+    def setUp(self):
+        self.blog1 = Blog.objects.create(title='Blog 1')
+        self.blog2 = Blog.objects.create(title='Blog 2')
+        BlogPost.objects.create(title='Blog 1 - Post 1', blog=self.blog1)
+        BlogPost.objects.create(title='Blog 1 - Post 2', blog=self.blog1)
+
+    def run_gql(self, query, **extra):
+        return self.client.post('/graphql/trace/', {'query': query}, **extra)
+
+    def test_trace_is_disabled_by_default(self):
+        data = self.run_gql(self.query, HTTP_X_FILTER_TRACE='1').json()
+        self.assertEqual(len(data['data']['allBlogs']['edges']), 1)
+        self.assertNotIn('extensions', data)
+
+    @override_settings(DEBUG=True)
+    def test_trace(self):
+        data = self.run_gql(self.query, HTTP_X_FILTER_TRACE='1').json()
+        self.assertEqual(len(data['data']['allBlogs']['edges']), 1)
+
+        trace = data['extensions']['filterTrace']
+        self.assertEqual(len(trace), 1)
+        self.assertEqual(trace[0]['path'], ['allBlogs'])
+        self.assertGreaterEqual(trace[0]['duration'], 0)
+
+        stages = [(argument['argument'], argument['stage']) for argument in trace[0]['arguments']]
+        self.assertEqual(stages, [
+            ('enabled', 'alter_filter_conditions'),
+            ('count', 'alter_filter_conditions'),
+            ('filter_by_count__gte', 'alter_filter_conditions'),
+            ('enabled', 'alter_queryset_after'),
+            ('count', 'alter_queryset_after'),
+            ('filter_by_count__gte', 'alter_queryset_after'),
+        ])
+
+        self.assertEqual(len(trace[0]['queries']), 1)
+        self.assertIn('COUNT', trace[0]['queries'][0]['sql'])
+        self.assertIn('2', trace[0]['queries'][0]['params'])
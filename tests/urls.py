@@ -2,6 +2,43 @@ from django.urls import path
 
 from graphene_django.views import GraphQLView
 
+from graphene_django_helpers.persisted import PersistedQueryRegistry
+from graphene_django_helpers.views import FilteredExportView, PersistedQueryGraphQLView, TracingGraphQLView
+from tests.graphql.schema import BlogQuery
+from tests.models import Blog, BlogPost
+
+persisted_queries = PersistedQueryRegistry(max_entries=2)
+
 urlpatterns = [
     path('graphql/', GraphQLView.as_view(graphiql=True), name='graphql'),
+    path('graphql/trace/', TracingGraphQLView.as_view(), name='graphql-trace'),
+    path(
+        'graphql/persisted/',
+        PersistedQueryGraphQLView.as_view(registry=persisted_queries),
+        name='graphql-persisted',
+    ),
+    path(
+        'exports/blog-posts/',
+        FilteredExportView.as_view(
+            field=BlogQuery._meta.fields['all_blog_posts'],
+            queryset=BlogPost.objects.all(),
+            columns=['id', 'title', 'blog__title'],
+            chunk_size=2,
+        ),
+        name='export-blog-posts',
+    ),
+    path(
+        'exports/blogs/',
+        FilteredExportView.as_view(field=BlogQuery._meta.fields['all_blogs'], queryset=Blog.objects.all()),
+        name='export-blogs',
+    ),
+    path(
+        'exports/private-blogs/',
+        FilteredExportView.as_view(
+            field=BlogQuery._meta.fields['all_blogs'],
+            queryset=Blog.objects.all(),
+            permission_required='tests.change_blog',
+        ),
+        name='export-private-blogs',
+    ),
 ]